@@ -1,10 +1,13 @@
 # achievements/signals.py
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
+from brainfuel import response_cache
+
 from quizzes.models import QuizAttempt
 from .models import Achievement, UserAchievement  # adjust names if different
 from notifications.utils import create_notification
+from taskqueue.queue import enqueue
 
 
 def unlock_achievement(user, title: str):
@@ -44,20 +47,16 @@ def unlock_achievement(user, title: str):
 @receiver(post_save, sender=QuizAttempt)
 def handle_quiz_completion(sender, instance: QuizAttempt, created, **kwargs):
     """
-    Runs every time a QuizAttempt is created.
-    Add whatever achievement logic you want here.
+    Runs every time a QuizAttempt is created: the achievement rules run in
+    the task worker (achievements.tasks), committed along with the attempt.
     """
     if not created:
         return
 
-    user = instance.user
-
-    # Example 1: First quiz ever
-    total_attempts = QuizAttempt.objects.filter(user=user).count()
-    if total_attempts == 1:
-        unlock_achievement(user, "First Quiz")
+    enqueue("achievements.evaluate_attempt", {"attempt_id": instance.id}, key=f"achievements:attempt:{instance.id}")
 
-    # Example 2: Generic explorer achievement (any completed quiz)
-    unlock_achievement(user, "Quiz Explorer")
 
-    # Add more rules here (scores, streaks, categories, etc.)
+@receiver(post_save, sender=Achievement)
+@receiver(post_delete, sender=Achievement)
+def invalidate_achievement_list(sender, **kwargs):
+    response_cache.invalidate("achievements")
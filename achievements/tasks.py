@@ -0,0 +1,26 @@
+# achievements/tasks.py
+from quizzes.models import QuizAttempt
+from taskqueue.queue import task
+
+from .signals import unlock_achievement
+
+
+@task("achievements.evaluate_attempt")
+def evaluate_attempt(attempt_id):
+    """
+    Achievement rules for a newly created QuizAttempt.
+    Add whatever achievement logic you want here.
+    """
+    attempt = QuizAttempt.objects.select_related("user").filter(pk=attempt_id).first()
+    if attempt is None:
+        return
+    user = attempt.user
+
+    # Example 1: First quiz ever
+    if not QuizAttempt.objects.filter(user=user, pk__lt=attempt.pk).exists():
+        unlock_achievement(user, "First Quiz")
+
+    # Example 2: Generic explorer achievement (any completed quiz)
+    unlock_achievement(user, "Quiz Explorer")
+
+    # Add more rules here (scores, streaks, categories, etc.)
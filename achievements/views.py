@@ -9,6 +9,7 @@ from .models import Achievement
 from .serializers import AchievementSerializer
 from rest_framework.permissions import AllowAny
 from quizzes.models import QuizAttempt
+from brainfuel.response_cache import cache_response
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
@@ -34,6 +35,7 @@ def my_achievements(request):
 
   return Response(data, status=status.HTTP_200_OK)
 
+@cache_response("achievements")
 @api_view(["GET"])
 @permission_classes([AllowAny])
 def all_achievements(request):
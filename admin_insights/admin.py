@@ -1,3 +1,15 @@
 from django.contrib import admin
+from .models import DailyMetric, DailyCategoryActivity
 
-# Register your models here.
+
+@admin.register(DailyMetric)
+class DailyMetricAdmin(admin.ModelAdmin):
+    list_display = ("date", "new_users", "quiz_attempts", "payments", "revenue", "premium_conversions", "premium_cancellations")
+    date_hierarchy = "date"
+
+
+@admin.register(DailyCategoryActivity)
+class DailyCategoryActivityAdmin(admin.ModelAdmin):
+    list_display = ("date", "category", "attempts", "correct", "total")
+    list_filter = ("category",)
+    date_hierarchy = "date"
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AdminInsightsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'admin_insights'
+
+    def ready(self):
+        import admin_insights.signals
@@ -0,0 +1,52 @@
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+
+from admin_insights.metrics import rebuild_range, reseed_premium
+from premium.models import Payment
+from quizzes.models import QuizAttempt
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute daily admin metrics from the source tables. "
+        "By default rebuilds yesterday and today; run it periodically (e.g. nightly) "
+        "to repair anything the signals missed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=2, help="Number of days back from today to rebuild")
+        parser.add_argument("--since", type=str, help="Rebuild from this date (YYYY-MM-DD) until today")
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Rebuild the full history and reseed premium conversions (initial backfill)",
+        )
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+
+        if options["all"]:
+            firsts = [
+                get_user_model().objects.aggregate(first=Min("date_joined"))["first"],
+                QuizAttempt.objects.aggregate(first=Min("created_at"))["first"],
+                Payment.objects.aggregate(first=Min("created_at"))["first"],
+            ]
+            firsts = [timezone.localdate(f) for f in firsts if f]
+            start = min(firsts) if firsts else today
+        elif options["since"]:
+            try:
+                start = date.fromisoformat(options["since"])
+            except ValueError:
+                raise CommandError("--since must be a date in YYYY-MM-DD format")
+        else:
+            start = today - timedelta(days=max(1, options["days"]) - 1)
+
+        rows = rebuild_range(start, today)
+        if options["all"]:
+            reseed_premium()
+
+        self.stdout.write(self.style.SUCCESS(f"✔ Rebuilt {rows} daily metric rows ({start} → {today})"))
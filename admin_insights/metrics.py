@@ -0,0 +1,214 @@
+# admin_insights/metrics.py
+"""
+Daily rollups for the admin dashboards.
+
+Counters live in DailyMetric / DailyCategoryActivity. Signals bump today's
+row as events happen; `rollup_metrics` recomputes whole days from the source
+tables so the rollup can be repaired or backfilled at any time.
+"""
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
+
+from .models import DailyMetric, DailyCategoryActivity
+
+User = get_user_model()
+
+METRIC_FIELDS = (
+    "new_users",
+    "quiz_attempts",
+    "payments",
+    "revenue",
+    "premium_conversions",
+    "premium_cancellations",
+)
+CATEGORY_FIELDS = ("attempts", "correct", "total")
+
+BUCKETS = {
+    "week": TruncWeek,
+    "month": TruncMonth,
+}
+
+
+def _bump(model, lookup, **deltas):
+    """
+    Add `deltas` to the row identified by `lookup`, creating it if needed.
+    Costs a single UPDATE when the row already exists.
+    """
+    deltas = {field: value for field, value in deltas.items() if value}
+    if not deltas:
+        return
+
+    updates = {field: F(field) + value for field, value in deltas.items()}
+    if model.objects.filter(**lookup).update(**updates):
+        return
+
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        # another request created the row in the meantime
+        model.objects.filter(**lookup).update(**updates)
+
+
+def record_daily(day, **deltas):
+    _bump(DailyMetric, {"date": day}, **deltas)
+
+
+def record_category(day, category, **deltas):
+    _bump(DailyCategoryActivity, {"date": day, "category": category or ""}, **deltas)
+
+
+# ---------- READS ----------
+
+
+def totals(start=None, end=None):
+    """Sum every metric over [start, end] (both optional) in one query."""
+    qs = DailyMetric.objects.all()
+    if start:
+        qs = qs.filter(date__gte=start)
+    if end:
+        qs = qs.filter(date__lte=end)
+
+    agg = qs.aggregate(**{field: Sum(field) for field in METRIC_FIELDS})
+    return {field: agg[field] or 0 for field in METRIC_FIELDS}
+
+
+def series(start, end, bucket="day"):
+    """
+    Metrics between start and end (inclusive) grouped into day/week/month buckets.
+    Reads one rollup row per day in the range.
+    """
+    qs = DailyMetric.objects.filter(date__gte=start, date__lte=end)
+
+    if bucket == "day":
+        rows = qs.order_by("date").values("date", *METRIC_FIELDS)
+        return [{"period": row.pop("date"), **row} for row in rows]
+
+    trunc = BUCKETS[bucket]
+    rows = (
+        qs.annotate(period=trunc("date"))
+        .values("period")
+        .annotate(**{field: Sum(field) for field in METRIC_FIELDS})
+        .order_by("period")
+    )
+    return list(rows)
+
+
+def category_totals(start, end):
+    rows = (
+        DailyCategoryActivity.objects.filter(date__gte=start, date__lte=end)
+        .values("category")
+        .annotate(**{field: Sum(field) for field in CATEGORY_FIELDS})
+        .order_by("-attempts", "category")
+    )
+    return list(rows)
+
+
+# ---------- RECOMPUTE ----------
+
+
+def _per_day(qs, date_field, **aggregates):
+    rows = (
+        qs.annotate(day=TruncDate(date_field))
+        .values("day")
+        .annotate(**aggregates)
+        .order_by()
+    )
+    return {row.pop("day"): row for row in rows}
+
+
+def rebuild_range(start, end):
+    """
+    Recompute new users, attempts, payments/revenue and category activity
+    for every day in [start, end] from the source tables.
+
+    Premium conversions cannot be derived from the source tables (there is no
+    upgrade timestamp), so they are left untouched here; see reseed_premium().
+    """
+    from quizzes.models import QuizAttempt
+    from premium.models import Payment
+
+    users = _per_day(
+        User.objects.filter(date_joined__date__gte=start, date_joined__date__lte=end),
+        "date_joined",
+        new_users=Count("id"),
+    )
+    attempts = _per_day(
+        QuizAttempt.objects.filter(created_at__date__gte=start, created_at__date__lte=end),
+        "created_at",
+        quiz_attempts=Count("id"),
+    )
+    payments = _per_day(
+        Payment.objects.filter(
+            status="success", created_at__date__gte=start, created_at__date__lte=end
+        ),
+        "created_at",
+        payments=Count("id"),
+        revenue=Sum("amount"),
+    )
+    categories = (
+        QuizAttempt.objects.filter(created_at__date__gte=start, created_at__date__lte=end)
+        .annotate(day=TruncDate("created_at"))
+        .values("day", "quiz__category__name")
+        .annotate(attempts=Count("id"), correct=Sum("correct"), total=Sum("total"))
+        .order_by()
+    )
+
+    existing = {m.date: m for m in DailyMetric.objects.filter(date__gte=start, date__lte=end)}
+    to_create, to_update = [], []
+
+    day = start
+    while day <= end:
+        values = {
+            "new_users": users.get(day, {}).get("new_users", 0),
+            "quiz_attempts": attempts.get(day, {}).get("quiz_attempts", 0),
+            "payments": payments.get(day, {}).get("payments", 0),
+            "revenue": payments.get(day, {}).get("revenue") or 0,
+        }
+        metric = existing.get(day)
+        if metric is None:
+            to_create.append(DailyMetric(date=day, **values))
+        else:
+            for field, value in values.items():
+                setattr(metric, field, value)
+            to_update.append(metric)
+        day += timedelta(days=1)
+
+    with transaction.atomic():
+        DailyMetric.objects.bulk_create(to_create)
+        DailyMetric.objects.bulk_update(
+            to_update, ["new_users", "quiz_attempts", "payments", "revenue"]
+        )
+
+        DailyCategoryActivity.objects.filter(date__gte=start, date__lte=end).delete()
+        DailyCategoryActivity.objects.bulk_create(
+            DailyCategoryActivity(
+                date=row["day"],
+                category=row["quiz__category__name"] or "",
+                attempts=row["attempts"],
+                correct=row["correct"] or 0,
+                total=row["total"] or 0,
+            )
+            for row in categories
+        )
+
+    return len(to_create) + len(to_update)
+
+
+def reseed_premium():
+    """
+    Reset premium counters and count every current premium user as a
+    conversion on the day they joined. Used once when backfilling history;
+    from then on the signals keep the counters current.
+    """
+    joined = _per_day(
+        User.objects.filter(is_premium=True), "date_joined", premium_conversions=Count("id")
+    )
+    with transaction.atomic():
+        DailyMetric.objects.update(premium_conversions=0, premium_cancellations=0)
+        for day, row in joined.items():
+            record_daily(day, premium_conversions=row["premium_conversions"])
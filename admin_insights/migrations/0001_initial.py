@@ -0,0 +1,106 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:33
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def _per_day(qs, date_field, **aggregates):
+    return qs.annotate(day=TruncDate(date_field)).values("day").annotate(**aggregates).order_by()
+
+
+def backfill(apps, schema_editor):
+    """
+    Roll up the history recorded before these tables existed, as
+    `rollup_metrics --all` would: signups, attempts, successful payments,
+    category activity, and every premium user as a conversion on the day
+    they joined.
+    """
+    User = apps.get_model("users", "User")
+    Quiz = apps.get_model("quizzes", "Quiz")
+    QuizAttempt = apps.get_model("quizzes", "QuizAttempt")
+    Payment = apps.get_model("premium", "Payment")
+    DailyMetric = apps.get_model("admin_insights", "DailyMetric")
+    DailyCategoryActivity = apps.get_model("admin_insights", "DailyCategoryActivity")
+
+    days = {}
+    for rows in (
+        _per_day(User.objects.all(), "date_joined", new_users=Count("id")),
+        _per_day(User.objects.filter(is_premium=True), "date_joined", premium_conversions=Count("id")),
+        _per_day(QuizAttempt.objects.all(), "created_at", quiz_attempts=Count("id")),
+        _per_day(Payment.objects.filter(status="success"), "created_at", payments=Count("id"), revenue=Sum("amount")),
+    ):
+        for row in rows:
+            day = row.pop("day")
+            days.setdefault(day, {}).update({field: value or 0 for field, value in row.items()})
+    DailyMetric.objects.bulk_create(
+        [DailyMetric(date=day, **values) for day, values in days.items()], batch_size=1000
+    )
+
+    # Quiz.category is free text here and a Category from quizzes 0017 on; either may already be applied
+    category = "quiz__category__name" if Quiz._meta.get_field("category").is_relation else "quiz__category"
+    activity = {}
+    rows = (
+        QuizAttempt.objects.annotate(day=TruncDate("created_at"))
+        .values("day", category)
+        .annotate(attempts=Count("id"), correct=Sum("correct"), total=Sum("total"))
+        .order_by()
+    )
+    for row in rows:
+        counts = activity.setdefault((row["day"], row[category] or ""), [0, 0, 0])
+        for i, field in enumerate(("attempts", "correct", "total")):
+            counts[i] += row[field] or 0
+    DailyCategoryActivity.objects.bulk_create(
+        [
+            DailyCategoryActivity(date=day, category=name, attempts=attempts, correct=correct, total=total)
+            for (day, name), (attempts, correct, total) in activity.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('users', '0009_user_date_joined'),
+        ('quizzes', '0010_question_difficulty'),
+        ('premium', '0002_payment_purpose'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('new_users', models.IntegerField(default=0)),
+                ('quiz_attempts', models.IntegerField(default=0)),
+                ('payments', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('premium_conversions', models.IntegerField(default=0)),
+                ('premium_cancellations', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyCategoryActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('category', models.CharField(blank=True, max_length=100)),
+                ('attempts', models.IntegerField(default=0)),
+                ('correct', models.IntegerField(default=0)),
+                ('total', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['date', 'category'],
+                'unique_together': {('date', 'category')},
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,40 @@
 from django.db import models
 
-# Create your models here.
+
+class DailyMetric(models.Model):
+    """
+    One row per calendar day (in TIME_ZONE) with platform-wide counters.
+
+    Rows are bumped incrementally by signals (see admin_insights/signals.py)
+    and can be recomputed from the source tables with
+    `python manage.py rollup_metrics`.
+    """
+    date = models.DateField(unique=True)
+    new_users = models.IntegerField(default=0)
+    quiz_attempts = models.IntegerField(default=0)
+    payments = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    premium_conversions = models.IntegerField(default=0)
+    premium_cancellations = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["date"]
+
+    def __str__(self):
+        return f"Metrics for {self.date}"
+
+
+class DailyCategoryActivity(models.Model):
+    date = models.DateField()
+    category = models.CharField(max_length=100, blank=True)
+    attempts = models.IntegerField(default=0)
+    correct = models.IntegerField(default=0)
+    total = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ["date", "category"]
+        unique_together = ("date", "category")
+
+    def __str__(self):
+        return f"{self.category or 'Uncategorised'} on {self.date}"
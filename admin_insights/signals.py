@@ -0,0 +1,97 @@
+# admin_insights/signals.py
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from premium.models import Payment
+from premium.signals import payment_succeeded
+from quizzes.models import QuizAttempt
+from .metrics import record_category, record_daily
+
+User = get_user_model()
+
+
+# Remember the loaded value of the fields we diff on save. Read through
+# __dict__ so deferred fields are never fetched just for this.
+
+@receiver(post_init, sender=User)
+def remember_premium_flag(sender, instance, **kwargs):
+    instance._insights_was_premium = instance.__dict__.get("is_premium")
+
+
+@receiver(post_init, sender=Payment)
+def remember_payment_status(sender, instance, **kwargs):
+    instance._insights_status = instance.__dict__.get("status")
+
+
+@receiver(post_save, sender=User)
+def track_user(sender, instance, created, **kwargs):
+    was_premium = instance._insights_was_premium
+    is_premium = instance.__dict__.get("is_premium")
+    instance._insights_was_premium = is_premium
+
+    if created:
+        record_daily(
+            timezone.localdate(instance.date_joined),
+            new_users=1,
+            premium_conversions=1 if is_premium else 0,
+        )
+        return
+
+    if is_premium is None or was_premium is None or is_premium == was_premium:
+        return
+
+    if is_premium:
+        record_daily(timezone.localdate(), premium_conversions=1)
+    else:
+        record_daily(timezone.localdate(), premium_cancellations=1)
+
+
+@receiver(post_delete, sender=User)
+def untrack_user(sender, instance, **kwargs):
+    # new_users counts users that joined that day and still exist
+    record_daily(timezone.localdate(instance.date_joined), new_users=-1)
+    if instance.is_premium:
+        record_daily(timezone.localdate(), premium_cancellations=1)
+
+
+@receiver(post_save, sender=QuizAttempt)
+def track_attempt(sender, instance, created, **kwargs):
+    if not created:
+        return
+
+    day = timezone.localdate(instance.created_at)
+    record_daily(day, quiz_attempts=1)
+    record_category(
+        day,
+        instance.quiz.category.name if instance.quiz.category_id else "",
+        attempts=1,
+        correct=instance.correct,
+        total=instance.total,
+    )
+
+
+@receiver(post_save, sender=Payment)
+def track_payment(sender, instance, created, **kwargs):
+    previous = instance._insights_status
+    instance._insights_status = instance.status
+
+    if instance.status != "success" or (previous == "success" and not created):
+        return
+
+    record_daily(
+        timezone.localdate(instance.created_at),
+        payments=1,
+        revenue=instance.amount,
+    )
+
+
+@receiver(payment_succeeded)
+def track_settled_payment(sender, payment, **kwargs):
+    # premium.payments settles through a conditional UPDATE, which bypasses post_save
+    record_daily(
+        timezone.localdate(payment.created_at),
+        payments=1,
+        revenue=payment.amount,
+    )
@@ -1,3 +1,96 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from premium.models import Payment
+from quizzes.models import Category, Quiz, QuizAttempt
+from .metrics import rebuild_range, totals
+from .models import DailyMetric, DailyCategoryActivity
+
+User = get_user_model()
+
+
+class DailyMetricTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email="admin@example.com", password="pass", username="admin")
+        self.user = User.objects.create_user(email="player@example.com", password="pass", username="player")
+        science = Category.objects.create(name="Science", slug="science")
+        self.quiz = Quiz.objects.create(title="Q", category=science, created_by=self.admin, status="approved")
+
+    def test_signals_keep_today_current(self):
+        QuizAttempt.objects.create(user=self.user, quiz=self.quiz, score=50, correct=1, total=2)
+        payment = Payment.objects.create(user=self.user, amount=100, reference="ref-1", status="pending")
+        payment.status = "success"
+        payment.save()
+        payment.save()  # re-saving a successful payment must not count twice
+
+        self.user.is_premium = True
+        self.user.save()
+
+        metric = DailyMetric.objects.get(date=timezone.localdate())
+        self.assertEqual(metric.new_users, 2)
+        self.assertEqual(metric.quiz_attempts, 1)
+        self.assertEqual(metric.payments, 1)
+        self.assertEqual(metric.revenue, 100)
+        self.assertEqual(metric.premium_conversions, 1)
+
+        activity = DailyCategoryActivity.objects.get(category="Science")
+        self.assertEqual((activity.attempts, activity.correct, activity.total), (1, 1, 2))
+
+    def test_rebuild_matches_signals(self):
+        QuizAttempt.objects.create(user=self.user, quiz=self.quiz, score=100, correct=2, total=2)
+        before = totals()
+
+        DailyMetric.objects.all().delete()
+        DailyCategoryActivity.objects.all().delete()
+        today = timezone.localdate()
+        rebuild_range(today, today)
+
+        after = totals()
+        for field in ("new_users", "quiz_attempts", "payments", "revenue"):
+            self.assertEqual(before[field], after[field])
+        self.assertEqual(DailyCategoryActivity.objects.get(category="Science").attempts, 1)
+
+    def test_series_endpoint_buckets(self):
+        self.client.force_login(self.admin)
+        for bucket in ("day", "week", "month"):
+            response = self.client.get("/api/admin/insights/series/", {"bucket": bucket})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(sum(row["new_users"] for row in response.json()["series"]), 2)
+
+        response = self.client.get("/api/admin/insights/series/", {"bucket": "year"})
+        self.assertEqual(response.status_code, 400)
+
+
+class BackfillMigrationTests(TransactionTestCase):
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_initial_migration_backfills_history(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate([("admin_insights", None)])
+        # models as the database stands, so no live signal writes to the dropped rollup tables
+        leaves = [node for node in MigrationExecutor(connection).loader.graph.leaf_nodes() if node[0] != "admin_insights"]
+        apps = MigrationExecutor(connection).loader.project_state(leaves).apps
+        User, Category = apps.get_model("users", "User"), apps.get_model("quizzes", "Category")
+        Quiz, QuizAttempt = apps.get_model("quizzes", "Quiz"), apps.get_model("quizzes", "QuizAttempt")
+
+        joined = timezone.now() - timedelta(days=30)
+        player = User.objects.create(email="old@example.com", username="old", date_joined=joined, is_premium=True)
+        science = Category.objects.create(name="Science", slug="science")
+        quiz = Quiz.objects.create(title="Q", category=science, created_by=player, status="approved")
+        QuizAttempt.objects.create(user=player, quiz=quiz, score=100, correct=2, total=2)
+        apps.get_model("premium", "Payment").objects.create(user=player, amount=100, reference="old-1", status="success")
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+        self.assertEqual(
+            (totals()["new_users"], totals()["quiz_attempts"], totals()["payments"], totals()["revenue"]), (1, 1, 1, 100)
+        )
+        self.assertEqual(DailyMetric.objects.get(date=timezone.localdate(joined)).premium_conversions, 1)
+        self.assertEqual(DailyCategoryActivity.objects.get(category="Science").attempts, 1)
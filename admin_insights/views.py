@@ -1,33 +1,78 @@
+from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
-from users.models import User
-from quizzes.models import QuizAttempt
-from premium.models import Payment
-from django.utils.timezone import now
-from datetime import timedelta
-from django.db.models import Sum
+from django.utils.timezone import localdate
+from datetime import date, timedelta
+
+from brainfuel.replicas import replica_reads
+from .metrics import totals, series, category_totals, BUCKETS
+
 
 @api_view(["GET"])
 @permission_classes([IsAdminUser])
+@replica_reads
 def admin_insights(request):
-    today = now().date()
+    """
+    Dashboard summary, read from the daily rollup (O(days) rows, no full-table scans).
+    """
+    today = localdate()
     week_ago = today - timedelta(days=7)
 
-    new_users = User.objects.filter(date_joined__gte=week_ago).count()
-    quiz_activity = QuizAttempt.objects.filter(created_at__gte=week_ago).count()
-    revenue_last_7d = (
-        Payment.objects
-        .filter(created_at__gte=week_ago, status="SUCCESS")
-        .aggregate(Sum("amount"))["amount__sum"]
-        or 0
-    )
+    last_7d = totals(start=week_ago, end=today)
+    all_time = totals()
 
     data = {
-        "new_users_last_7_days": new_users,
-        "quiz_attempts_last_7_days": quiz_activity,
-        "revenue_last_7_days": revenue_last_7d,
-        "total_users": User.objects.count(),
-        "total_premium_users": User.objects.filter(is_premium=True).count(),
+        "new_users_last_7_days": last_7d["new_users"],
+        "quiz_attempts_last_7_days": last_7d["quiz_attempts"],
+        "revenue_last_7_days": last_7d["revenue"],
+        "premium_conversions_last_7_days": last_7d["premium_conversions"],
+        "total_users": all_time["new_users"],
+        "total_premium_users": all_time["premium_conversions"] - all_time["premium_cancellations"],
+        "top_categories_last_7_days": category_totals(week_ago, today)[:10],
     }
     return Response(data)
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+@replica_reads
+def admin_insights_series(request):
+    """
+    GET /api/admin/insights/series/?start=2025-01-01&end=2025-03-31&bucket=week
+
+    - start / end: ISO dates (default: last 30 days)
+    - bucket: "day" | "week" | "month" (default "day")
+    """
+    today = localdate()
+    bucket = request.query_params.get("bucket", "day")
+    if bucket != "day" and bucket not in BUCKETS:
+        return Response(
+            {"detail": "bucket must be one of: day, week, month"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        end = date.fromisoformat(request.query_params.get("end") or today.isoformat())
+        start = date.fromisoformat(
+            request.query_params.get("start") or (end - timedelta(days=29)).isoformat()
+        )
+    except ValueError:
+        return Response(
+            {"detail": "start and end must be dates in YYYY-MM-DD format"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    if start > end:
+        return Response({"detail": "start must be before end"}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(
+        {
+            "start": start,
+            "end": end,
+            "bucket": bucket,
+            "series": series(start, end, bucket),
+            "totals": totals(start=start, end=end),
+            "categories": category_totals(start, end),
+        }
+    )
@@ -12,9 +12,9 @@ import os
 
 from django.core.asgi import get_asgi_application
 from channels.routing import ProtocolTypeRouter, URLRouter
-from channels.auth import AuthMiddlewareStack
 
 from multiplayer.routing import websocket_urlpatterns
+from users.middleware import JWTAuthMiddlewareStack
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "BrainFuel.settings")
 
@@ -23,7 +23,7 @@ django_asgi_app = get_asgi_application()
 application = ProtocolTypeRouter(
     {
         "http": django_asgi_app,
-        "websocket": AuthMiddlewareStack(
+        "websocket": JWTAuthMiddlewareStack(
             URLRouter(websocket_urlpatterns)
         ),
     }
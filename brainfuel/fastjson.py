@@ -0,0 +1,83 @@
+# brainfuel/fastjson.py
+"""
+orjson-backed JSON renderer and parser for DRF.
+
+Both are drop-in replacements for rest_framework's JSONRenderer/JSONParser
+and produce / accept the same documents. orjson is optional: when it is not
+installed, or settings.FAST_JSON is off, they defer to the stdlib versions.
+So does anything orjson cannot do the same way (indented output for the
+browsable API, non-UTF-8 request bodies, non-strict NaN handling).
+
+Types orjson does not know natively (Decimal, lazy strings, QuerySets, ...)
+and datetimes go through DRF's own JSONEncoder.default, so they come out
+exactly as before.
+
+A view holding JSON that is already encoded (e.g. cached bodies) returns
+Response(RawJSON(body)): the renderer passes it through as it is, and only
+decodes it when asked for indented output (the browsable API, ?indent).
+"""
+import json
+
+from django.conf import settings
+from rest_framework.utils import encoders
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # optional: the stdlib path is used instead
+    orjson = None
+
+OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+
+_default = encoders.JSONEncoder().default
+
+
+def enabled():
+    return orjson is not None and getattr(settings, "FAST_JSON", True)
+
+
+def dumps(data):
+    """Compact UTF-8 JSON bytes, the same as FastJSONRenderer().render(data)."""
+    return FastJSONRenderer().render(data)
+
+
+class RawJSON(bytes):
+    """An encoded JSON document that FastJSONRenderer emits without encoding it again."""
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, RawJSON):
+            if self.get_indent(accepted_media_type, renderer_context or {}) is None:
+                return bytes(data)
+            data = json.loads(data)
+        if (
+            data is None
+            or not enabled()
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=_default, option=OPTIONS)
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits; the stdlib encoder copes or raises the usual error
+            return super().render(data, accepted_media_type, renderer_context)
+        # same JavaScript-safe escaping as JSONRenderer
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get("encoding", settings.DEFAULT_CHARSET)
+        if not enabled() or not self.strict or encoding.lower().replace("_", "-") not in ("utf-8", "utf8"):
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
@@ -0,0 +1,190 @@
+# brainfuel/ratelimit.py
+"""
+Token-bucket rate limiting for write-heavy endpoints and socket messages.
+
+A policy is a refill rate and a burst size, plus what the bucket is keyed
+on:
+
+    RATE_LIMITS = {
+        "quiz_submit": {"rate": "30/min", "burst": 10, "key": "user"},
+        "quiz_submit_total": {"rate": "200/s", "burst": 400, "key": "endpoint"},
+    }
+
+  - "user": one bucket per authenticated user (anonymous callers by IP);
+  - "ip": one bucket per client address;
+  - "endpoint": one bucket shared by every caller, as admission control
+    in front of the database.
+
+DRF views apply policies as a throttle class (throttle_classes =
+[throttle("quiz_submit", "quiz_submit_total")]); rejected requests get a
+429 with Retry-After. Consumers call consume() per message and drop what
+it rejects.
+
+Buckets live in process memory by default (a dict under a lock: a check
+costs a few microseconds, but every worker process has its own
+buckets). RATE_LIMIT_STORAGE = "cache" keeps them in the Django cache
+RATE_LIMIT_CACHE_ALIAS instead, shared between processes; that read-
+modify-write is not atomic, so concurrent hits on one bucket can let a
+few extra requests through.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from rest_framework.throttling import BaseThrottle
+
+KEY = "ratelimit:{}:{}"
+PERIODS = {"s": 1, "m": 60, "h": 60 * 60, "d": 60 * 60 * 24}
+DEFAULT_POLICIES = {
+    "quiz_submit": {"rate": "30/min", "burst": 10, "key": "user"},
+    "quiz_submit_total": {"rate": "200/s", "burst": 400, "key": "endpoint"},
+    "thalers": {"rate": "30/min", "burst": 10, "key": "user"},
+    "ws_answer": {"rate": "4/s", "burst": 8, "key": "user"},
+}
+
+
+class Policy:
+    __slots__ = ("name", "rate", "burst", "key")
+
+    def __init__(self, name, rate, burst, key="user"):
+        count, _, period = rate.partition("/")
+        self.name = name
+        self.rate = int(count) / PERIODS[period.strip()[:1]]  # tokens per second
+        self.burst = burst
+        self.key = key
+
+
+class MemoryStorage:
+    """Buckets in a dict of key -> (tokens, monotonic stamp, refilled by); refilled buckets are pruned past max_entries."""
+
+    def __init__(self, max_entries=100_000):
+        self.max_entries = max_entries
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def consume(self, key, rate, burst, cost):
+        now = time.monotonic()
+        with self._lock:
+            buckets = self._buckets
+            tokens, stamp, _ = buckets.get(key) or (burst, now, now)
+            tokens = min(burst, tokens + (now - stamp) * rate)
+            wait = 0.0 if tokens >= cost else (cost - tokens) / rate
+            if not wait:
+                tokens -= cost
+            buckets[key] = (tokens, now, now + (burst - tokens) / rate)
+            if len(buckets) > self.max_entries:
+                # a refilled bucket is the same as no bucket
+                for stale in [k for k, (_, _, full_at) in buckets.items() if full_at <= now]:
+                    del buckets[stale]
+        return wait
+
+
+class CacheStorage:
+    """Buckets as (tokens, unix time) cache entries that expire once they would be full again."""
+
+    def __init__(self, alias="default"):
+        self.alias = alias
+
+    def consume(self, key, rate, burst, cost):
+        cache = caches[self.alias]
+        now = time.time()
+        tokens, stamp = cache.get(key) or (burst, now)
+        tokens = min(burst, tokens + max(0.0, now - stamp) * rate)
+        wait = 0.0 if tokens >= cost else (cost - tokens) / rate
+        if not wait:
+            tokens -= cost
+        cache.set(key, (tokens, now), int((burst - tokens) / rate) + 1)
+        return wait
+
+
+_state = {}
+
+
+def policies():
+    if "policies" not in _state:
+        _state["policies"] = {
+            name: Policy(name, spec["rate"], spec["burst"], spec.get("key", "user"))
+            for name, spec in getattr(settings, "RATE_LIMITS", DEFAULT_POLICIES).items()
+        }
+    return _state["policies"]
+
+
+def storage():
+    if "storage" not in _state:
+        if getattr(settings, "RATE_LIMIT_STORAGE", "memory") == "cache":
+            _state["storage"] = CacheStorage(getattr(settings, "RATE_LIMIT_CACHE_ALIAS", "default"))
+        else:
+            _state["storage"] = MemoryStorage()
+    return _state["storage"]
+
+
+@receiver(setting_changed)
+def _reset(setting, **kwargs):
+    if setting in ("RATE_LIMITS", "RATE_LIMIT_STORAGE", "RATE_LIMIT_CACHE_ALIAS", "RATE_LIMIT_ENABLED"):
+        _state.clear()
+
+
+def consume(name, ident, cost=1):
+    """
+    Take `cost` tokens from the `name` bucket of `ident` (ignored for
+    endpoint policies). Returns 0.0 when admitted, otherwise the seconds
+    until it would be; unknown policies always admit.
+    """
+    policy = policies().get(name)
+    if policy is None or not getattr(settings, "RATE_LIMIT_ENABLED", True):
+        return 0.0
+    if policy.key == "endpoint":
+        ident = "all"
+    return storage().consume(KEY.format(name, ident), policy.rate, policy.burst, cost)
+
+
+def reset():
+    """Start over with empty in-process buckets (cache-backed buckets just expire)."""
+    _state.pop("storage", None)
+
+
+# ---------- DRF ----------
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Applies the policies in `scopes`; use throttle(*names) to make one."""
+
+    scopes = ()
+
+    def allow_request(self, request, view):
+        self.wait_seconds = 0.0
+        for name in self.scopes:
+            policy = policies().get(name)
+            if policy is None:
+                continue
+            if policy.key == "user" and request.user and request.user.is_authenticated:
+                ident = f"user:{request.user.pk}"
+            else:
+                ident = f"ip:{self.get_ident(request)}"
+            self.wait_seconds = consume(name, ident)
+            if self.wait_seconds:
+                return False
+        return True
+
+    def wait(self):
+        return self.wait_seconds
+
+
+def throttle(*names):
+    return type("TokenBucketThrottle", (TokenBucketThrottle,), {"scopes": names})
+
+
+# ---------- CHANNELS ----------
+
+
+def consume_message(scope, name, cost=1):
+    """consume() for a WebSocket message, keyed on the scope's user (or client address)."""
+    user = scope.get("user")
+    if user is not None and user.is_authenticated:
+        ident = f"user:{user.pk}"
+    else:
+        ident = f"ip:{(scope.get('client') or ('unknown',))[0]}"
+    return consume(name, ident, cost)
@@ -0,0 +1,150 @@
+# brainfuel/replicas.py
+"""
+Read replicas for read-only endpoints.
+
+Replicas come from DATABASE_REPLICA_URLS (see brainfuel.database) and are
+listed in DATABASE_REPLICAS. Nothing reads from them unless a view opts in:
+
+    class QuizStatsView(ReplicaReadsMixin, APIView): ...
+
+    @api_view(["GET"])
+    @permission_classes([AllowAny])
+    @replica_reads
+    def window_leaderboard(request, window): ...
+
+Inside an opted-in view ReplicaRouter sends reads to a random replica;
+authentication and permission checks run before that and stay on the
+primary, as do writes and every read inside an atomic block or after the
+request has written anything.
+
+Read-your-writes: a request that writes pins its user to the primary for
+REPLICA_PIN_SECONDS (ReplicaPinMiddleware), longer than replication lag,
+so whoever just submitted a quiz sees their own attempt, XP and stats on
+the next request. Shared caches are never filled from a replica
+(primary(), used by brainfuel.response_cache): a lagging replica would
+otherwise put stale data back right after an invalidation.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_KEY = "db:pinned:{}"
+PRIMARY, REPLICA = "primary", "replica"
+
+_reads = ContextVar("replica_reads", default=None)
+_request = ContextVar("replica_request", default=None)  # {"wrote": bool} of the current request
+
+
+def replicas():
+    return getattr(settings, "DATABASE_REPLICAS", [])
+
+
+def pin(user_id):
+    cache.set(PIN_KEY.format(user_id), True, getattr(settings, "REPLICA_PIN_SECONDS", 10))
+
+
+def pinned(user):
+    return bool(user and user.is_authenticated and cache.get(PIN_KEY.format(user.pk)))
+
+
+def _wrote():
+    state = _request.get()
+    return state is not None and state["wrote"]
+
+
+@contextmanager
+def replica(user=None):
+    """Let reads go to a replica, unless `user` is pinned or primary() is in force."""
+    allowed = _reads.get() != PRIMARY and bool(replicas()) and not pinned(user)
+    token = _reads.set(REPLICA if allowed else _reads.get())
+    try:
+        yield
+    finally:
+        _reads.reset(token)
+
+
+@contextmanager
+def primary():
+    """Every read on the primary, whatever the view opted into."""
+    token = _reads.set(PRIMARY)
+    try:
+        yield
+    finally:
+        _reads.reset(token)
+
+
+def replica_reads(view):
+    """Opt a function view in; goes under @api_view so the caller is authenticated first."""
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        with replica(request.user):
+            return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+class ReplicaReadsMixin:
+    """Opt an APIView in: its handler reads from a replica."""
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._replica = replica(request.user)
+        self._replica.__enter__()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        replica_context = self.__dict__.pop("_replica", None)
+        if replica_context is not None:
+            replica_context.__exit__(None, None, None)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _reads.get() != REPLICA or _wrote() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas())
+
+    def db_for_write(self, model, **hints):
+        state = _request.get()
+        if state is not None:
+            state["wrote"] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # replicas take schema changes (local stand-ins are migrated like the
+        # primary) but not RunPython/RunSQL data migrations, whose rows replicate
+        if db in replicas() and model_name is None:
+            return False
+        return None
+
+
+class ReplicaPinMiddleware:
+    """Pins the user of any request that wrote to the primary (after the view, once DRF has set request.user)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = {"wrote": False}
+        token = _request.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request.reset(token)
+        if state["wrote"] and replicas():
+            user = getattr(request, "user", None)
+            if user is not None and user.is_authenticated:
+                pin(user.pk)
+        return response
@@ -0,0 +1,174 @@
+# brainfuel/response_cache.py
+"""
+Response cache for public (AllowAny) GET endpoints.
+
+    @cache_response("achievements")
+    @api_view(["GET"])
+    @permission_classes([AllowAny])
+    def all_achievements(request): ...
+
+    @method_decorator(cache_response("quizzes"), name="dispatch")
+    class CategoryListView(APIView): ...
+
+Rendered bodies are stored under the view's group, the group's current
+generation and the request path plus its query parameters in sorted order
+(so ?a=1&b=2 and ?b=2&a=1 share an entry). Model signals call invalidate()
+to move a group to a new generation; old entries are never looked up again
+and expire on their own. TTLs default per group (RESPONSE_CACHE_TTLS) and
+can be overridden per view.
+
+On a miss only one request per key recomputes (a short lock taken with
+cache.add); concurrent requests for the same key wait for its result
+instead of all hitting the database. With the local-memory backend that
+holds per process; with the file-based backend (RESPONSE_CACHE_ALIAS
+pointing at a FileBasedCache) it is shared by every process on the host.
+"""
+import hashlib
+import time
+from functools import wraps
+from urllib.parse import parse_qsl, urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+
+from . import replicas
+
+GENERATION_KEY = "resp:generation:{}"
+ENTRY_KEY = "resp:{}:{}:{}"
+LOCK_SUFFIX = ":lock"
+
+DEFAULT_TTLS = {"quizzes": 60 * 5, "achievements": 60 * 60, "leaderboards": 30}
+LOCK_TIMEOUT = 10  # seconds a recomputation may hold the lock
+WAIT_TIMEOUT = 3  # seconds a follower waits before recomputing itself
+POLL_INTERVAL = 0.02
+
+
+def _store():
+    return caches[getattr(settings, "RESPONSE_CACHE_ALIAS", "default")]
+
+
+def _ttl(group):
+    return getattr(settings, "RESPONSE_CACHE_TTLS", {}).get(group, DEFAULT_TTLS.get(group, 60))
+
+
+def generation(store, group):
+    key = GENERATION_KEY.format(group)
+    value = store.get(key)
+    if value is None:
+        # start from the clock so a group whose counter was evicted cannot
+        # come back to a generation that still has entries cached
+        value = time.time_ns() // 1000
+        if not store.add(key, value, None):
+            value = store.get(key, value)
+    return value
+
+
+def _bump(groups):
+    store = _store()
+    for group in groups:
+        try:
+            store.incr(GENERATION_KEY.format(group))
+        except ValueError:
+            pass  # never cached (or evicted): the next read starts a fresh generation
+
+
+def invalidate(*groups):
+    """Drop every cached response of these groups, now and again once the transaction commits."""
+    if groups:
+        _bump(groups)
+        transaction.on_commit(lambda: _bump(groups))
+
+
+def normalized_key(request):
+    query = sorted(parse_qsl(request.META.get("QUERY_STRING", ""), keep_blank_values=True))
+    return f"{request.path}?{urlencode(query)}"
+
+
+def _bypass(request, anonymous_only):
+    # browsers get the browsable API (HTML); only JSON is cached
+    if request.method != "GET" or "text/html" in request.headers.get("Accept", ""):
+        return True
+    return anonymous_only and _has_credentials(request)
+
+
+def _has_credentials(request):
+    user = getattr(request, "user", None)
+    return "HTTP_AUTHORIZATION" in request.META or bool(user and user.is_authenticated)
+
+
+def _entry(response):
+    """What gets cached for a response, or None when it must not be."""
+    if response.status_code != 200 or response.streaming or response.has_header("Set-Cookie"):
+        return None
+    if not (response.get("Content-Type") or "").startswith("application/json"):
+        return None
+    return (response.content, response.get("Content-Type"), response.get("ETag"))
+
+
+def _respond(request, entry, state):
+    content, content_type, etag = entry
+    if etag and etag in [tag.strip() for tag in request.headers.get("If-None-Match", "").split(",")]:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(content, content_type=content_type)
+    if etag:
+        response["ETag"] = etag
+    response["X-Cache"] = state
+    return response
+
+
+def _recompute(store, key, ttl, view, request, args, kwargs):
+    with replicas.primary():  # a lagging replica must not refill the cache
+        response = view(request, *args, **kwargs)
+    if hasattr(response, "render") and not response.is_rendered:
+        response.render()
+    entry = _entry(response)
+    if entry is not None:
+        store.set(key, entry, ttl)
+        response["X-Cache"] = "MISS"
+    return response
+
+
+def cache_response(group, ttl=None, anonymous_only=False):
+    """
+    Cache a view's GET responses under `group`. With `anonymous_only`,
+    requests carrying credentials bypass the cache (for views that add
+    per-user data, such as the caller's own rank).
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if _bypass(request, anonymous_only):
+                return view(request, *args, **kwargs)
+
+            store = _store()
+            digest = hashlib.sha1(normalized_key(request).encode()).hexdigest()
+            key = ENTRY_KEY.format(group, generation(store, group), digest)
+            entry = store.get(key)
+            if entry is not None:
+                return _respond(request, entry, "HIT")
+
+            lock = key + LOCK_SUFFIX
+            if store.add(lock, True, LOCK_TIMEOUT):
+                try:
+                    return _recompute(store, key, ttl or _ttl(group), view, request, args, kwargs)
+                finally:
+                    store.delete(lock)
+
+            # someone else is recomputing this key: wait for their result
+            deadline = time.monotonic() + WAIT_TIMEOUT
+            while time.monotonic() < deadline:
+                time.sleep(POLL_INTERVAL)
+                entry = store.get(key)
+                if entry is not None:
+                    return _respond(request, entry, "HIT")
+                if not store.has_key(lock):
+                    break  # finished without caching (e.g. an error response)
+            return _recompute(store, key, ttl or _ttl(group), view, request, args, kwargs)
+
+        return wrapper
+
+    return decorator
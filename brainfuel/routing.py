@@ -1,13 +1,13 @@
 # brainfuel/routing.py (example)
 from channels.routing import ProtocolTypeRouter, URLRouter
-from channels.auth import AuthMiddlewareStack
 from django.core.asgi import get_asgi_application
 
 import multiplayer.routing
+from users.middleware import JWTAuthMiddlewareStack
 
 application = ProtocolTypeRouter({
     "http": get_asgi_application(),
-    "websocket": AuthMiddlewareStack(
+    "websocket": JWTAuthMiddlewareStack(
         URLRouter(
             multiplayer.routing.websocket_urlpatterns
         )
@@ -0,0 +1,51 @@
+# brainfuel/serializers.py
+"""
+Read-only list fast path.
+
+Set ValuesListSerializer as a ModelSerializer's Meta.list_serializer_class
+and many=True reads of a QuerySet become a single .values() query turned
+straight into dicts, skipping the per-row, per-field to_representation()
+calls. Only serializers whose fields are all plain model columns whose
+values are already JSON-ready (ints, strings, bools, JSON) take the fast
+path; anything else (nested serializers, method fields, dotted sources,
+dates) falls back to the normal ListSerializer, so the output never differs.
+"""
+from django.db import models
+from rest_framework import serializers
+
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,  # also EmailField, SlugField, URLField, ...
+    serializers.FloatField,
+    serializers.IntegerField,
+    serializers.JSONField,
+    serializers.ReadOnlyField,
+)
+
+
+class ValuesListSerializer(serializers.ListSerializer):
+    def _values_fields(self):
+        """[(output name, model field name)] or None when the fast path does not apply."""
+        model = getattr(getattr(self.child, "Meta", None), "model", None)
+        if model is None:
+            return None
+        columns = {f.name for f in model._meta.concrete_fields if not f.is_relation}
+        fields = []
+        for field in self.child._readable_fields:
+            if not isinstance(field, PASSTHROUGH_FIELDS) or field.source not in columns:
+                return None
+            if isinstance(field, serializers.JSONField) and field.binary:
+                return None
+            fields.append((field.field_name, field.source))
+        return fields
+
+    def to_representation(self, data):
+        if isinstance(data, models.manager.BaseManager):
+            data = data.all()
+        fields = self._values_fields()
+        if fields is None or not isinstance(data, models.QuerySet):
+            return super().to_representation(data)
+        sources = [source for _, source in fields]
+        if all(name == source for name, source in fields):
+            return list(data.values(*sources))
+        return [{name: row[source] for name, source in fields} for row in data.values(*sources)]
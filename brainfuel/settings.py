@@ -61,6 +61,7 @@ INSTALLED_APPS = [
     'notifications',
     'admin_insights',
     'admin_reports',
+    'taskqueue',
     "channels",
      "multiplayer", 
     'corsheaders',
@@ -74,6 +75,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'brainfuel.replicas.ReplicaPinMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -105,6 +107,46 @@ TEMPLATES = [
 
 ASGI_APPLICATION = "BrainFuel.asgi.application"
 
+# locmem's default of 300 entries is too small for the per-quiz render cache:
+# a quiz list larger than that would evict itself on every request
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "OPTIONS": {"MAX_ENTRIES": int(os.environ.get("CACHE_MAX_ENTRIES", 20000))},
+    }
+}
+
+# Public GET responses (brainfuel/response_cache.py). Set RESPONSE_CACHE_DIR to
+# share them between worker processes through the file-based backend.
+RESPONSE_CACHE_ALIAS = "default"
+if os.environ.get("RESPONSE_CACHE_DIR"):
+    CACHES["responses"] = {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ["RESPONSE_CACHE_DIR"],
+    }
+    RESPONSE_CACHE_ALIAS = "responses"
+RESPONSE_CACHE_TTLS = {"quizzes": 60 * 5, "achievements": 60 * 60, "leaderboards": 30}
+
+# Slim JWT principals cached by users.authentication.CachedJWTAuthentication
+AUTH_PRINCIPAL_CACHE_TTL = int(os.environ.get("AUTH_PRINCIPAL_CACHE_TTL", 60 * 10))
+
+# Token-bucket policies (brainfuel/ratelimit.py). "memory" buckets are per
+# process; "cache" shares them through RATE_LIMIT_CACHE_ALIAS.
+RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "True") == "True"
+RATE_LIMIT_STORAGE = os.environ.get("RATE_LIMIT_STORAGE", "memory")
+RATE_LIMIT_CACHE_ALIAS = "default"
+RATE_LIMITS = {
+    "quiz_submit": {"rate": "30/min", "burst": 10, "key": "user"},
+    "quiz_submit_total": {"rate": "200/s", "burst": 400, "key": "endpoint"},
+    "thalers": {"rate": "30/min", "burst": 10, "key": "user"},
+    "ws_answer": {"rate": "4/s", "burst": 8, "key": "user"},
+}
+
+# Background tasks (taskqueue): run by `manage.py run_tasks`; TASKS_RUN_INLINE
+# runs them in-process after each commit instead (development without a worker)
+TASKS_RUN_INLINE = os.environ.get("TASKS_RUN_INLINE", "False") == "True"
+TASKS_LEASE_SECONDS = int(os.environ.get("TASKS_LEASE_SECONDS", 60 * 5))
+
 CHANNEL_LAYERS = {
     "default": {
         "BACKEND": "channels.layers.InMemoryChannelLayer",
@@ -126,17 +168,21 @@ PAYSTACK_PLAN_CODES = {
     "elite": "PLN_hueqi99d39elo0z",
 }
 PAYSTACK_CURRENCY = "KES"  # or NGN/GHS/etc;
+PAYSTACK_BASE_URL = os.environ.get("PAYSTACK_BASE_URL", "https://api.paystack.co")
+PAYSTACK_POOL_SIZE = int(os.environ.get("PAYSTACK_POOL_SIZE", 10))  # pooled keep-alive connections
 
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
-}
+# DATABASE_URL and the connection/pool/SQLite tuning knobs: brainfuel/database.py
+from brainfuel.database import databases
+
+DATABASES = databases(BASE_DIR)
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+DATABASE_ROUTERS = ["brainfuel.replicas.ReplicaRouter"]
+# seconds a user who just wrote reads from the primary (must exceed replication lag)
+REPLICA_PIN_SECONDS = int(os.environ.get("REPLICA_PIN_SECONDS", 10))
 
 
 # Password validation
@@ -185,7 +231,19 @@ AUTH_USER_MODEL = 'users.User'
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
        
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
          'rest_framework.authentication.SessionAuthentication',
-    ]
-}
\ No newline at end of file
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'brainfuel.fastjson.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'brainfuel.fastjson.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+# orjson for API (de)serialization when it is installed; False forces the stdlib path
+FAST_JSON = os.environ.get("FAST_JSON", "True") == "True"
\ No newline at end of file
@@ -23,7 +23,7 @@ from rest_framework_simplejwt.views import (
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 from rest_framework import permissions
-from admin_insights.views import admin_insights
+from admin_insights.views import admin_insights, admin_insights_series
 from admin_reports.views import admin_reports
 
 schema_view = get_schema_view(
@@ -53,6 +53,7 @@ urlpatterns = [
     path('api/multiplayer/', include('multiplayer.urls')),
 
     path('api/admin/insights/', admin_insights, name='admin_insights'),
+    path('api/admin/insights/series/', admin_insights_series, name='admin_insights_series'),
     path('api/admin/reports/', admin_reports, name='admin_reports'),
 
 ]
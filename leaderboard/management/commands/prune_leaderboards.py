@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from leaderboard import windows
+
+
+class Command(BaseCommand):
+    help = "Delete leaderboard window periods older than their retention (also done on each rollover)"
+
+    def handle(self, *args, **options):
+        deleted = sum(windows.prune(window) for window in windows.WINDOWS)
+        self.stdout.write(self.style.SUCCESS(f"✔ Pruned {deleted} expired leaderboard rows"))
@@ -1,3 +1,29 @@
+from django.conf import settings
 from django.db import models
 
-# Create your models here.
+
+class WindowScore(models.Model):
+    """
+    XP a user earned within one leaderboard window (day, week, month, season),
+    keyed by the window's first day. Maintained by leaderboard.windows.
+    """
+    WINDOW_CHOICES = [
+        ("daily", "Daily"),
+        ("weekly", "Weekly"),
+        ("monthly", "Monthly"),
+        ("season", "Season"),
+    ]
+
+    window = models.CharField(max_length=10, choices=WINDOW_CHOICES)
+    period_start = models.DateField()
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="window_scores")
+    xp = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("window", "period_start", "user")
+        indexes = [
+            models.Index(fields=["window", "period_start", "-xp"], name="leaderboard_window_rank"),
+        ]
+
+    def __str__(self):
+        return f"{self.window} {self.period_start}: {self.user_id} {self.xp} XP"
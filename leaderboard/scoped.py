@@ -0,0 +1,116 @@
+# leaderboard/scoped.py
+"""
+Leaderboards over a set of users: people you have shared a multiplayer room
+with, or an explicit friend list.
+
+Ranking k members is two indexed lookups by primary key (User for lifetime
+XP and level, WindowScore for a windowed board) and an O(k log k) sort; the
+rest of the leaderboard is never read.
+
+Results are cached per (member set, window, period). Every member has a
+version token that is replaced whenever their XP changes (see
+leaderboard.signals); a cached result remembers the tokens it was computed
+from and is only served while they all still match, so a hit costs two
+cache round trips and any member's XP change invalidates every scope they
+are in.
+"""
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+
+from multiplayer.models import RoomParticipant
+from . import windows
+from .models import WindowScore
+
+User = get_user_model()
+
+MEMBER_VERSION_KEY = "leaderboard:member:{}"
+SCOPE_KEY = "leaderboard:scope:{}"
+TTL = getattr(settings, "LEADERBOARD_SCOPE_CACHE_TTL", 60 * 10)
+MAX_MEMBERS = 500
+LIFETIME = "all"
+
+
+# ---------- INVALIDATION ----------
+
+
+def _replace_versions(user_ids):
+    cache.set_many({MEMBER_VERSION_KEY.format(user_id): uuid.uuid4().hex for user_id in user_ids}, None)
+
+
+def member_changed(user_ids):
+    """Invalidate every cached scope containing these users (again on commit, like render_cache.bump)."""
+    user_ids = list(user_ids)
+    if user_ids:
+        _replace_versions(user_ids)
+        transaction.on_commit(lambda: _replace_versions(user_ids))
+
+
+# ---------- SCOPES ----------
+
+
+def co_player_ids(user_id, limit=MAX_MEMBERS):
+    """The user and everyone who has been in a multiplayer room with them, most recent rooms first."""
+    rooms = RoomParticipant.objects.filter(user_id=user_id).values("room_id")
+    ids = [user_id]
+    seen = {user_id}
+    for other in (
+        RoomParticipant.objects.filter(room_id__in=rooms).order_by("-joined_at").values_list("user_id", flat=True)
+    ):
+        if other not in seen:
+            seen.add(other)
+            ids.append(other)
+            if len(ids) >= limit:
+                break
+    return ids
+
+
+# ---------- RANKING ----------
+
+
+def _rank(user_ids, window, start):
+    users = User.objects.filter(pk__in=user_ids).values_list("id", "username", "level", "xp")
+    if window == LIFETIME:
+        rows = list(users)
+    else:
+        earned = dict(
+            WindowScore.objects.filter(window=window, period_start=start, user_id__in=user_ids).values_list(
+                "user_id", "xp"
+            )
+        )
+        rows = [(uid, username, level, earned.get(uid, 0)) for uid, username, level, _ in users]
+    rows.sort(key=lambda row: (-row[3], row[0]))
+
+    entries, rank, previous_xp = [], 0, None
+    for position, (uid, username, level, xp) in enumerate(rows, start=1):
+        if xp != previous_xp:
+            rank, previous_xp = position, xp
+        entries.append({"rank": rank, "user_id": uid, "username": username, "level": level, "xp": xp})
+    return entries
+
+
+def scoped_leaderboard(user_ids, window=LIFETIME, start=None):
+    """
+    Rank `user_ids` (at most MAX_MEMBERS) by lifetime XP or by XP earned in
+    `window`'s period starting `start` (default: the current one).
+    """
+    user_ids = sorted(set(user_ids))[:MAX_MEMBERS]
+    if window != LIFETIME:
+        start = start or windows.period_start(window)
+
+    digest = hashlib.sha1(f"{window}:{start}:{','.join(map(str, user_ids))}".encode()).hexdigest()
+    version_keys = [MEMBER_VERSION_KEY.format(user_id) for user_id in user_ids]
+    found = cache.get_many([SCOPE_KEY.format(digest), *version_keys])
+    versions = [found.get(key) for key in version_keys]
+
+    cached = found.get(SCOPE_KEY.format(digest))
+    if cached is not None and cached[0] == versions:
+        return cached[1]
+
+    entries = _rank(user_ids, window, start)
+    cache.set(SCOPE_KEY.format(digest), (versions, entries), TTL)
+    return entries
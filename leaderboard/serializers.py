@@ -1,9 +1,11 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from brainfuel.serializers import ValuesListSerializer
 
 User = get_user_model()
 
 class LeaderboardSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
-        fields = ['id', 'username', 'xp', 'level', 'badges', 'is_premium']
\ No newline at end of file
+        fields = ['id', 'username', 'xp', 'level', 'badges', 'is_premium']
+        list_serializer_class = ValuesListSerializer
@@ -0,0 +1,33 @@
+# leaderboard/signals.py
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from brainfuel import response_cache
+from . import scoped
+
+User = get_user_model()
+
+# what a scoped leaderboard shows for each member
+RANKED_FIELDS = ("username", "level", "xp")
+
+
+@receiver(post_init, sender=User)
+def remember_ranked_fields(sender, instance, **kwargs):
+    # read through __dict__ so deferred fields are never fetched just for this
+    instance._leaderboard_ranked = tuple(instance.__dict__.get(field) for field in RANKED_FIELDS)
+
+
+@receiver(post_save, sender=User)
+def invalidate_scopes(sender, instance, created, **kwargs):
+    ranked = tuple(instance.__dict__.get(field) for field in RANKED_FIELDS)
+    if created or ranked != instance._leaderboard_ranked:
+        scoped.member_changed([instance.pk])
+        response_cache.invalidate("leaderboards")
+    instance._leaderboard_ranked = ranked
+
+
+@receiver(post_delete, sender=User)
+def forget_member(sender, instance, **kwargs):
+    scoped.member_changed([instance.pk])
+    response_cache.invalidate("leaderboards")
@@ -1,3 +1,164 @@
-from django.test import TestCase
+import datetime
+import decimal
+import io
+import json
+import uuid
+from datetime import date
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from brainfuel.fastjson import FastJSONParser, FastJSONRenderer, RawJSON
+from multiplayer.models import Room, RoomParticipant
+from . import scoped, windows
+from .models import WindowScore
+from .serializers import LeaderboardSerializer
+
+User = get_user_model()
+
+
+class FastJSONTests(TestCase):
+    payload = {
+        "id": uuid.UUID(int=7),
+        "price": decimal.Decimal("9.50"),
+        "at": datetime.datetime(2024, 5, 1, 12, 30, tzinfo=datetime.timezone.utc),
+        "day": datetime.date(2024, 5, 1),
+        "text": "caf\\u00e9 \\u2028 line",
+        3: [1, 2.5, None, True],
+    }
+
+    def test_renderer_matches_stdlib(self):
+        self.assertEqual(FastJSONRenderer().render(self.payload), JSONRenderer().render(self.payload))
+        with override_settings(FAST_JSON=False):
+            self.assertEqual(FastJSONRenderer().render(self.payload), JSONRenderer().render(self.payload))
+        # the browsable API asks for indentation, which only the stdlib path does
+        self.assertEqual(
+            FastJSONRenderer().render(self.payload, "application/json; indent=2"),
+            JSONRenderer().render(self.payload, "application/json; indent=2"),
+        )
+
+    def test_raw_json_passes_through(self):
+        body = b'{"a":[1,2.5,null],"b":"caf\xc3\xa9"}'
+        self.assertEqual(FastJSONRenderer().render(RawJSON(body)), body)
+        self.assertEqual(
+            FastJSONRenderer().render(RawJSON(body), "application/json; indent=2"),
+            JSONRenderer().render(json.loads(body), "application/json; indent=2"),
+        )
+
+    def test_parser_matches_stdlib(self):
+        body = '{"a": [1, 2.5, null], "b": "caf\\u00e9"}'.encode()
+        self.assertEqual(FastJSONParser().parse(io.BytesIO(body)), JSONParser().parse(io.BytesIO(body)))
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"a": NaN}'))
+
+
+class LeaderboardTests(TestCase):
+    def setUp(self):
+        for i in range(30):
+            User.objects.create_user(
+                email=f"p{i}@example.com", password="pass", username=f"p{i}", xp=i * 10, badges=[f"b{i}"]
+            )
+
+    def test_values_fast_path_matches_model_serializer(self):
+        users = User.objects.filter(xp__gt=0).order_by("-xp")
+        slow = serializers.ListSerializer(child=LeaderboardSerializer())
+
+        with self.assertNumQueries(1):
+            fast = LeaderboardSerializer(users, many=True).data
+        self.assertEqual(len(fast), 29)
+        self.assertEqual(fast, slow.to_representation(users))
+        self.assertEqual(LeaderboardSerializer(users[:5], many=True).data, slow.to_representation(users[:5]))
+
+    def test_endpoint_rows(self):
+        with self.assertNumQueries(1):
+            rows = self.client.get("/api/leaderboard/").json()
+        self.assertEqual(len(rows), 30)
+        self.assertEqual(rows[0], {"username": "p29", "level": 1, "xp": 290, "badges": ["b29"], "thalers": 0})
+
+
+class WindowLeaderboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = [
+            User.objects.create_user(email=f"w{i}@example.com", password="pass", username=f"w{i}") for i in range(4)
+        ]
+
+    def test_periods(self):
+        day = date(2024, 8, 15)  # a Thursday
+        self.assertEqual(windows.period_start("weekly", day), date(2024, 8, 12))
+        self.assertEqual(windows.period_start("monthly", day), date(2024, 8, 1))
+        self.assertEqual(windows.period_start("season", day), date(2024, 7, 1))
+        self.assertEqual(windows.next_start("season", date(2024, 10, 1)), date(2025, 1, 1))
+        self.assertEqual(windows.previous_start("weekly", date(2024, 8, 12)), date(2024, 8, 5))
+
+    def test_top_and_rank(self):
+        for user, xp in zip(self.users, [30, 50, 30, 0]):
+            windows.record_xp(user.id, xp)
+        windows.record_xp(self.users[0].id, 40)
+
+        self.client.force_login(self.users[2])
+        with self.assertNumQueries(5):  # session, user, top N, my row, rows above mine
+            body = self.client.get("/api/leaderboard/weekly/").json()
+        self.assertEqual([(e["username"], e["rank"], e["xp"]) for e in body["entries"]], [("w0", 1, 70), ("w1", 2, 50), ("w2", 3, 30)])
+        self.assertEqual(body["me"], {"rank": 3, "xp": 30})
+        self.assertEqual(self.client.get("/api/leaderboard/weekly/", {"period": "previous"}).json()["entries"], [])
+        self.assertEqual(self.client.get("/api/leaderboard/yearly/").status_code, 404)
+
+    def test_rollover_prunes_expired_periods(self):
+        user = self.users[0].id
+        windows.record_xp(user, 10, when=windows_day(2024, 1, 1))
+        windows.record_xp(user, 10, when=windows_day(2024, 1, 5))
+        self.assertEqual(WindowScore.objects.filter(window="daily").count(), 2)
+
+        windows.record_xp(user, 10, when=windows_day(2024, 1, 9))  # 2024-01-01 is now 9 days old
+        self.assertEqual(
+            sorted(WindowScore.objects.filter(window="daily").values_list("period_start", flat=True)),
+            [date(2024, 1, 5), date(2024, 1, 9)],
+        )
+        self.assertEqual(windows.rank("monthly", user, date(2024, 1, 1)), {"rank": 1, "xp": 30})
+
+
+class ScopedLeaderboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = [
+            User.objects.create_user(email=f"s{i}@example.com", password="pass", username=f"s{i}", xp=i * 10)
+            for i in range(5)
+        ]
+        room = Room.objects.create(code="ROOM1", host=self.users[0])
+        for user in self.users[:3]:
+            RoomParticipant.objects.create(room=room, user=user)
+
+    def test_room_scope_is_cached_until_a_member_gains_xp(self):
+        self.client.force_login(self.users[0])
+        body = self.client.get("/api/leaderboard/scoped/").json()
+        self.assertEqual([e["username"] for e in body["entries"]], ["s2", "s1", "s0"])
+        self.assertEqual(body["me"]["rank"], 3)
+
+        ids = [user.id for user in self.users[:3]]
+        with self.assertNumQueries(0):
+            scoped.scoped_leaderboard(ids)
+
+        self.users[0].xp = 100
+        self.users[0].save(update_fields=["xp"])
+        with self.assertNumQueries(1):
+            self.assertEqual(scoped.scoped_leaderboard(ids)[0]["username"], "s0")
+
+    def test_friend_list_and_windows(self):
+        windows.record_xp(self.users[4].id, 5)
+        windows.record_xp(self.users[1].id, 15)
+        self.client.force_login(self.users[1])
+        body = self.client.get(
+            "/api/leaderboard/scoped/", {"scope": "friends", "ids": f"{self.users[4].id},{self.users[3].id}", "window": "daily"}
+        ).json()
+        self.assertEqual([(e["username"], e["xp"], e["rank"]) for e in body["entries"]], [("s1", 15, 1), ("s4", 5, 2), ("s3", 0, 3)])
+        self.assertEqual(self.client.get("/api/leaderboard/scoped/", {"scope": "friends", "ids": "a"}).status_code, 400)
+
+
+def windows_day(year, month, day):
+    return datetime.datetime(year, month, day, 12, tzinfo=datetime.timezone.utc)
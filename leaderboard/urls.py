@@ -1,7 +1,9 @@
 from django.urls import path
-from .views import LeaderboardView
+from .views import LeaderboardView, admin_summary, scoped_leaderboard, window_leaderboard
 
 urlpatterns = [
     path('', LeaderboardView.as_view(), name='leaderboard'),
-    
-]
\ No newline at end of file
+    path('admin/summary/', admin_summary, name='admin-summary'),
+    path('scoped/', scoped_leaderboard, name='leaderboard-scoped'),
+    path('<str:window>/', window_leaderboard, name='leaderboard-window'),
+]
@@ -1,31 +1,34 @@
+from datetime import timedelta
 from rest_framework import generics, permissions
 from django.db.models import Sum
 from django.contrib.auth import get_user_model
 from .serializers import LeaderboardSerializer
 from quizzes.models import QuizAttempt
-from premium.models import Payment
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from quizzes.models import Quiz
-from django.db import models
+from admin_insights.metrics import totals
+from brainfuel.response_cache import cache_response
+from brainfuel.replicas import ReplicaReadsMixin, replica_reads
+from . import scoped, windows
 import csv, io
 
 User = get_user_model()
 
-class LeaderboardView(generics.ListAPIView):
+class LeaderboardView(ReplicaReadsMixin, generics.ListAPIView):
     queryset = User.objects.filter(xp__gt=0).order_by('-xp')
     serializer_class = LeaderboardSerializer
     permission_classes = [permissions.AllowAny]
 
-class GlobalLeaderboardView(generics.ListAPIView):
+class GlobalLeaderboardView(ReplicaReadsMixin, generics.ListAPIView):
     serializer_class = LeaderboardSerializer
     permission_classes = [permissions.AllowAny]
 
     def get_queryset(self):
         return User.objects.all().order_by("-xp")[:50]
 
-class CategoryLeaderboardView(generics.ListAPIView):
+class CategoryLeaderboardView(ReplicaReadsMixin, generics.ListAPIView):
     serializer_class = LeaderboardSerializer
     permission_classes = [permissions.AllowAny]
 
@@ -35,20 +38,74 @@ class CategoryLeaderboardView(generics.ListAPIView):
             total_xp=Sum("quizattempt__score")
         ).order_by("-total_xp")[:50]
 
+@cache_response("leaderboards", anonymous_only=True)
+@api_view(["GET"])
+@permission_classes([permissions.AllowAny])
+@replica_reads
+def window_leaderboard(request, window):
+    """
+    GET /api/leaderboard/<daily|weekly|monthly|season>/?limit=50&period=previous
+    Top players by XP earned in the window, plus the caller's own rank.
+    """
+    if window not in windows.WINDOWS:
+        return Response({"detail": f"Unknown window. Use one of: {', '.join(windows.WINDOWS)}"}, status=404)
+    try:
+        limit = int(request.query_params.get("limit", 50))
+    except ValueError:
+        limit = 50
+
+    start = windows.period_start(window)
+    if request.query_params.get("period") == "previous":
+        start = windows.previous_start(window, start)
+
+    data = {
+        "window": window,
+        "period_start": start,
+        "period_end": windows.next_start(window, start) - timedelta(days=1),
+        "entries": windows.top(window, limit, start),
+    }
+    if request.user.is_authenticated:
+        data["me"] = windows.rank(window, request.user.id, start)
+    return Response(data)
+
+@api_view(["GET"])
+@permission_classes([permissions.IsAuthenticated])
+@replica_reads
+def scoped_leaderboard(request):
+    """
+    GET /api/leaderboard/scoped/?scope=rooms|friends&ids=3,7,9&window=all|daily|weekly|monthly|season
+    Rank the caller among people they have played multiplayer rooms with
+    (scope=rooms, the default) or among an explicit friend list (scope=friends&ids=...).
+    """
+    window = request.query_params.get("window", scoped.LIFETIME)
+    if window != scoped.LIFETIME and window not in windows.WINDOWS:
+        return Response({"detail": "Unknown window"}, status=400)
+
+    if request.query_params.get("scope", "rooms") == "friends":
+        try:
+            ids = [int(i) for i in request.query_params.get("ids", "").split(",") if i.strip()]
+        except ValueError:
+            return Response({"detail": "ids must be a comma-separated list of user ids"}, status=400)
+        if len(ids) >= scoped.MAX_MEMBERS:
+            return Response({"detail": f"At most {scoped.MAX_MEMBERS - 1} friends per request"}, status=400)
+        ids.append(request.user.id)
+    else:
+        ids = scoped.co_player_ids(request.user.id)
+
+    entries = scoped.scoped_leaderboard(ids, window)
+    me = next((entry for entry in entries if entry["user_id"] == request.user.id), None)
+    return Response({"window": window, "entries": entries, "me": me})
+
 @api_view(["GET"])
 @permission_classes([IsAdminUser])
+@replica_reads
 def admin_summary(request):
-    total_users = User.objects.count()
-    premium_users = User.objects.filter(is_premium=True).count()
-    total_quizzes = Quiz.objects.count()
-    total_attempts = QuizAttempt.objects.count()
-    total_revenue = Payment.objects.filter(status="SUCCESS").aggregate(total=models.Sum("amount"))["total"] or 0
-
+    all_time = totals()
     data = {
-        "total_users": total_users,
-        "premium_users": premium_users,
-        "total_quizzes": total_quizzes,
-        "total_attempts": total_attempts,
-        "total_revenue": total_revenue,
+        "total_users": all_time["new_users"],
+        "premium_users": all_time["premium_conversions"] - all_time["premium_cancellations"],
+        "total_quizzes": Quiz.objects.count(),
+        "total_attempts": all_time["quiz_attempts"],
+        "total_revenue": all_time["revenue"],
     }
-    return Response(data)
\ No newline at end of file
+    return Response(data)
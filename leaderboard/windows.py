@@ -0,0 +1,143 @@
+# leaderboard/windows.py
+"""
+Windowed leaderboards (daily, weekly, monthly, season).
+
+Every XP award adds to one WindowScore counter per window, keyed by the
+first day of the window it falls in, so a new day/week/month/season simply
+starts writing fresh rows (rollover needs no job). The first write of each
+new period prunes periods older than the window's retention.
+
+Reads never touch QuizAttempt:
+
+  - top N   -> the first N rows of the (window, period_start, -xp) index
+  - my rank -> my row, plus a count of the rows above it on the same index
+
+Weeks start on Monday; seasons are calendar quarters.
+"""
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import WindowScore
+
+WINDOWS = [choice for choice, _ in WindowScore.WINDOW_CHOICES]
+
+# periods kept per window, the current one included
+RETENTION = {"daily": 8, "weekly": 5, "monthly": 3, "season": 2}
+RETENTION.update(getattr(settings, "LEADERBOARD_WINDOW_RETENTION", {}))
+
+ROLLOVER_KEY = "leaderboard:rollover:{}:{}"
+TOP_MAX = 100
+
+
+class UnknownWindow(ValueError):
+    pass
+
+
+def _check(window):
+    if window not in WINDOWS:
+        raise UnknownWindow(f"unknown leaderboard window {window!r}")
+
+
+def period_start(window, day=None):
+    """First day of the period of `window` containing `day` (default: today)."""
+    _check(window)
+    day = day or timezone.localdate()
+    if window == "daily":
+        return day
+    if window == "weekly":
+        return day - timedelta(days=day.weekday())
+    if window == "monthly":
+        return day.replace(day=1)
+    return date(day.year, (day.month - 1) // 3 * 3 + 1, 1)
+
+
+def next_start(window, start):
+    if window == "daily":
+        return start + timedelta(days=1)
+    if window == "weekly":
+        return start + timedelta(days=7)
+    months = 1 if window == "monthly" else 3
+    month = start.month - 1 + months
+    return date(start.year + month // 12, month % 12 + 1, 1)
+
+
+def previous_start(window, start):
+    return period_start(window, start - timedelta(days=1))
+
+
+# ---------- WRITES ----------
+
+
+def record_xp(user_id, xp, when=None):
+    """Add `xp` to the user's current period in every window (two queries)."""
+    if xp <= 0:
+        return
+    day = timezone.localdate(when) if when else timezone.localdate()
+    starts = {window: period_start(window, day) for window in WINDOWS}
+
+    with transaction.atomic():
+        WindowScore.objects.bulk_create(
+            [WindowScore(window=window, period_start=start, user_id=user_id) for window, start in starts.items()],
+            ignore_conflicts=True,
+        )
+        current = Q()
+        for window, start in starts.items():
+            current |= Q(window=window, period_start=start)
+        WindowScore.objects.filter(current, user_id=user_id).update(xp=F("xp") + xp)
+
+    for window, start in starts.items():
+        if cache.add(ROLLOVER_KEY.format(window, start), True, 60 * 60 * 24):
+            prune(window, start)
+
+
+def prune(window, current=None):
+    """Delete periods of `window` that fell out of its retention. Returns the rows deleted."""
+    start = current or period_start(window)
+    for _ in range(RETENTION[window] - 1):
+        start = previous_start(window, start)
+    deleted, _ = WindowScore.objects.filter(window=window, period_start__lt=start).delete()
+    return deleted
+
+
+# ---------- READS ----------
+
+
+def top(window, limit=50, start=None):
+    """[{rank, user_id, username, level, xp}] for the period, best first; ties share a rank."""
+    start = start or period_start(window)
+    limit = max(1, min(limit, TOP_MAX))
+    rows = (
+        WindowScore.objects.filter(window=window, period_start=start, xp__gt=0)
+        .order_by("-xp", "user_id")
+        .values("user_id", "user__username", "user__level", "xp")[:limit]
+    )
+
+    entries, rank, previous_xp = [], 0, None
+    for position, row in enumerate(rows, start=1):
+        if row["xp"] != previous_xp:
+            rank, previous_xp = position, row["xp"]
+        entries.append(
+            {
+                "rank": rank,
+                "user_id": row["user_id"],
+                "username": row["user__username"],
+                "level": row["user__level"],
+                "xp": row["xp"],
+            }
+        )
+    return entries
+
+
+def rank(window, user_id, start=None):
+    """{rank, xp} of the user in the period, or None when they earned nothing in it."""
+    start = start or period_start(window)
+    scores = WindowScore.objects.filter(window=window, period_start=start)
+    xp = scores.filter(user_id=user_id, xp__gt=0).values_list("xp", flat=True).first()
+    if xp is None:
+        return None
+    return {"rank": scores.filter(xp__gt=xp).count() + 1, "xp": xp}
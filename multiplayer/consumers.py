@@ -1,12 +1,19 @@
 # multiplayer/consumers.py
 import json
-import random
+import time
 
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.contrib.auth import get_user_model
-
-from quizzes.models import Quiz, Question, Option
+from django.db import transaction
+
+from brainfuel import ratelimit
+from quizzes.models import Option
+from quizzes import adaptive
+from quizzes.grading import GradedAnswer
+from quizzes.responses import log_responses
+from leaderboard import windows
+from users import ledger
 from .models import Room
 
 User = get_user_model()
@@ -26,6 +33,8 @@ User = get_user_model()
 #   "host": user_id,
 #   "questions": [ {id,text,options:[{id,text},...]}, ... ],
 #   "current_index": int,
+#   "question_sent_at": float (monotonic),
+#   "responses": [ (user_id, GradedAnswer, response_ms), ... ],  # flushed at results
 #   "started": bool,
 #   "difficulty": str,
 #   "count": int,
@@ -77,6 +86,7 @@ class QuizRoomConsumer(AsyncJsonWebsocketConsumer):
                 "host": None,
                 "questions": [],
                 "current_index": 0,
+                "responses": [],
                 "started": False,
                 "difficulty": difficulty,
                 "count": count,
@@ -180,12 +190,14 @@ class QuizRoomConsumer(AsyncJsonWebsocketConsumer):
             p["correct"] = 0
             p["total"] = 0
 
-        # fetch questions
-        questions = await self._fetch_questions(difficulty, count)
+        # fetch questions matched to the players' average skill
+        player_ids = [p["id"] for p in state["players"].values() if not p["is_spectator"]]
+        questions = await self._fetch_questions(difficulty, count, player_ids)
         state["difficulty"] = difficulty
         state["count"] = count
         state["questions"] = questions
         state["current_index"] = 0
+        state["responses"] = []
         state["started"] = True
 
         ROOM_STATE[self.room_code] = state
@@ -208,6 +220,12 @@ class QuizRoomConsumer(AsyncJsonWebsocketConsumer):
             # spectators cannot answer
             return
 
+        # answer floods are dropped before they reach the database
+        retry_after = ratelimit.consume_message(self.scope, "ws_answer")
+        if retry_after:
+            await self.send_json({"type": "rate_limited", "retry_after": round(retry_after, 3)})
+            return
+
         option_id = content.get("option_id")
         if not option_id:
             return
@@ -221,6 +239,16 @@ class QuizRoomConsumer(AsyncJsonWebsocketConsumer):
 
         is_correct = await self._check_answer(qid, option_id)
 
+        sent_at = state.get("question_sent_at")
+        response_ms = int((time.monotonic() - sent_at) * 1000) if sent_at else None
+        state.setdefault("responses", []).append(
+            (
+                uid,
+                GradedAnswer(qid, option_id if is_correct is not None else None, bool(is_correct)),
+                response_ms,
+            )
+        )
+
         player["total"] += 1
         if is_correct:
             player["correct"] += 1
@@ -254,6 +282,7 @@ class QuizRoomConsumer(AsyncJsonWebsocketConsumer):
             return
 
         q = state["questions"][idx]
+        state["question_sent_at"] = time.monotonic()
         await self.channel_layer.group_send(
             self.group_name,
             {
@@ -292,6 +321,10 @@ class QuizRoomConsumer(AsyncJsonWebsocketConsumer):
                 }
             )
 
+        # one bulk insert for the whole game
+        await self._log_responses(state.get("responses", []))
+        state["responses"] = []
+
         summary = {
             "total_questions": len(state["questions"]),
         }
@@ -349,24 +382,16 @@ class QuizRoomConsumer(AsyncJsonWebsocketConsumer):
     # -----------------------------
 
     @database_sync_to_async
-    def _fetch_questions(self, difficulty, count):
+    def _fetch_questions(self, difficulty, count, player_ids):
         """
-        Pick random questions from approved quizzes, optionally filtering by difficulty.
+        Pick questions from approved quizzes near the players' average skill,
+        optionally filtering by difficulty.
         """
-        quizzes = Quiz.objects.filter(status="approved")
-        if difficulty in ["easy", "medium", "hard"]:
-            quizzes = quizzes.filter(difficulty__iexact=difficulty)
-
-        qs = Question.objects.filter(quiz__in=quizzes).prefetch_related("options")
-        total = qs.count()
-        if total == 0:
-            return []
-
-        sample_count = min(count, total)
-        sampled = random.sample(list(qs), sample_count)
+        quiz_difficulty = difficulty if difficulty in ["easy", "medium", "hard"] else None
+        selected = adaptive.select_questions(player_ids, count, quiz_difficulty=quiz_difficulty)
 
         questions_payload = []
-        for q in sampled:
+        for q in adaptive.fetch_selected(selected):
             questions_payload.append(
                 {
                     "id": q.id,
@@ -378,11 +403,31 @@ class QuizRoomConsumer(AsyncJsonWebsocketConsumer):
 
     @database_sync_to_async
     def _check_answer(self, question_id, option_id):
+        """
+        True / False for a valid option of the question, None when the option
+        does not belong to it.
+        """
         try:
             opt = Option.objects.get(pk=option_id, question_id=question_id)
             return opt.is_correct
-        except Option.DoesNotExist:
-            return False
+        except (Option.DoesNotExist, ValueError, TypeError):
+            return None
+
+    @database_sync_to_async
+    def _log_responses(self, responses):
+        rows = {}
+        for user_id, graded, response_ms in responses:
+            rows.setdefault(user_id, []).append((graded, response_ms))
+
+        with transaction.atomic():
+            for user_id, answers in rows.items():
+                graded = [g for g, _ in answers]
+                log_responses(
+                    user_id,
+                    graded,
+                    response_times={g.question_id: ms for g, ms in answers if ms is not None},
+                )
+                adaptive.update_ratings(user_id, graded)
 
     @database_sync_to_async
     def _apply_rewards(self, user_id, xp, thalers):
@@ -392,12 +437,14 @@ class QuizRoomConsumer(AsyncJsonWebsocketConsumer):
             return
 
         u.xp = (u.xp or 0) + xp
-        u.thalers = (u.thalers or 0) + thalers
 
         while u.xp >= u.level * 100:
             u.level += 1
 
-        u.save()
+        with transaction.atomic():
+            u.save(update_fields=["xp", "level"])
+            ledger.credit(user_id, thalers, reason=f"multiplayer:{self.room_code}")
+            windows.record_xp(user_id, xp)
 
     @database_sync_to_async
     def _mark_room_active(self, difficulty, count):
@@ -0,0 +1,12 @@
+# notifications/tasks.py
+from taskqueue.queue import task
+
+from .models import Notification
+
+
+@task("notifications.send")
+def send(user_id, messages):
+    """[(title, message), ...] for one user, one INSERT."""
+    Notification.objects.bulk_create(
+        [Notification(user_id=user_id, title=title, message=message) for title, message in messages]
+    )
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('premium', '0002_payment_purpose'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='thalers_awarded',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='payment',
+            name='verified_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('created', 'Created'), ('initialized', 'Initialized'), ('success', 'Success'), ('failed', 'Failed'), ('abandoned', 'Abandoned'), ('reversed', 'Reversed')], default='pending', max_length=20),
+        ),
+    ]
@@ -2,13 +2,26 @@ from django.db import models
 from django.conf import settings
 
 class Payment(models.Model):
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("created", "Created"),
+        ("initialized", "Initialized"),
+        ("success", "Success"),
+        ("failed", "Failed"),
+        ("abandoned", "Abandoned"),
+        ("reversed", "Reversed"),
+    ]
+
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="payments")
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     reference = models.CharField(max_length=100, unique=True)
-    status = models.CharField(max_length=20, choices=[("pending", "Pending"), ("success", "Success"), ("failed", "Failed")], default="pending")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
     purpose = models.CharField(max_length=128, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     payment_method = models.CharField(max_length=50, default="mock")
+    # set once, by whichever caller wins the transition to "success"
+    thalers_awarded = models.PositiveIntegerField(default=0)
+    verified_at = models.DateTimeField(null=True, blank=True)
 
 class DiscountCode(models.Model):
     code = models.CharField(max_length=50, unique=True)
@@ -0,0 +1,114 @@
+# premium/payments.py
+"""
+Payment settlement.
+
+A payment is credited at most once, however many times (and from however
+many places) it is confirmed: the browser's verify call, the Paystack
+webhook, a retry after a timeout. The transition to "success" is a
+conditional UPDATE (... WHERE status != 'success'); only the caller whose
+UPDATE touched the row applies the thalers / premium side effects, in the
+same transaction.
+"""
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from users import ledger
+from .models import Payment
+from .signals import payment_succeeded
+
+User = get_user_model()
+
+SUCCESS = "success"
+
+
+def paystack_rewards(data, payment=None):
+    """
+    What a successful Paystack transaction is worth, from its verify/webhook
+    `data` payload: {"thalers", "purpose", "plan_key", "premium"}.
+    """
+    metadata = data.get("metadata") or {}
+
+    # Base rule: 1 thaler per 10 currency units (amount arrives in minor units)
+    try:
+        thalers = int(data.get("amount", 0)) // 100 // 10
+    except (TypeError, ValueError):
+        thalers = 0
+
+    purpose = metadata.get("purpose", "") or (payment.purpose if payment else "")
+
+    # plan_key from metadata, else parsed from a purpose like "subscription_warrior"
+    plan_key = metadata.get("plan_key")
+    if not plan_key and purpose and "subscription_" in purpose.lower():
+        plan_key = purpose.lower().split("subscription_", 1)[1] or None
+
+    # Shop purchases carry the exact number of thalers bought
+    shop_thalers = metadata.get("shop_thalers")
+    if shop_thalers is not None and purpose and "shop" in purpose.lower():
+        try:
+            thalers = int(shop_thalers)
+        except (TypeError, ValueError):
+            pass
+
+    return {
+        "thalers": max(0, thalers),
+        "purpose": purpose,
+        "plan_key": plan_key,
+        "premium": bool(purpose) and "subscription" in purpose.lower(),
+    }
+
+
+def complete_payment(reference, thalers=0, premium=False, plan_key=None, user_id=None, defaults=None):
+    """
+    Move the payment `reference` to "success" and credit its user, once.
+
+    If no Payment row exists yet (e.g. the webhook beat the init response)
+    it is created from `user_id` and `defaults`. Returns (payment, credited);
+    `credited` is False when the payment had already been settled, in which
+    case nothing is applied again. Returns (None, False) if there is neither
+    a row nor a user to create one for.
+    """
+    with transaction.atomic():
+        payment = Payment.objects.select_for_update().filter(reference=reference).first()
+        if payment is None:
+            if user_id is None:
+                return None, False
+            try:
+                with transaction.atomic():
+                    Payment.objects.create(reference=reference, user_id=user_id, **(defaults or {}))
+            except IntegrityError:
+                pass  # created concurrently; fall through to the locked read
+            payment = Payment.objects.select_for_update().get(reference=reference)
+
+        now = timezone.now()
+        claimed = (
+            Payment.objects.filter(pk=payment.pk)
+            .exclude(status=SUCCESS)
+            .update(status=SUCCESS, thalers_awarded=thalers, verified_at=now)
+        )
+        if not claimed:
+            payment.refresh_from_db()
+            return payment, False
+
+        payment.status, payment.thalers_awarded, payment.verified_at = SUCCESS, thalers, now
+        _credit_user(payment, thalers, premium, plan_key)
+        payment_succeeded.send(sender=Payment, payment=payment)
+
+    return payment, True
+
+
+def fail_payment(reference, status="failed"):
+    """Record a non-success outcome. A settled payment is never downgraded."""
+    return Payment.objects.filter(reference=reference).exclude(status=SUCCESS).update(status=status or "failed")
+
+
+def _credit_user(payment, thalers, premium, plan_key):
+    ledger.credit(payment.user_id, thalers, reason=f"payment:{payment.reference}")
+
+    if premium:
+        # a full save, so listeners on User (premium conversions) see the change
+        user = User.objects.get(pk=payment.user_id)
+        user.is_premium = True
+        if plan_key:
+            user.subscription_plan = plan_key
+        user.save(update_fields=["is_premium", "subscription_plan"])
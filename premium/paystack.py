@@ -0,0 +1,67 @@
+# premium/paystack.py
+"""
+Thin Paystack client.
+
+All outbound calls share one pooled requests.Session, so keep-alive
+connections are reused across requests instead of paying a TCP+TLS
+handshake on every verify. PAYSTACK_BASE_URL can point at a local stub
+in tests.
+"""
+import hashlib
+import hmac
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_BASE_URL = "https://api.paystack.co"
+REQUEST_TIMEOUT = 10  # seconds
+
+
+def _build_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=getattr(settings, "PAYSTACK_POOL_SIZE", 10),
+        # only idempotent GETs (verify) are retried
+        max_retries=Retry(total=2, backoff_factor=0.3, allowed_methods=["GET"], status_forcelist=[502, 503, 504]),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+session = _build_session()
+
+
+def secret_key():
+    return getattr(settings, "PAYSTACK_SECRET_KEY", None)
+
+
+def _url(path):
+    base = getattr(settings, "PAYSTACK_BASE_URL", DEFAULT_BASE_URL).rstrip("/")
+    return f"{base}/{path.lstrip('/')}"
+
+
+def _headers():
+    return {"Authorization": f"Bearer {secret_key()}"}
+
+
+def initialize_transaction(payload):
+    return session.post(_url("transaction/initialize"), json=payload, headers=_headers(), timeout=REQUEST_TIMEOUT)
+
+
+def verify_transaction(reference):
+    return session.get(_url(f"transaction/verify/{reference}"), headers=_headers(), timeout=REQUEST_TIMEOUT)
+
+
+def sign(body):
+    """HMAC-SHA512 of the raw request body, as Paystack sends in X-Paystack-Signature."""
+    return hmac.new((secret_key() or "").encode(), body, hashlib.sha512).hexdigest()
+
+
+def valid_signature(body, signature):
+    if not secret_key() or not signature:
+        return False
+    return hmac.compare_digest(sign(body), signature)
@@ -0,0 +1,6 @@
+# premium/signals.py
+from django.dispatch import Signal
+
+# Sent exactly once per payment, inside the transaction that moved it to
+# "success". Sender is Payment, kwargs: payment.
+payment_succeeded = Signal()
@@ -1,3 +1,126 @@
-from django.test import TestCase
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from admin_insights.models import DailyMetric
+from . import paystack
+from .models import Payment
+from .payments import complete_payment, fail_payment
+
+User = get_user_model()
+
+
+class StubPaystack(BaseHTTPRequestHandler):
+    """Answers /transaction/verify/<reference> from `transactions`."""
+
+    transactions = {}
+    hits = []
+
+    def do_GET(self):
+        reference = self.path.rstrip("/").rsplit("/", 1)[-1]
+        self.hits.append(reference)
+        data = self.transactions.get(reference)
+        body = json.dumps({"status": data is not None, "data": data or {}}).encode()
+        self.send_response(200 if data else 404)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class PaystackSettlementTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubPaystack)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.settings_override = override_settings(
+            PAYSTACK_BASE_URL=f"http://127.0.0.1:{cls.server.server_port}",
+            PAYSTACK_SECRET_KEY="sk_test_stub",
+        )
+        cls.settings_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        StubPaystack.hits.clear()
+        self.user = User.objects.create_user(email="payer@example.com", password="pass", username="payer")
+        self.client = APIClient()
+        Payment.objects.create(user=self.user, amount=50000, reference="ref-1", status="initialized", purpose="shop")
+        StubPaystack.transactions = {
+            "ref-1": {
+                "reference": "ref-1",
+                "status": "success",
+                "amount": 50000,
+                "metadata": {"user_id": self.user.id, "purpose": "shop", "shop_thalers": 300},
+            }
+        }
+
+    def webhook(self, data, signature=None):
+        body = json.dumps({"event": "charge.success", "data": data}).encode()
+        return self.client.post(
+            "/api/premium/paystack/webhook/",
+            body,
+            content_type="application/json",
+            HTTP_X_PAYSTACK_SIGNATURE=signature or paystack.sign(body),
+        )
+
+    def test_verify_credits_once(self):
+        for _ in range(3):
+            response = self.client.post("/api/premium/paystack/verify/", {"reference": "ref-1"}, format="json")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["thalers_awarded"], 300)
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.thalers, 300)
+        # settled after the first call; later calls answer locally
+        self.assertEqual(StubPaystack.hits, ["ref-1"])
+        self.assertEqual(DailyMetric.objects.get().payments, 1)
+
+    def test_webhook_settles_and_rejects_bad_signatures(self):
+        data = StubPaystack.transactions["ref-1"]
+        self.assertEqual(self.webhook(data, signature="bogus").status_code, 401)
+        self.assertEqual(Payment.objects.get(reference="ref-1").status, "initialized")
+
+        self.assertEqual(self.webhook(data).status_code, 200)
+        self.assertEqual(self.webhook(data).status_code, 200)  # redelivery
+
+        response = self.client.post("/api/premium/paystack/verify/", {"reference": "ref-1"}, format="json")
+        self.assertEqual(response.json()["new_balance"], 300)
+        self.assertEqual(StubPaystack.hits, [])
+
+        fail_payment("ref-1", "reversed")
+        self.assertEqual(Payment.objects.get(reference="ref-1").status, "success")
+
+    def test_complete_payment_creates_missing_row(self):
+        payment, credited = complete_payment("ref-2", thalers=5, user_id=self.user.id, defaults={"amount": 10})
+        self.assertTrue(credited)
+        _, credited = complete_payment("ref-2", thalers=5)
+        self.assertFalse(credited)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.thalers, 5)
+
+    def test_buy_thalers_only_settles_its_own_payments(self):
+        self.client.force_authenticate(self.user)
+        Payment.objects.create(user=self.user, amount=9000, reference="premium-1", status="pending", purpose="premium")
+        for reference in ("premium-1", "ref-1"):
+            response = self.client.post("/api/premium/buy-thalers/", {"reference": reference, "thalers": 999}, format="json")
+            self.assertEqual(response.status_code, 400)
+        self.assertEqual(Payment.objects.get(reference="premium-1").status, "pending")
+        self.assertFalse(DailyMetric.objects.filter(payments__gt=0).exists())
+
+        for _ in range(2):  # a replay is a no-op
+            response = self.client.post("/api/premium/buy-thalers/", {"reference": "own-1", "thalers": 7}, format="json")
+            self.assertEqual(response.json()["thalers"], 7)
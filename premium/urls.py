@@ -18,4 +18,5 @@ urlpatterns = [
 
     path("paystack/create-session/", views_paystack.create_paystack_session),
     path("paystack/verify/", views_paystack.verify_paystack_transaction),
+    path("paystack/webhook/", views_paystack.paystack_webhook, name="paystack_webhook"),
 ]
\ No newline at end of file
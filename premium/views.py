@@ -4,9 +4,10 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from .models import Payment, DiscountCode, CreatorEarning
 from .serializers import PaymentSerializer, CreatorEarningSerializer
+from .payments import complete_payment
+from users import ledger
 import uuid
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
-from django.db import transaction
 from django.conf import settings
 
 # Create a payment record (mock or pre-init before calling Paystack)
@@ -44,20 +45,16 @@ def verify_payment(request):
     if not payment:
         return Response({"detail": "Payment not found."}, status=status.HTTP_404_NOT_FOUND)
 
-    # simple mock verification:
-    with transaction.atomic():
-        payment.status = "success"
-        payment.save(update_fields=["status"])
-        request.user.is_premium = True
-        # Example: award thalers based on amount; adjust formula as needed
-        try:
-            thalers_awarded = int(payment.amount) // 10
-        except Exception:
-            thalers_awarded = 0
-        request.user.thalers = getattr(request.user, "thalers", 0) + thalers_awarded
-        request.user.save()
+    # simple mock verification; award thalers based on amount, adjust formula as needed
+    try:
+        thalers_awarded = int(payment.amount) // 10
+    except Exception:
+        thalers_awarded = 0
+
+    # settles at most once: repeated calls return the original award
+    payment, _ = complete_payment(reference, thalers=thalers_awarded, premium=True)
 
-    return Response({"detail": "Payment verified. User upgraded to premium.", "thalers_awarded": thalers_awarded})
+    return Response({"detail": "Payment verified. User upgraded to premium.", "thalers_awarded": payment.thalers_awarded})
 
 
 class PaymentHistoryView(generics.ListAPIView):
@@ -110,10 +107,11 @@ def add_thalers(request):
     except (ValueError, TypeError):
         return Response({"detail": "amount must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
 
-    user = request.user
-    user.thalers = getattr(user, "thalers", 0) + amount
-    user.save(update_fields=["thalers"])
-    return Response({"detail": f"Added {amount} thalers.", "thalers": user.thalers}, status=status.HTTP_200_OK)
+    if amount <= 0:
+        return Response({"detail": "amount must be positive"}, status=status.HTTP_400_BAD_REQUEST)
+
+    tx = ledger.credit(request.user.id, amount, reason="add_thalers")
+    return Response({"detail": f"Added {amount} thalers.", "thalers": tx.balance_after}, status=status.HTTP_200_OK)
 
 
 @api_view(["POST"])
@@ -156,11 +154,21 @@ def buy_thalers(request):
         return Response({"error": "Invalid request"}, status=status.HTTP_400_BAD_REQUEST)
 
     user = request.user
-    user.thalers = getattr(user, "thalers", 0) + thalers
-    user.save(update_fields=["thalers"])
+    existing = Payment.objects.filter(reference=reference).only("user_id", "purpose", "status").first()
+    # only rows this endpoint created: another flow's pending payment must not be settled here
+    if existing and (
+        existing.user_id != user.id or existing.purpose != "buy_thalers" or existing.status not in ("created", "success")
+    ):
+        return Response({"error": "Invalid request"}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Optionally create a Payment record for bookkeeping
-    Payment.objects.create(user=user, amount=thalers, reference=reference, status="success", purpose="buy_thalers")
+    # A Payment record keyed by the reference makes a replayed request a no-op
+    complete_payment(
+        reference,
+        thalers=thalers,
+        user_id=user.id,
+        defaults={"amount": thalers, "purpose": "buy_thalers", "status": "created"},
+    )
+    user.refresh_from_db(fields=["thalers"])
     return Response({"message": "Thalers added successfully", "thalers": user.thalers}, status=status.HTTP_200_OK)
 
 
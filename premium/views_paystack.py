@@ -1,24 +1,21 @@
 # premium/views_paystack.py
+import json
+
 import requests
 from django.conf import settings
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework import status
 from django.contrib.auth import get_user_model
-from django.db import transaction
 from .models import Payment  # ensure Payment model exists in premium.models
+from . import paystack
+from .payments import complete_payment, fail_payment, paystack_rewards
 import logging
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
-PAYSTACK_SECRET = getattr(settings, "PAYSTACK_SECRET_KEY", None)
-PAYSTACK_PUBLIC = getattr(settings, "PAYSTACK_PUBLIC_KEY", None)
-PAYSTACK_VERIFY_URL = "https://api.paystack.co/transaction/verify/{}"
-PAYSTACK_INIT_URL = "https://api.paystack.co/transaction/initialize"
-REQUEST_TIMEOUT = 10  # seconds
-
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
@@ -48,7 +45,7 @@ def create_paystack_session(request):
     # 2) Currency
     currency = getattr(settings, "PAYSTACK_CURRENCY", "NGN")
 
-    if not PAYSTACK_SECRET:
+    if not paystack.secret_key():
         return Response(
             {"detail": "Payment gateway not configured"},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -87,12 +84,7 @@ def create_paystack_session(request):
             payload["plan"] = plan_code
 
     try:
-        resp = requests.post(
-            PAYSTACK_INIT_URL,
-            json=payload,
-            headers={"Authorization": f"Bearer {PAYSTACK_SECRET}"},
-            timeout=REQUEST_TIMEOUT,
-        )
+        resp = paystack.initialize_transaction(payload)
     except requests.RequestException as e:
         logger.exception("Paystack init error")
         return Response(
@@ -124,6 +116,7 @@ def create_paystack_session(request):
             reference=reference,
             status="initialized",
             purpose=metadata.get("purpose", ""),
+            payment_method="paystack",
         )
     except Exception:
         logger.exception("Failed to create Payment record")
@@ -134,6 +127,46 @@ def create_paystack_session(request):
     )
 
 
+def _settle(reference, data, payment=None):
+    """Apply a Paystack transaction payload to the local Payment, idempotently."""
+    status_str = data.get("status")
+    if status_str != "success":
+        fail_payment(reference, status_str)
+        return None, False, {}
+
+    metadata = data.get("metadata") or {}
+    uid = metadata.get("user_id")
+    if uid and not User.objects.filter(pk=uid).exists():
+        uid = None
+
+    rewards = paystack_rewards(data, payment)
+    payment, credited = complete_payment(
+        reference,
+        thalers=rewards["thalers"],
+        premium=rewards["premium"],
+        plan_key=rewards["plan_key"],
+        user_id=uid,
+        defaults={
+            "amount": data.get("amount") or 0,
+            "purpose": rewards["purpose"],
+            "payment_method": "paystack",
+        },
+    )
+    return payment, credited, rewards
+
+
+def _success_response(payment, purpose):
+    user = User.objects.filter(pk=payment.user_id).only("thalers").first() if payment else None
+    return Response(
+        {
+            "status": "success",
+            "thalers_awarded": payment.thalers_awarded if payment else 0,
+            "new_balance": user.thalers if user else None,
+            "purpose": purpose,
+        },
+        status=status.HTTP_200_OK,
+    )
+
 
 @api_view(["POST"])
 @permission_classes([AllowAny])
@@ -141,9 +174,9 @@ def verify_paystack_transaction(request):
     """
     Verify transaction by reference (frontend will POST { "reference": "<ref>" }).
 
-    - Reads metadata.user_id, metadata.plan_key, metadata.shop_thalers, metadata.purpose.
-    - Marks Payment as success/failed.
-    - Updates user.thalers, user.is_premium, user.subscription_plan.
+    - Already settled (e.g. by the webhook): answers from the local row, no provider call.
+    - Otherwise asks Paystack and settles through premium.payments, which credits
+      thalers / premium exactly once however often this is called.
     """
     reference = request.data.get("reference")
     if not reference:
@@ -152,17 +185,18 @@ def verify_paystack_transaction(request):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    if not PAYSTACK_SECRET:
+    payment = Payment.objects.filter(reference=reference).first()
+    if payment and payment.status == "success":
+        return _success_response(payment, payment.purpose)
+
+    if not paystack.secret_key():
         return Response(
             {"detail": "Payment gateway not configured"},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
 
-    url = PAYSTACK_VERIFY_URL.format(reference)
-    headers = {"Authorization": f"Bearer {PAYSTACK_SECRET}"}
-
     try:
-        resp = requests.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+        resp = paystack.verify_transaction(reference)
     except requests.RequestException as e:
         logger.exception("Paystack verify request failed")
         return Response(
@@ -181,89 +215,43 @@ def verify_paystack_transaction(request):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    payload = resp.json().get("data", {})
-    status_str = payload.get("status")
-    metadata = payload.get("metadata", {}) or {}
-
-    uid = metadata.get("user_id")
-    user = None
-    if uid:
-        try:
-            user = User.objects.get(pk=uid)
-        except User.DoesNotExist:
-            user = None
-
-    # Find local Payment record if exists
-    payment = Payment.objects.filter(reference=reference).first()
+    payload = resp.json().get("data", {}) or {}
+    payment, _, rewards = _settle(reference, payload, payment)
 
     # If transaction is not successful, record status and return (no coins, no premium)
-    if status_str != "success":
-        if payment:
-            payment.status = status_str or "failed"
-            payment.save(update_fields=["status"])
+    if payload.get("status") != "success":
         return Response(
-            {"status": status_str, "raw": payload},
+            {"status": payload.get("status"), "raw": payload},
             status=status.HTTP_200_OK,
         )
 
-    # ---- SUCCESS PATH ----
-    amount_kobo = int(payload.get("amount", 0))
-    major_amount = amount_kobo // 100
+    return _success_response(payment, rewards["purpose"])
 
-    # Base rule: 1 thaler per 10 currency units
-    thalers_awarded = major_amount // 10
 
-    purpose = metadata.get("purpose", "") or (payment.purpose if payment else "")
-
-    # Try to get plan_key from metadata first (for subscriptions)
-    plan_key = metadata.get("plan_key")
+@api_view(["POST"])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def paystack_webhook(request):
+    """
+    Paystack event callback. The raw body must carry a valid
+    X-Paystack-Signature (HMAC-SHA512 with the secret key). charge.success
+    settles the payment without a round trip back to Paystack; other
+    events are acknowledged and ignored.
+    """
+    body = request.body
+    if not paystack.valid_signature(body, request.headers.get("X-Paystack-Signature")):
+        return Response({"detail": "invalid signature"}, status=status.HTTP_401_UNAUTHORIZED)
 
-    # If not present, try to parse from purpose like "subscription_warrior"
-    if not plan_key and purpose:
-        lower = purpose.lower()
-        if "subscription_" in lower:
-            plan_key = lower.split("subscription_", 1)[1] or None
+    try:
+        event = json.loads(body)
+    except ValueError:
+        return Response({"detail": "invalid payload"}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Shop-specific override: if this is a shop purchase and shop_thalers is provided,
-    # use that exact number of thalers instead of the generic rule.
-    shop_thalers = metadata.get("shop_thalers")
-    if shop_thalers is not None and purpose and "shop" in purpose.lower():
-        try:
-            thalers_awarded = int(shop_thalers)
-        except (ValueError, TypeError):
-            # if parsing fails, fall back to generic rule
-            pass
-
-    with transaction.atomic():
-        # Update local Payment record
-        if payment:
-            payment.status = "success"
-            try:
-                payment.user = user or payment.user
-                payment.save(update_fields=["status", "user"])
-            except Exception:
-                payment.save(update_fields=["status"])
-
-        # Update user account (thalers, premium flag, subscription_plan)
-        if user:
-            # Add thalers (from subscription rule or shop override)
-            user.thalers = getattr(user, "thalers", 0) + thalers_awarded
-
-            # Subscriptions upgrade premium
-            if purpose and "subscription" in purpose.lower():
-                user.is_premium = True
-                if plan_key:
-                    # e.g. "basic", "scholar", "warrior", "elite"
-                    user.subscription_plan = plan_key
-
-            user.save(update_fields=["thalers", "is_premium", "subscription_plan"])
+    data = event.get("data") or {}
+    reference = data.get("reference")
+    if event.get("event") == "charge.success" and reference:
+        _, credited, _ = _settle(reference, data)
+        logger.info("Paystack webhook charge.success %s (credited=%s)", reference, credited)
 
-    return Response(
-        {
-            "status": "success",
-            "thalers_awarded": thalers_awarded,
-            "new_balance": getattr(user, "thalers", 0) if user else None,
-            "purpose": purpose,
-        },
-        status=status.HTTP_200_OK,
-    )
+    # Paystack retries anything but a 200
+    return Response({"status": "ok"}, status=status.HTTP_200_OK)
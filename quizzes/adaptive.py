@@ -0,0 +1,292 @@
+# quizzes/adaptive.py
+"""
+Adaptive question selection.
+
+Users (UserSkill) and questions (QuestionDifficulty) share one Elo scale.
+After grading, both ratings move towards the observed outcome; on selection we
+aim for questions the user answers correctly with probability TARGET_SUCCESS.
+
+Selection runs against an in-process index of approved questions sorted by
+rating (rebuilt when the catalogue changes or every INDEX_TTL seconds), so a
+pick is a bisect plus a short walk outwards: no database work beyond fetching
+the chosen questions. Recently served questions are tracked per user in the
+cache and skipped while unseen alternatives exist.
+"""
+import bisect
+import math
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, F, FloatField, Value, When
+
+from .models import Question, QuestionDifficulty, QuestionResponse, UserSkill
+
+DEFAULT_RATING = 1000.0
+LABEL_RATINGS = {"easy": 850.0, "medium": 1000.0, "hard": 1150.0}
+
+TARGET_SUCCESS = getattr(settings, "ADAPTIVE_TARGET_SUCCESS", 0.7)
+RECENT_LIMIT = getattr(settings, "ADAPTIVE_RECENT_LIMIT", 200)
+INDEX_TTL = getattr(settings, "ADAPTIVE_INDEX_TTL", 300)
+
+INDEX_VERSION_KEY = "adaptive:index:version"
+SKILL_KEY = "adaptive:skill:{}"
+SEEN_KEY = "adaptive:seen:{}"
+CACHE_TIMEOUT = 60 * 60 * 24 * 7
+
+
+def expected_score(user_rating, question_rating):
+    """Probability that a user of `user_rating` answers the question correctly."""
+    return 1.0 / (1.0 + 10 ** ((question_rating - user_rating) / 400.0))
+
+
+def k_factor(answered):
+    """Large steps while an estimate is fresh, settling as evidence accumulates."""
+    return max(12.0, 48.0 / (1 + answered / 30.0))
+
+
+def initial_rating(difficulty):
+    return LABEL_RATINGS.get(difficulty, DEFAULT_RATING)
+
+
+# ---------- INDEX ----------
+
+
+class QuestionIndex:
+    """
+    Snapshot of approved questions: id -> (quiz_id, category_id, quiz difficulty,
+    question difficulty, rating). Filtered pools are sorted by rating and
+    memoised the first time they are asked for.
+    """
+
+    def __init__(self, rows, version):
+        self.rows = {row[0]: row[1:] for row in rows}
+        self.version = version
+        self.built_at = time.monotonic()
+        self._pools = {}
+
+    @classmethod
+    def build(cls, version):
+        rows = Question.objects.filter(quiz__status="approved").values_list(
+            "id",
+            "quiz_id",
+            "quiz__category_id",
+            "quiz__difficulty",
+            "difficulty",
+            "calibration__rating",
+        )
+        return cls(
+            [
+                (qid, quiz_id, category_id, quiz_difficulty, difficulty,
+                 rating if rating is not None else initial_rating(difficulty))
+                for qid, quiz_id, category_id, quiz_difficulty, difficulty, rating in rows
+            ],
+            version,
+        )
+
+    def is_stale(self, version):
+        return self.version != version or time.monotonic() - self.built_at > INDEX_TTL
+
+    def pool(self, quiz_id=None, category_id=None, quiz_difficulty=None, question_difficulty=None):
+        quiz_difficulty = quiz_difficulty.lower() if quiz_difficulty else None
+        key = (quiz_id, category_id, quiz_difficulty, question_difficulty)
+
+        pool = self._pools.get(key)
+        if pool is not None:
+            return pool
+
+        entries = sorted(
+            (rating, qid)
+            for qid, (q_quiz, q_category, q_quiz_difficulty, q_difficulty, rating) in self.rows.items()
+            if (quiz_id is None or q_quiz == quiz_id)
+            and (category_id is None or q_category == category_id)
+            and (quiz_difficulty is None or q_quiz_difficulty == quiz_difficulty)
+            and (question_difficulty is None or q_difficulty == question_difficulty)
+        )
+        pool = self._pools[key] = ([rating for rating, _ in entries], [qid for _, qid in entries])
+        return pool
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    global _index
+    version = cache.get(INDEX_VERSION_KEY, 0)
+    index = _index
+    if index is None or index.is_stale(version):
+        with _index_lock:
+            index = _index
+            if index is None or index.is_stale(version):
+                index = _index = QuestionIndex.build(version)
+    return index
+
+
+def invalidate_index():
+    """Force every process to rebuild its index on the next selection."""
+    try:
+        cache.incr(INDEX_VERSION_KEY)
+    except ValueError:
+        cache.set(INDEX_VERSION_KEY, 1, None)
+
+
+# ---------- PER-USER STATE ----------
+
+
+def get_skills(user_ids):
+    """{user_id: rating}, served from the cache with one DB query for misses."""
+    keys = {SKILL_KEY.format(uid): uid for uid in user_ids}
+    cached = cache.get_many(keys.keys())
+    skills = {keys[key]: rating for key, rating in cached.items()}
+
+    missing = [uid for uid in user_ids if uid not in skills]
+    if missing:
+        found = dict(UserSkill.objects.filter(user_id__in=missing).values_list("user_id", "rating"))
+        for uid in missing:
+            skills[uid] = found.get(uid, DEFAULT_RATING)
+        cache.set_many({SKILL_KEY.format(uid): skills[uid] for uid in missing}, CACHE_TIMEOUT)
+    return skills
+
+
+def recently_seen(user_id):
+    seen = cache.get(SEEN_KEY.format(user_id))
+    if seen is None:
+        seen = list(
+            QuestionResponse.objects.filter(user_id=user_id)
+            .order_by("-created_at")
+            .values_list("question_id", flat=True)[:RECENT_LIMIT]
+        )
+        cache.set(SEEN_KEY.format(user_id), seen, CACHE_TIMEOUT)
+    return seen
+
+
+def mark_seen(user_ids, question_ids):
+    for uid in user_ids:
+        fresh = set(question_ids)
+        seen = list(question_ids) + [qid for qid in recently_seen(uid) if qid not in fresh]
+        cache.set(SEEN_KEY.format(uid), seen[:RECENT_LIMIT], CACHE_TIMEOUT)
+
+
+# ---------- SELECTION ----------
+
+
+def target_rating(skill, target_success=TARGET_SUCCESS):
+    """Question rating a user of `skill` answers correctly with `target_success` probability."""
+    return skill + 400.0 * math.log10((1 - target_success) / target_success)
+
+
+def select_questions(user_ids, count, **filters):
+    """
+    Pick up to `count` question ids from the pool described by `filters`
+    (see QuestionIndex.pool) whose difficulty is closest to the target for the
+    given users (the mean skill when several play together, e.g. multiplayer).
+    """
+    ratings, ids = get_index().pool(**filters)
+    if not ids:
+        return []
+
+    skills = get_skills(user_ids)
+    skill = sum(skills.values()) / len(skills) if skills else DEFAULT_RATING
+    target = target_rating(skill)
+
+    seen = set()
+    for uid in user_ids:
+        seen.update(recently_seen(uid))
+
+    # walk outwards from the target, nearest rating first
+    window = max(count * 3, count + 2)
+    candidates, fallback = [], []
+    hi = bisect.bisect_left(ratings, target)
+    lo = hi - 1
+    while len(candidates) < window and (lo >= 0 or hi < len(ids)):
+        if hi >= len(ids) or (lo >= 0 and target - ratings[lo] <= ratings[hi] - target):
+            qid = ids[lo]
+            lo -= 1
+        else:
+            qid = ids[hi]
+            hi += 1
+
+        if qid in seen:
+            if len(fallback) < count:
+                fallback.append(qid)
+            continue
+        candidates.append(qid)
+
+    chosen = random.sample(candidates, min(count, len(candidates)))
+    chosen += fallback[: count - len(chosen)]
+
+    mark_seen(user_ids, chosen)
+    return chosen
+
+
+def fetch_selected(question_ids):
+    """Load the chosen questions (with options) preserving selection order."""
+    questions = Question.objects.filter(pk__in=question_ids).prefetch_related("options")
+    by_id = {q.id: q for q in questions}
+    return [by_id[qid] for qid in question_ids if qid in by_id]
+
+
+# ---------- UPDATES ----------
+
+
+def update_ratings(user_id, graded):
+    """
+    Apply Elo updates for one user's graded answers: the user's rating moves
+    by the sum of surprises, each question's rating by the opposite amount.
+    One row lock on UserSkill and a single UPDATE for all questions.
+    """
+    if not graded:
+        return
+
+    question_ids = [g.question_id for g in graded]
+
+    with transaction.atomic():
+        skill, _ = UserSkill.objects.select_for_update().get_or_create(user_id=user_id)
+
+        current = {
+            qid: (rating, answered)
+            for qid, rating, answered in QuestionDifficulty.objects.filter(
+                pk__in=question_ids
+            ).values_list("question_id", "rating", "answered")
+        }
+        missing = [qid for qid in question_ids if qid not in current]
+        if missing:
+            labels = dict(Question.objects.filter(pk__in=missing).values_list("id", "difficulty"))
+            new_rows = [
+                QuestionDifficulty(question_id=qid, rating=initial_rating(labels.get(qid)))
+                for qid in missing
+                if qid in labels
+            ]
+            QuestionDifficulty.objects.bulk_create(new_rows, ignore_conflicts=True)
+            current.update({row.question_id: (row.rating, 0) for row in new_rows})
+
+        user_rating = skill.rating
+        deltas = {}
+        for g in graded:
+            if g.question_id not in current:
+                continue
+            q_rating, q_answered = current[g.question_id]
+            surprise = (1.0 if g.is_correct else 0.0) - expected_score(user_rating, q_rating)
+            user_rating += k_factor(skill.answered) * surprise
+            deltas[g.question_id] = -k_factor(q_answered) * surprise
+
+        skill.rating = user_rating
+        skill.answered += len(deltas)
+        skill.save(update_fields=["rating", "answered", "updated_at"])
+
+        if deltas:
+            QuestionDifficulty.objects.filter(pk__in=deltas.keys()).update(
+                rating=F("rating")
+                + Case(
+                    *[When(pk=qid, then=Value(delta)) for qid, delta in deltas.items()],
+                    default=Value(0.0),
+                    output_field=FloatField(),
+                ),
+                answered=F("answered") + 1,
+            )
+
+    cache.set(SKILL_KEY.format(user_id), user_rating, CACHE_TIMEOUT)
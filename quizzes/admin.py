@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Quiz, Question, Option, QuizAttempt, QuizReport
+from .models import Category, Quiz, Question, Option, QuestionFingerprint, QuizAttempt, QuizReport
 
 
 class OptionInline(admin.TabularInline):
@@ -14,11 +14,20 @@ class QuestionInline(admin.TabularInline):
     fields = ("text", "order", "difficulty")
 
 
+@admin.register(Category)
+class CategoryAdmin(admin.ModelAdmin):
+    list_display = ("name", "slug", "approved_quizzes", "approved_questions")
+    search_fields = ("name", "slug")
+    prepopulated_fields = {"slug": ("name",)}
+    readonly_fields = ("approved_quizzes", "approved_questions")
+
+
 @admin.register(Quiz)
 class QuizAdmin(admin.ModelAdmin):
     list_display = ("title", "category", "difficulty", "status", "is_premium", "created_by", "created_at")
     list_filter = ("status", "difficulty", "is_premium", "category")
-    search_fields = ("title", "description", "category")
+    search_fields = ("title", "description", "category__name")
+    list_select_related = ("category", "created_by")
     inlines = [QuestionInline]
 
 
@@ -29,6 +38,15 @@ class QuestionAdmin(admin.ModelAdmin):
     search_fields = ("text",)
 
 
+@admin.register(QuestionFingerprint)
+class QuestionFingerprintAdmin(admin.ModelAdmin):
+    list_display = ("question", "duplicate_of", "similarity")
+    list_filter = (("duplicate_of", admin.EmptyFieldListFilter),)
+    list_select_related = ("question", "duplicate_of")
+    raw_id_fields = ("question", "duplicate_of")
+    exclude = ("signature",)
+
+
 @admin.register(Option)
 class OptionAdmin(admin.ModelAdmin):
     list_display = ("text", "question", "is_correct", "order")
@@ -0,0 +1,351 @@
+# quizzes/analytics.py
+"""
+Incrementally maintained quiz analytics.
+
+Every graded attempt updates a fixed number of rows (quiz totals, the day
+bucket and the score bucket); per-question and per-option rows are rolled up
+from the response log (see quizzes/responses.py). Reads never have to touch
+QuizAttempt:
+
+  - totals          -> one QuizStats row              O(1)
+  - attempts/day    -> QuizDailyStats rows            O(days)
+  - score histogram -> QuizScoreBucket rows           O(buckets)
+  - per question    -> QuestionStats / OptionStats    O(questions + options)
+
+The same attempt also updates the player's side (UserQuizStats, one
+UserQuizBest row per quiz played and one UserCategoryStats row per
+category), so a player's results summary is O(quizzes + categories played)
+instead of a pass over their whole history.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Max, Prefetch, Sum, Value
+from django.db.models.functions import Greatest, TruncDate
+from django.utils import timezone
+
+from .models import (
+    Option,
+    QuizAttempt,
+    QuizStats,
+    QuizDailyStats,
+    QuizScoreBucket,
+    QuestionStats,
+    UserQuizStats,
+    UserQuizBest,
+    UserCategoryStats,
+)
+
+SCORE_BUCKETS = 10
+
+
+def score_bucket(score):
+    return min(int(score) // 10, SCORE_BUCKETS - 1)
+
+
+def _increment(model, lookup, assign=None, **deltas):
+    """Upsert the row for `lookup`, add `deltas` and set `assign` (field -> expression) in one UPDATE."""
+    model.objects.bulk_create([model(**lookup)], ignore_conflicts=True)
+    model.objects.filter(**lookup).update(
+        **{field: F(field) + value for field, value in deltas.items()}, **(assign or {})
+    )
+
+
+# ---------- WRITES ----------
+
+
+def record_attempt(attempt):
+    """
+    Fold a freshly created QuizAttempt into the quiz-level aggregates.
+    """
+    score = float(attempt.score)
+    # "no earlier attempt" rather than "no other": attempts may be folded in after later ones exist
+    first_for_user = not (
+        QuizAttempt.objects.filter(quiz_id=attempt.quiz_id, user_id=attempt.user_id, pk__lt=attempt.pk).exists()
+    )
+
+    with transaction.atomic():
+        _increment(
+            QuizStats,
+            {"quiz_id": attempt.quiz_id},
+            attempts=1,
+            unique_users=1 if first_for_user else 0,
+            score_sum=score,
+            correct_sum=attempt.correct,
+            answered_sum=attempt.total,
+        )
+        _increment(
+            QuizDailyStats,
+            {"quiz_id": attempt.quiz_id, "date": timezone.localdate(attempt.created_at)},
+            attempts=1,
+            score_sum=score,
+        )
+        _increment(
+            QuizScoreBucket,
+            {"quiz_id": attempt.quiz_id, "bucket": score_bucket(score)},
+            count=1,
+        )
+
+        best = {"best_score": Greatest("best_score", Value(score))}
+        _increment(
+            UserQuizStats,
+            {"user_id": attempt.user_id},
+            assign={**best, "last_attempt_at": Value(attempt.created_at)},
+            attempts=1,
+            quizzes_played=1 if first_for_user else 0,
+            score_sum=score,
+            correct_sum=attempt.correct,
+            answered_sum=attempt.total,
+            xp_sum=attempt.xp_earned,
+            thalers_sum=attempt.thalers_earned,
+        )
+        _increment(UserQuizBest, {"user_id": attempt.user_id, "quiz_id": attempt.quiz_id}, assign=best, attempts=1)
+        if attempt.quiz.category_id is not None:
+            _increment(
+                UserCategoryStats,
+                {"user_id": attempt.user_id, "category_id": attempt.quiz.category_id},
+                attempts=1,
+                score_sum=score,
+                correct_sum=attempt.correct,
+                answered_sum=attempt.total,
+            )
+
+
+# ---------- READS ----------
+
+
+def quiz_summary(quiz):
+    stats = QuizStats.objects.filter(quiz=quiz).first()
+    if stats is None:
+        stats = QuizStats(quiz=quiz)
+
+    return {
+        "quiz": quiz.title,
+        "questions": quiz.question_count,
+        "total_attempts": stats.attempts,
+        "average_score": round(stats.average_score, 2),
+        "unique_users": stats.unique_users,
+        "correct_rate": round(stats.correct_sum / stats.answered_sum, 4) if stats.answered_sum else None,
+    }
+
+
+def _rate(correct, answered):
+    return round(correct / answered, 4) if answered else None
+
+
+def user_summary(user):
+    """A player's totals, best score per quiz and per-category breakdown, from the stats rows only."""
+    stats = UserQuizStats.objects.filter(user=user).first()
+    if stats is None:
+        stats = UserQuizStats(user=user)
+
+    bests = UserQuizBest.objects.filter(user=user).order_by("-best_score", "quiz_id")
+    categories = UserCategoryStats.objects.filter(user=user).order_by("category__name")
+
+    return {
+        "total_attempts": stats.attempts,
+        "quizzes_played": stats.quizzes_played,
+        "average_score": round(stats.average_score, 2),
+        "best_score": stats.best_score,
+        "correct_rate": _rate(stats.correct_sum, stats.answered_sum),
+        "xp_earned": stats.xp_sum,
+        "thalers_earned": stats.thalers_sum,
+        "last_attempt_at": stats.last_attempt_at,
+        "best_per_quiz": [
+            {"quiz": row["quiz_id"], "quiz_title": row["quiz__title"], "attempts": row["attempts"], "best_score": row["best_score"]}
+            for row in bests.values("quiz_id", "quiz__title", "attempts", "best_score")
+        ],
+        "categories": [
+            {
+                "category": row["category__name"],
+                "slug": row["category__slug"],
+                "attempts": row["attempts"],
+                "average_score": round(row["score_sum"] / row["attempts"], 2) if row["attempts"] else 0,
+                "correct_rate": _rate(row["correct_sum"], row["answered_sum"]),
+            }
+            for row in categories.values(
+                "category__name", "category__slug", "attempts", "score_sum", "correct_sum", "answered_sum"
+            )
+        ],
+    }
+
+
+def quiz_history(quiz, days=30):
+    since = timezone.localdate() - timedelta(days=days - 1)
+    rows = QuizDailyStats.objects.filter(quiz=quiz, date__gte=since).values("date", "attempts", "score_sum")
+    return [
+        {
+            "date": row["date"],
+            "attempts": row["attempts"],
+            "average_score": round(row["score_sum"] / row["attempts"], 2) if row["attempts"] else 0,
+        }
+        for row in rows
+    ]
+
+
+def score_histogram(quiz):
+    counts = [0] * SCORE_BUCKETS
+    for bucket, count in QuizScoreBucket.objects.filter(quiz=quiz).values_list("bucket", "count"):
+        counts[bucket] = count
+
+    return [
+        {
+            "from": bucket * 10,
+            "to": 100 if bucket == SCORE_BUCKETS - 1 else bucket * 10 + 9,
+            "count": counts[bucket],
+        }
+        for bucket in range(SCORE_BUCKETS)
+    ]
+
+
+def question_breakdown(quiz):
+    questions = quiz.questions.select_related("stats").prefetch_related(
+        Prefetch("options", queryset=Option.objects.select_related("stats"))
+    )
+
+    data = []
+    for q in questions:
+        stats = getattr(q, "stats", None) or QuestionStats(question=q)
+        options = list(q.options.all())
+        picks = {o.id: (o.stats.picks if hasattr(o, "stats") else 0) for o in options}
+        total_picks = sum(picks.values())
+
+        discrimination = stats.discrimination
+        data.append(
+            {
+                "id": q.id,
+                "text": q.text,
+                "difficulty": q.difficulty,
+                "answered": stats.answered,
+                "correct_rate": round(stats.correct_rate, 4) if stats.correct_rate is not None else None,
+                "discrimination": round(discrimination, 4) if discrimination is not None else None,
+                "options": [
+                    {
+                        "id": o.id,
+                        "text": o.text,
+                        "is_correct": o.is_correct,
+                        "picks": picks[o.id],
+                        "pick_rate": round(picks[o.id] / total_picks, 4) if total_picks else None,
+                    }
+                    for o in options
+                ],
+            }
+        )
+    return data
+
+
+# ---------- REBUILD ----------
+
+
+def rebuild_quiz_stats(quiz_ids=None):
+    """
+    Recompute quiz totals, daily rows and the histogram from QuizAttempt.
+    Per-question stats come from the response log: see responses.rebuild_question_stats().
+    """
+    attempts = QuizAttempt.objects.all()
+    if quiz_ids is not None:
+        attempts = attempts.filter(quiz_id__in=quiz_ids)
+
+    totals = attempts.values("quiz_id").annotate(
+        n=Count("id"),
+        users=Count("user", distinct=True),
+        score=Sum("score"),
+        correct=Sum("correct"),
+        answered=Sum("total"),
+    ).order_by()
+    daily = (
+        attempts.annotate(day=TruncDate("created_at"))
+        .values("quiz_id", "day")
+        .annotate(n=Count("id"), score=Sum("score"))
+        .order_by()
+    )
+    buckets = {}
+    for quiz_id, score in attempts.values_list("quiz_id", "score").iterator(chunk_size=2000):
+        key = (quiz_id, score_bucket(score))
+        buckets[key] = buckets.get(key, 0) + 1
+
+    scope = {} if quiz_ids is None else {"quiz_id__in": quiz_ids}
+    with transaction.atomic():
+        QuizStats.objects.filter(**scope).delete()
+        QuizDailyStats.objects.filter(**scope).delete()
+        QuizScoreBucket.objects.filter(**scope).delete()
+
+        QuizStats.objects.bulk_create(
+            QuizStats(
+                quiz_id=row["quiz_id"],
+                attempts=row["n"],
+                unique_users=row["users"],
+                score_sum=row["score"] or 0,
+                correct_sum=row["correct"] or 0,
+                answered_sum=row["answered"] or 0,
+            )
+            for row in totals
+        )
+        QuizDailyStats.objects.bulk_create(
+            QuizDailyStats(quiz_id=row["quiz_id"], date=row["day"], attempts=row["n"], score_sum=row["score"] or 0)
+            for row in daily
+        )
+        QuizScoreBucket.objects.bulk_create(
+            QuizScoreBucket(quiz_id=quiz_id, bucket=bucket, count=count)
+            for (quiz_id, bucket), count in buckets.items()
+        )
+
+
+def rebuild_user_stats(user_ids=None):
+    """Recompute players' totals, per-quiz bests and per-category rows from QuizAttempt."""
+    attempts = QuizAttempt.objects.all()
+    if user_ids is not None:
+        attempts = attempts.filter(user_id__in=user_ids)
+
+    totals = attempts.values("user_id").annotate(
+        n=Count("id"),
+        quizzes=Count("quiz", distinct=True),
+        best=Max("score"),
+        scores=Sum("score"),
+        correct=Sum("correct"),
+        answered=Sum("total"),
+        xp=Sum("xp_earned"),
+        thalers=Sum("thalers_earned"),
+        last=Max("created_at"),
+    ).order_by()
+    bests = attempts.values("user_id", "quiz_id").annotate(n=Count("id"), best=Max("score")).order_by()
+    categories = attempts.filter(quiz__category__isnull=False).values("user_id", "quiz__category_id").annotate(
+        n=Count("id"), score=Sum("score"), correct=Sum("correct"), answered=Sum("total")
+    ).order_by()
+
+    scope = {} if user_ids is None else {"user_id__in": user_ids}
+    with transaction.atomic():
+        UserQuizStats.objects.filter(**scope).delete()
+        UserQuizBest.objects.filter(**scope).delete()
+        UserCategoryStats.objects.filter(**scope).delete()
+
+        UserQuizStats.objects.bulk_create(
+            UserQuizStats(
+                user_id=row["user_id"],
+                attempts=row["n"],
+                quizzes_played=row["quizzes"],
+                score_sum=row["scores"] or 0,
+                best_score=row["best"] or 0,
+                correct_sum=row["correct"] or 0,
+                answered_sum=row["answered"] or 0,
+                xp_sum=row["xp"] or 0,
+                thalers_sum=row["thalers"] or 0,
+                last_attempt_at=row["last"],
+            )
+            for row in totals
+        )
+        UserQuizBest.objects.bulk_create(
+            UserQuizBest(user_id=row["user_id"], quiz_id=row["quiz_id"], attempts=row["n"], best_score=row["best"] or 0)
+            for row in bests
+        )
+        UserCategoryStats.objects.bulk_create(
+            UserCategoryStats(
+                user_id=row["user_id"],
+                category_id=row["quiz__category_id"],
+                attempts=row["n"],
+                score_sum=row["score"] or 0,
+                correct_sum=row["correct"] or 0,
+                answered_sum=row["answered"] or 0,
+            )
+            for row in categories
+        )
@@ -0,0 +1,129 @@
+# quizzes/authoring.py
+"""
+Whole-tree quiz authoring.
+
+sync_questions() takes the full list of questions (each with its options)
+as the client wants it, diffs it against what is stored and applies the
+difference with bulk statements: one DELETE per table for removed rows,
+one bulk_update per table for changed rows and one bulk_create per table
+for new ones. Position in the list is the order. Rows are matched by id;
+items without an id are new.
+"""
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from .models import Question, Option
+from .ordering import STEP
+from .signals import quiz_content_changed
+
+QUESTION_FIELDS = ["text", "difficulty", "order"]
+OPTION_FIELDS = ["text", "is_correct", "order"]
+
+
+def _changed(row, values):
+    changed = False
+    for field, value in values.items():
+        if getattr(row, field) != value:
+            setattr(row, field, value)
+            changed = True
+    return changed
+
+
+def sync_questions(quiz, questions):
+    """
+    Make `quiz`'s questions and options match `questions`:
+    [{"id"?, "text", "difficulty"?, "options"?: [{"id"?, "text", "is_correct"}]}].
+    A stored question sent without "options" keeps the options it has.
+    Raises ValidationError (and changes nothing) for ids that do not belong
+    to this quiz / question. Returns {"created", "updated", "deleted"} row counts.
+    """
+    stored_questions = {q.id: q for q in Question.objects.filter(quiz=quiz).only("id", *QUESTION_FIELDS)}
+    stored_options = {
+        o.id: o
+        for o in Option.objects.filter(question_id__in=stored_questions.keys()).only("id", "question_id", *OPTION_FIELDS)
+    }
+
+    new_questions, changed_questions, kept_questions = [], [], set()
+    new_options, changed_options, kept_options = [], [], set()
+    pending_options = []  # (Question, options data) for questions created in this call
+
+    for position, data in enumerate(questions):
+        values = {
+            "text": data["text"],
+            "difficulty": data.get("difficulty") or quiz.difficulty,
+            "order": position * STEP,
+        }
+        qid = data.get("id")
+        if qid is None:
+            question = Question(quiz=quiz, **values)
+            new_questions.append(question)
+            pending_options.append((question, data.get("options", [])))
+            continue
+
+        question = stored_questions.get(qid)
+        if question is None or qid in kept_questions:
+            raise ValidationError({"questions": [f"Question {qid} does not belong to this quiz."]})
+        kept_questions.add(qid)
+        if _changed(question, values):
+            changed_questions.append(question)
+        if "options" not in data:
+            kept_options.update(oid for oid, o in stored_options.items() if o.question_id == qid)
+            continue
+
+        for option_position, option in enumerate(data.get("options", [])):
+            option_values = {
+                "text": option["text"],
+                "is_correct": option.get("is_correct", False),
+                "order": option_position * STEP,
+            }
+            oid = option.get("id")
+            if oid is None:
+                new_options.append(Option(question_id=qid, **option_values))
+                continue
+            stored = stored_options.get(oid)
+            if stored is None or stored.question_id != qid or oid in kept_options:
+                raise ValidationError({"questions": [f"Option {oid} does not belong to question {qid}."]})
+            kept_options.add(oid)
+            if _changed(stored, option_values):
+                changed_options.append(stored)
+
+    for question, options in pending_options:
+        if any(option.get("id") is not None for option in options):
+            raise ValidationError({"questions": ["A new question cannot reuse existing options."]})
+
+    removed_questions = stored_questions.keys() - kept_questions
+    removed_options = {
+        oid for oid, o in stored_options.items() if o.question_id in kept_questions and oid not in kept_options
+    }
+
+    with transaction.atomic():
+        if removed_options:
+            Option.objects.filter(pk__in=removed_options).delete()
+        if removed_questions:
+            Question.objects.filter(pk__in=removed_questions).delete()
+
+        Question.objects.bulk_update(changed_questions, QUESTION_FIELDS)
+        Option.objects.bulk_update(changed_options, OPTION_FIELDS)
+
+        Question.objects.bulk_create(new_questions)
+        for question, options in pending_options:
+            new_options.extend(
+                Option(
+                    question_id=question.pk,
+                    text=option["text"],
+                    is_correct=option.get("is_correct", False),
+                    order=position * STEP,
+                )
+                for position, option in enumerate(options)
+            )
+        Option.objects.bulk_create(new_options)
+
+    counts = {
+        "created": len(new_questions) + len(new_options),
+        "updated": len(changed_questions) + len(changed_options),
+        "deleted": len(removed_questions) + len(removed_options),
+    }
+    if any(counts.values()):
+        # bulk writes send no post_save
+        quiz_content_changed.send(sender=type(quiz), quiz_ids=[quiz.id])
+    return counts
@@ -0,0 +1,85 @@
+# quizzes/categories.py
+"""
+Category lookups and the denormalised per-category counters.
+
+Categories are identified by slug: "Science", "science " and "SCIENCE" are
+the same category. resolve() maps free-text names (API input, quiz packs)
+onto Category rows, creating missing ones in bulk.
+
+Category.approved_quizzes / approved_questions count what is visible: the
+approved quizzes in the category and their questions. Single-row writes
+adjust them with F() deltas (see quizzes.signals); bulk writes, which send
+no row signals, recount the categories they touched with refresh_counts().
+"""
+from django.db.models import Count, F, Q
+from django.utils.text import slugify
+
+from .models import Category, Question, Quiz
+
+FALLBACK_SLUG = "uncategorised"
+
+
+def slug_for(name):
+    return slugify(name.strip())[:100] or FALLBACK_SLUG
+
+
+def lookup(value):
+    """The Category whose slug or name matches `value` (case-insensitively), or None."""
+    value = (value or "").strip()
+    if not value:
+        return None
+    return Category.objects.filter(Q(slug=slug_for(value)) | Q(name__iexact=value)).first()
+
+
+def resolve(names):
+    """{name: Category} for every non-blank name, creating missing categories (two queries)."""
+    by_slug = {}
+    for name in names:
+        if name and name.strip():
+            by_slug.setdefault(slug_for(name), name.strip())
+    if not by_slug:
+        return {}
+
+    Category.objects.bulk_create(
+        [Category(name=name, slug=slug) for slug, name in by_slug.items()], ignore_conflicts=True
+    )
+    categories = {c.slug: c for c in Category.objects.filter(slug__in=by_slug.keys())}
+    return {name: categories[slug_for(name)] for name in names if name and name.strip()}
+
+
+# ---------- COUNTERS ----------
+
+
+def adjust(category_id, quizzes=0, questions=0):
+    if category_id is not None and (quizzes or questions):
+        Category.objects.filter(pk=category_id).update(
+            approved_quizzes=F("approved_quizzes") + quizzes,
+            approved_questions=F("approved_questions") + questions,
+        )
+
+
+def refresh_counts(category_ids=None):
+    """Recount approved quizzes and questions for these categories (all of them when None)."""
+    categories = Category.objects.all()
+    quizzes = Quiz.objects.filter(status="approved", category__isnull=False)
+    questions = Question.objects.filter(quiz__status="approved", quiz__category__isnull=False)
+    if category_ids is not None:
+        category_ids = [cid for cid in set(category_ids) if cid is not None]
+        if not category_ids:
+            return 0
+        categories = categories.filter(pk__in=category_ids)
+        quizzes = quizzes.filter(category_id__in=category_ids)
+        questions = questions.filter(quiz__category_id__in=category_ids)
+
+    quiz_counts = dict(quizzes.values("category_id").annotate(n=Count("id")).values_list("category_id", "n"))
+    question_counts = dict(
+        questions.values("quiz__category_id").annotate(n=Count("id")).values_list("quiz__category_id", "n")
+    )
+    changed = []
+    for category in categories.only("id", "approved_quizzes", "approved_questions"):
+        counts = (quiz_counts.get(category.id, 0), question_counts.get(category.id, 0))
+        if counts != (category.approved_quizzes, category.approved_questions):
+            category.approved_quizzes, category.approved_questions = counts
+            changed.append(category)
+    Category.objects.bulk_update(changed, ["approved_quizzes", "approved_questions"])
+    return len(changed)
@@ -1,35 +1,17 @@
 # quizzes/consumers.py
 import json
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
-from urllib.parse import parse_qs
-from channels.db import database_sync_to_async
 from django.contrib.auth import get_user_model
-from rest_framework_simplejwt.tokens import UntypedToken
-from rest_framework_simplejwt.authentication import JWTAuthentication
 from django.contrib.auth.models import AnonymousUser
 
 User = get_user_model()
 
 class QuizRoomConsumer(AsyncJsonWebsocketConsumer):
     async def connect(self):
-        # accept connection, we'll verify token on join if provided
+        # the token was validated by users.middleware.JWTAuthMiddleware before the handshake
         await self.accept()
         self.room_group_name = None
-        self.user = AnonymousUser()
-
-        # Attempt quick token read from query_string (non-blocking)
-        qs = parse_qs(self.scope.get("query_string", b"").decode())
-        token = qs.get("token", [None])[0]
-        if token:
-            try:
-                validated = UntypedToken(token)
-                jwt_auth = JWTAuthentication()
-                # get_user expects validated token, but JWTAuthentication exposes get_user() differently;
-                # we use database_sync_to_async wrapper to call authentication
-                user = await database_sync_to_async(jwt_auth.get_user)(validated)
-                self.user = user
-            except Exception:
-                self.user = AnonymousUser()
+        self.user = self.scope.get("user") or AnonymousUser()
 
     async def receive_json(self, content, **kwargs):
         t = content.get("type")
@@ -0,0 +1,100 @@
+# quizzes/counters.py
+"""
+Per-quiz question and option counters.
+
+Quiz.easy_questions / medium_questions / hard_questions / option_count hold
+how many questions of each difficulty and how many options a quiz has, so
+sampling and listings never COUNT or load the question tree:
+
+  - single-row writes (a question or option created, deleted, or a question
+    changing difficulty) apply an F() delta in the writer's transaction, see
+    quizzes.signals;
+  - bulk writes (authoring, quiz packs) send quiz_content_changed and the
+    quizzes they touched are recounted with recount();
+  - repair() recounts everything in primary-key chunks, for the
+    repair_quiz_counters command.
+
+sample() draws random questions by position: the counter says how many
+there are, and only the drawn rows (found by ROW_NUMBER) are loaded.
+"""
+import random
+
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value, Window
+from django.db.models.functions import Coalesce, RowNumber
+
+from .models import Option, Question, Quiz
+
+DIFFICULTIES = [choice for choice, _ in Quiz.DIFFICULTY_CHOICES]
+
+
+def field_for(difficulty):
+    return f"{difficulty}_questions" if difficulty in DIFFICULTIES else None
+
+
+def adjust(quiz_id, questions=None, options=0):
+    """Apply deltas: `questions` is {difficulty: delta}, `options` a delta of the option total."""
+    changes = {field_for(d): F(field_for(d)) + n for d, n in (questions or {}).items() if n and field_for(d)}
+    if options:
+        changes["option_count"] = F("option_count") + options
+    if quiz_id is not None and changes:
+        Quiz.objects.filter(pk=quiz_id).update(**changes)
+
+
+def sample(quiz_id, count, difficulty=None):
+    """Up to `count` random questions (options prefetched) of the quiz, of `difficulty` when given."""
+    fields = [field_for(difficulty)] if field_for(difficulty) else [field_for(d) for d in DIFFICULTIES]
+    available = sum(Quiz.objects.filter(pk=quiz_id).values_list(*fields).first() or ())
+    if not available or count <= 0:
+        return []
+
+    questions = Question.objects.filter(quiz_id=quiz_id)
+    if field_for(difficulty):
+        questions = questions.filter(difficulty=difficulty)
+    positions = random.sample(range(1, available + 1), min(count, available))
+    sampled = list(
+        questions.annotate(position=Window(RowNumber(), order_by=F("id").asc()))
+        .filter(position__in=positions)
+        .order_by()
+        .prefetch_related("options")
+    )
+    random.shuffle(sampled)
+    return sampled
+
+
+def _count(queryset):
+    return Coalesce(
+        Subquery(queryset.order_by().values("n")[:1], output_field=IntegerField()), Value(0)
+    )
+
+
+def _recount_values():
+    questions = Question.objects.filter(quiz=OuterRef("pk")).values("quiz")
+    values = {
+        field_for(d): _count(questions.filter(difficulty=d).annotate(n=Count("id")))
+        for d in DIFFICULTIES
+    }
+    values["option_count"] = _count(
+        Option.objects.filter(question__quiz=OuterRef("pk")).values("question__quiz").annotate(n=Count("id"))
+    )
+    return values
+
+
+def recount(quiz_ids):
+    """Recount these quizzes from their rows: one UPDATE with correlated subqueries."""
+    quiz_ids = [quiz_id for quiz_id in set(quiz_ids) if quiz_id is not None]
+    if quiz_ids:
+        Quiz.objects.filter(pk__in=quiz_ids).update(**_recount_values())
+
+
+def repair(chunk_size=1000):
+    """Recount every quiz, `chunk_size` quizzes per UPDATE. Yields (last id done, quizzes done)."""
+    last_id, done = 0, 0
+    while True:
+        ids = list(
+            Quiz.objects.filter(pk__gt=last_id).order_by("pk").values_list("pk", flat=True)[:chunk_size]
+        )
+        if not ids:
+            return
+        Quiz.objects.filter(pk__gte=ids[0], pk__lte=ids[-1]).update(**_recount_values())
+        last_id, done = ids[-1], done + len(ids)
+        yield last_id, done
@@ -0,0 +1,233 @@
+# quizzes/dedup.py
+"""
+Exact and near-duplicate detection for questions.
+
+Every question gets a QuestionFingerprint:
+
+  - content_hash: sha256 of the normalised text plus its option texts
+    (option order does not matter), for exact duplicates;
+  - signature: a MinHash of the character 4-gram shingles of the
+    normalised question text (options are too short and generic to tell
+    questions apart, and are often added after the question). The share
+    of equal positions in two signatures estimates the Jaccard similarity
+    of the two shingle sets. One-permutation hashing (each shingle hashed once
+    with crc32 into one of NUM_HASHES bins) keeps this at ~40 µs per
+    question in pure Python.
+
+The signature is cut into BANDS bands and every band is stored as a
+QuestionBucket key. Questions sharing any key are candidates, so a lookup
+is one indexed IN query over BANDS keys rather than a comparison with
+every question in the bank; candidates are then scored on their
+signatures. With 8 bands of 4 rows a pair at 0.8 similarity is a
+candidate 98.5% of the time, at 0.4 only 17%.
+
+Fingerprints are refreshed after commit whenever a question or its
+options change (see quizzes.signals); scan() re-indexes the whole bank in
+primary-key chunks for the scan_duplicate_questions command. Each indexed
+question is flagged with duplicate_of, the most similar older question at
+or above THRESHOLD.
+"""
+import hashlib
+import re
+import struct
+import unicodedata
+import zlib
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Prefetch, Q, When
+
+from .models import Option, Question, QuestionBucket, QuestionFingerprint
+
+NUM_HASHES = 32  # a power of two: the top bits of a shingle's hash pick its bin
+BANDS = 8
+ROWS = NUM_HASHES // BANDS
+SHINGLE = 4
+THRESHOLD = getattr(settings, "QUESTION_DUPLICATE_THRESHOLD", 0.8)
+MAX_CANDIDATES = 200  # per question looked up
+CHUNK_SIZE = 500
+
+_HASH_BITS = 48
+_BIN_SHIFT = _HASH_BITS - (NUM_HASHES.bit_length() - 1)
+_VALUE_MASK = (1 << _BIN_SHIFT) - 1
+_EMPTY = 1 << _HASH_BITS
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_SIGNATURE = struct.Struct(f"<{NUM_HASHES}Q")
+_BAND = struct.Struct(f"<B{ROWS}Q")
+
+
+# ---------- FINGERPRINTS ----------
+
+
+def normalise(text):
+    return " ".join(_PUNCTUATION.sub(" ", unicodedata.normalize("NFKC", text or "").casefold()).split())
+
+
+def content_text(text, options=()):
+    return " | ".join([normalise(text), *sorted(normalise(option) for option in options)])
+
+
+def content_hash(text, options=()):
+    return hashlib.sha256(content_text(text, options).encode()).hexdigest()
+
+
+def signature(text):
+    data = normalise(text).encode()
+    bins = [_EMPTY] * NUM_HASHES
+    crc32 = zlib.crc32
+    for i in range(max(1, len(data) - SHINGLE + 1)):
+        h = (crc32(data[i : i + SHINGLE]) * 0x9E3779B1) & (_EMPTY - 1)
+        b, v = h >> _BIN_SHIFT, h & _VALUE_MASK
+        if v < bins[b]:
+            bins[b] = v
+
+    # short texts leave bins empty: borrow the next filled bin so that
+    # empty bins still compare like the rest of the signature
+    filled = [i for i, v in enumerate(bins) if v != _EMPTY]
+    if filled and len(filled) < NUM_HASHES:
+        for i in range(NUM_HASHES):
+            if bins[i] == _EMPTY:
+                bins[i] = bins[next((j for j in filled if j > i), filled[0])]
+    return tuple(bins)
+
+
+def bucket_keys(sig):
+    keys = []
+    for band in range(BANDS):
+        digest = hashlib.blake2b(_BAND.pack(band, *sig[band * ROWS : (band + 1) * ROWS]), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, "little", signed=True))
+    return keys
+
+
+def similarity(a, b):
+    return sum(x == y for x, y in zip(a, b)) / NUM_HASHES
+
+
+class _Entry:
+    __slots__ = ("hash", "signature", "keys")
+
+    def __init__(self, text, options):
+        self.hash = content_hash(text, options)
+        self.signature = signature(text)
+        self.keys = bucket_keys(self.signature)
+
+
+# ---------- LOOKUP ----------
+
+
+def _candidates(entries, exclude=()):
+    """[(question_id, quiz_id, content_hash, signature)] sharing a bucket or the hash with any entry (one query)."""
+    keys = {key for entry in entries for key in entry.keys}
+    hashes = {entry.hash for entry in entries}
+    in_buckets = QuestionBucket.objects.filter(key__in=keys).values("question_id")
+    rows = (
+        QuestionFingerprint.objects.filter(Q(question_id__in=in_buckets) | Q(content_hash__in=hashes))
+        .exclude(question_id__in=list(exclude))
+        # exact matches first, so the cap only ever drops bucket candidates
+        .order_by(Case(When(content_hash__in=hashes, then=0), default=1), "question_id")
+        .values_list("question_id", "question__quiz_id", "content_hash", "signature")
+    )
+    return [
+        (question_id, quiz_id, digest, _SIGNATURE.unpack(bytes(packed)))
+        for question_id, quiz_id, digest, packed in rows[: MAX_CANDIDATES * len(entries)]
+    ]
+
+
+def _score(entry, candidates, threshold, older_than=None):
+    matches = []
+    for question_id, quiz_id, digest, sig in candidates:
+        if older_than is not None and question_id >= older_than:
+            continue
+        exact = digest == entry.hash
+        score = 1.0 if exact else similarity(entry.signature, sig)
+        if score >= threshold:
+            matches.append({"question": question_id, "quiz": quiz_id, "similarity": round(score, 4), "exact": exact})
+    matches.sort(key=lambda m: (-m["similarity"], m["question"]))
+    return matches
+
+
+def find_duplicates_many(items, exclude=(), threshold=None, limit=5):
+    """
+    For each (text, option_texts) in `items`, the indexed questions (other
+    than `exclude`) it duplicates: [{question, quiz, similarity, exact}],
+    best first; `exact` when the options match too. One query for the lot.
+    """
+    threshold = THRESHOLD if threshold is None else threshold
+    entries = [_Entry(text, options) for text, options in items]
+    if not entries:
+        return []
+    candidates = _candidates(entries, exclude)
+    return [_score(entry, candidates, threshold)[:limit] for entry in entries]
+
+
+def find_duplicates(text, options=(), exclude=(), threshold=None, limit=5):
+    return find_duplicates_many([(text, options)], exclude, threshold, limit)[0]
+
+
+# ---------- INDEXING ----------
+
+
+def index_questions(question_ids):
+    """
+    (Re)fingerprint these questions and flag each against the older
+    questions it duplicates. Returns how many of them are flagged.
+    """
+    questions = list(
+        Question.objects.filter(pk__in=list(question_ids))
+        .only("id", "quiz_id", "text")
+        .prefetch_related(Prefetch("options", queryset=Option.objects.only("id", "question_id", "text")))
+    )
+    if not questions:
+        return 0
+
+    entries = {q.id: _Entry(q.text, [o.text for o in q.options.all()]) for q in questions}
+    # indexed questions, plus this batch itself (its old rows are about to be replaced)
+    candidates = _candidates(entries.values(), exclude=entries.keys())
+    candidates += [(q.id, q.quiz_id, entries[q.id].hash, entries[q.id].signature) for q in questions]
+
+    fingerprints, buckets, flagged = [], [], 0
+    for q in questions:
+        entry = entries[q.id]
+        best = _score(entry, candidates, THRESHOLD, older_than=q.id)[:1]
+        flagged += bool(best)
+        fingerprints.append(
+            QuestionFingerprint(
+                question_id=q.id,
+                content_hash=entry.hash,
+                signature=_SIGNATURE.pack(*entry.signature),
+                duplicate_of_id=best[0]["question"] if best else None,
+                similarity=best[0]["similarity"] if best else None,
+            )
+        )
+        buckets.extend(QuestionBucket(question_id=q.id, key=key) for key in set(entry.keys))
+
+    with transaction.atomic():
+        QuestionBucket.objects.filter(question_id__in=entries.keys()).delete()
+        QuestionBucket.objects.bulk_create(buckets, batch_size=CHUNK_SIZE * BANDS)
+        QuestionFingerprint.objects.bulk_create(
+            fingerprints,
+            update_conflicts=True,
+            unique_fields=["question"],
+            update_fields=["content_hash", "signature", "duplicate_of", "similarity"],
+            batch_size=CHUNK_SIZE,
+        )
+    return flagged
+
+
+def index_quizzes(quiz_ids, chunk_size=CHUNK_SIZE):
+    ids = list(Question.objects.filter(quiz_id__in=list(quiz_ids)).order_by("pk").values_list("pk", flat=True))
+    return sum(index_questions(ids[i : i + chunk_size]) for i in range(0, len(ids), chunk_size))
+
+
+def scan(chunk_size=CHUNK_SIZE):
+    """Re-index the whole bank oldest first, `chunk_size` questions at a time. Yields (scanned, flagged)."""
+    last_id, scanned, flagged = 0, 0, 0
+    while True:
+        ids = list(
+            Question.objects.filter(pk__gt=last_id).order_by("pk").values_list("pk", flat=True)[:chunk_size]
+        )
+        if not ids:
+            return
+        flagged += index_questions(ids)
+        last_id, scanned = ids[-1], scanned + len(ids)
+        yield scanned, flagged
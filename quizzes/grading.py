@@ -0,0 +1,88 @@
+# quizzes/grading.py
+from collections import namedtuple
+
+from .models import Question, Option
+
+# One graded answer. option_id is None when the submitted option does not
+# belong to the question (still counted as answered, never as correct).
+GradedAnswer = namedtuple("GradedAnswer", ["question_id", "option_id", "is_correct"])
+
+
+def normalise_answers(raw_answers):
+    """
+    Accepts either {question_id: option_id} or
+    [{"question": qid, "option": oid}, ...] and returns {qid_int: oid_int}.
+    Malformed entries are skipped.
+    """
+    answers = {}
+
+    if isinstance(raw_answers, dict):
+        for qid_str, oid in raw_answers.items():
+            try:
+                answers[int(qid_str)] = int(oid)
+            except (TypeError, ValueError):
+                continue
+
+    elif isinstance(raw_answers, list):
+        for item in raw_answers:
+            try:
+                answers[int(item.get("question"))] = int(item.get("option"))
+            except (TypeError, ValueError, AttributeError):
+                continue
+
+    return answers
+
+
+def normalise_response_times(raw_answers, raw_times=None):
+    """
+    Optional client-measured answer times, in milliseconds, keyed by question id.
+    Read from list-format answers ({"question", "option", "response_ms"}) and/or
+    a separate {question_id: ms} map.
+    """
+    times = {}
+
+    if isinstance(raw_answers, list):
+        for item in raw_answers:
+            try:
+                times[int(item.get("question"))] = max(0, int(item.get("response_ms")))
+            except (TypeError, ValueError, AttributeError):
+                continue
+
+    if isinstance(raw_times, dict):
+        for qid_str, ms in raw_times.items():
+            try:
+                times[int(qid_str)] = max(0, int(ms))
+            except (TypeError, ValueError):
+                continue
+
+    return times
+
+
+def grade_answers(quiz, answers):
+    """
+    Grade {question_id: option_id} against the quiz in two queries.
+    Answers for questions outside the quiz are ignored.
+    """
+    if not answers:
+        return []
+
+    question_ids = set(
+        Question.objects.filter(quiz=quiz, pk__in=answers.keys()).values_list("id", flat=True)
+    )
+    options = {
+        option_id: (question_id, is_correct)
+        for option_id, question_id, is_correct in Option.objects.filter(
+            question_id__in=question_ids, pk__in=answers.values()
+        ).values_list("id", "question_id", "is_correct")
+    }
+
+    graded = []
+    for qid, oid in answers.items():
+        if qid not in question_ids:
+            continue
+        match = options.get(oid)
+        if match is None or match[0] != qid:
+            graded.append(GradedAnswer(qid, None, False))
+        else:
+            graded.append(GradedAnswer(qid, oid, match[1]))
+    return graded
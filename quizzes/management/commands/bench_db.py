@@ -0,0 +1,135 @@
+import os
+import tempfile
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from brainfuel import database
+
+User = get_user_model()
+
+WALLET = "/api/auth/thalers/wallet/"
+ADD_THALERS = "/api/auth/thalers/add/"
+
+
+def request(client, write=False):
+    """One request with the connection handling of a real request cycle; False if it failed."""
+    close_old_connections()
+    try:
+        if write:
+            response = client.post(ADD_THALERS, {"amount": 1}, format="json")
+        else:
+            response = client.get(WALLET)
+        return response.status_code < 400
+    except Exception:  # "database is locked" and friends
+        return False
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark request throughput per database mode: a connection per request, persistent "
+        "connections with health checks, and SQLite WAL + busy_timeout (or a psycopg pool on "
+        "Postgres). SQLite runs on a scratch copy of the schema; on other databases a bench user "
+        "is created and deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500, help="Sequential reads per mode")
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--per-thread", type=int, default=50, help="Mixed reads/writes per thread")
+
+    def handle(self, *args, **options):
+        config = connections.settings["default"]
+        original = {key: config[key] for key in ("NAME", "CONN_MAX_AGE", "CONN_HEALTH_CHECKS", "OPTIONS")}
+        scratch = None
+        try:
+            if config["ENGINE"] == "django.db.backends.sqlite3":
+                scratch = tempfile.TemporaryDirectory()
+                self._configure(NAME=os.path.join(scratch.name, "bench.sqlite3"))
+                call_command("migrate", verbosity=0)
+            modes = self._modes(config)
+
+            user = User.objects.create_user(username="bench-db", email="bench-db@example.com", password="bench-db")
+            try:
+                with override_settings(ALLOWED_HOSTS=["testserver"], RATE_LIMIT_ENABLED=False):
+                    self._run(user, modes, options)
+            finally:
+                close_old_connections()
+                User.objects.filter(pk=user.pk).delete()
+        finally:
+            self._configure(**original)
+            if scratch is not None:
+                scratch.cleanup()
+
+        self.stdout.write(self.style.SUCCESS("✔ Benchmark complete"))
+
+    def _modes(self, config):
+        per_request = {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False}
+        persistent = {"CONN_MAX_AGE": 60, "CONN_HEALTH_CHECKS": True}
+        if config["ENGINE"] == "django.db.backends.sqlite3":
+            # journal_mode sticks to the file, so the rollback-journal modes set it back
+            journal = {"init_command": "PRAGMA journal_mode=DELETE"}
+            return [
+                ("connection per request", {**per_request, "OPTIONS": journal}),
+                ("persistent + health checks", {**persistent, "OPTIONS": journal}),
+                ("persistent + WAL/busy_timeout", {**persistent, "OPTIONS": database.sqlite_options({})}),
+            ]
+
+        options = {key: value for key, value in config["OPTIONS"].items() if key != "pool"}
+        modes = [
+            ("connection per request", {**per_request, "OPTIONS": options}),
+            ("persistent + health checks", {**persistent, "OPTIONS": options}),
+        ]
+        if database.psycopg_pool is None:
+            self.stdout.write(self.style.WARNING("psycopg_pool is not installed: skipping the pooled mode"))
+        else:
+            modes.append(("psycopg pool", {**per_request, "OPTIONS": {**options, "pool": {"min_size": 2}}}))
+        return modes
+
+    def _configure(self, **changes):
+        connections.close_all()
+        # every thread's DatabaseWrapper shares this dict, so this reconfigures them all
+        connections.settings["default"].update(changes)
+
+    def _run(self, user, modes, options):
+        self.stdout.write(f"{'':32} {'reads/s':>9} {'mixed req/s':>12} {'failed':>7}")
+        for label, changes in modes:
+            self._configure(**changes)
+            client = APIClient()
+            client.force_authenticate(user)
+
+            request(client)  # warm-up
+            started = time.perf_counter()
+            for _ in range(options["requests"]):
+                request(client)
+            reads = options["requests"] / (time.perf_counter() - started)
+
+            mixed, failed = self._concurrent(user, options["threads"], options["per_thread"])
+            self.stdout.write(f"{label:32} {reads:9.0f} {mixed:12.0f} {failed:7}")
+
+    def _concurrent(self, user, threads, per_thread):
+        """Requests/sec of `threads` clients alternating writes and reads, and how many failed."""
+        failures = []
+
+        def worker():
+            client = APIClient()
+            client.force_authenticate(user)
+            failed = sum(not request(client, write=i % 2 == 0) for i in range(per_thread))
+            failures.append(failed)
+            connections.close_all()
+
+        pool = [threading.Thread(target=worker) for _ in range(threads)]
+        started = time.perf_counter()
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+        return threads * per_thread / (time.perf_counter() - started), sum(failures)
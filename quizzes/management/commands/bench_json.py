@@ -0,0 +1,111 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client, override_settings
+from rest_framework.renderers import JSONRenderer
+
+from brainfuel.fastjson import FastJSONRenderer, orjson
+from quizzes import render_cache
+from quizzes.management.commands.bench_quiz_pack import Rollback, synthetic_pack
+from quizzes.models import Quiz
+from quizzes.packs import import_pack
+from quizzes.serializers import QuizSerializer
+
+User = get_user_model()
+
+
+def timed(fn, repeat):
+    """Mean milliseconds per call over `repeat` calls (after one warm-up call)."""
+    fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) * 1000 / repeat
+
+
+class Command(BaseCommand):
+    help = (
+        "Microbenchmark the leaderboard and quiz-list endpoints: stdlib vs orjson rendering, "
+        "per-row serializers vs the values/render-cache fast paths, and end-to-end GETs. "
+        "Synthetic users and quizzes are rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=2000)
+        parser.add_argument("--quizzes", type=int, default=200)
+        parser.add_argument("--questions", type=int, default=10, help="Questions per quiz")
+        parser.add_argument("--repeat", type=int, default=50)
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING("orjson is not installed: the fast renderer falls back to the stdlib"))
+        creator = User.objects.order_by("id").first()
+        if creator is None:
+            raise CommandError("Create a user first")
+
+        try:
+            with transaction.atomic():
+                self._seed(creator, options)
+                self._run(options["repeat"])
+                raise Rollback()
+        except Rollback:
+            pass
+
+        self.stdout.write(self.style.SUCCESS("✔ Benchmark complete"))
+
+    def _seed(self, creator, options):
+        User.objects.bulk_create(
+            User(
+                email=f"bench{n}@example.com",
+                username=f"bench{n}",
+                xp=(n * 7919) % 100_000,
+                level=1 + n % 40,
+                badges=["starter", "streak"][: n % 3],
+            )
+            for n in range(options["users"])
+        )
+        per_quiz = options["questions"]
+        import_pack(synthetic_pack(options["quizzes"] * per_quiz, per_quiz, 4), creator)
+
+    def _run(self, repeat):
+        stdlib, fast = JSONRenderer(), FastJSONRenderer()
+        leaderboard = list(
+            User.objects.order_by("-xp", "-level").values("username", "level", "xp", "badges", "thalers")[:50]
+        )
+        quizzes = Quiz.objects.filter(status="approved").order_by("-created_at")
+        quiz_list = QuizSerializer(quizzes.prefetch_related("questions__options"), many=True).data
+        quiz_ids = list(quizzes.values_list("id", flat=True))
+        render_cache.quiz_json_many(quiz_ids)  # warm the render cache
+
+        rows = [
+            ("render leaderboard (50 rows)", timed(lambda: stdlib.render(leaderboard), repeat),
+             timed(lambda: fast.render(leaderboard), repeat)),
+            (f"render quiz list ({len(quiz_ids)} quizzes)", timed(lambda: stdlib.render(quiz_list), repeat),
+             timed(lambda: fast.render(quiz_list), repeat)),
+            ("leaderboard: model instances vs .values()",
+             timed(lambda: [
+                 {"username": u.username, "level": u.level, "xp": u.xp, "badges": u.badges, "thalers": u.thalers}
+                 for u in User.objects.order_by("-xp", "-level")[:50]
+             ], repeat),
+             timed(lambda: list(
+                 User.objects.order_by("-xp", "-level").values("username", "level", "xp", "badges", "thalers")[:50]
+             ), repeat)),
+            ("quiz list: serializer vs render cache",
+             timed(lambda: stdlib.render(
+                 QuizSerializer(quizzes.prefetch_related("questions__options"), many=True).data
+             ), repeat),
+             timed(lambda: b"[" + b",".join(render_cache.quiz_json_many(quiz_ids)) + b"]", repeat)),
+        ]
+
+        client = Client()
+        with override_settings(ALLOWED_HOSTS=["testserver"]):
+            for url in ("/api/leaderboard/", "/api/quizzes/"):
+                with override_settings(FAST_JSON=False):
+                    before = timed(lambda: client.get(url), repeat)
+                rows.append((f"GET {url} (FAST_JSON off/on)", before, timed(lambda: client.get(url), repeat)))
+
+        self.stdout.write(f"{'':48} {'before ms':>10} {'after ms':>10} {'speedup':>8}")
+        for label, before, after in rows:
+            self.stdout.write(f"{label:48} {before:10.3f} {after:10.3f} {before / after:7.1f}x")
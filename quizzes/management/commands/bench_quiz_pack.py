@@ -0,0 +1,112 @@
+import io
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from quizzes.models import Quiz, Question, Option
+from quizzes.packs import export_records, import_pack, render_pack
+
+User = get_user_model()
+
+
+class Rollback(Exception):
+    pass
+
+
+def synthetic_pack(questions, per_quiz, options):
+    """A JSON Lines pack of `questions` unique questions, `per_quiz` to a quiz."""
+    out = io.StringIO()
+    records = (
+        {
+            "title": f"Benchmark quiz {q // per_quiz}",
+            "category": f"Benchmark {q // per_quiz % 10}",
+            "difficulty": ("easy", "medium", "hard")[q // per_quiz % 3],
+            "status": "approved",
+            "questions": [
+                {
+                    "text": f"Benchmark question {n}?",
+                    "options": [{"text": f"Answer {j} to {n}", "is_correct": j == 0} for j in range(options)],
+                }
+                for n in range(q, min(q + per_quiz, questions))
+            ],
+        }
+        for q in range(0, questions, per_quiz)
+    )
+    out.writelines(render_pack(records, "jsonl"))
+    out.seek(0)
+    return out
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark quiz-pack import/export on a synthetic pack (default 100k questions) "
+        "against one-row-at-a-time creates. Everything is rolled back unless --keep."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--questions", type=int, default=100_000)
+        parser.add_argument("--per-quiz", type=int, default=20)
+        parser.add_argument("--options", type=int, default=4)
+        parser.add_argument("--baseline", type=int, default=2000, help="Questions created row by row for comparison (0 to skip)")
+        parser.add_argument("--keep", action="store_true", help="Commit the imported pack")
+
+    def handle(self, *args, **options):
+        creator = User.objects.filter(is_superuser=True).order_by("id").first() or User.objects.order_by("id").first()
+        if creator is None:
+            raise CommandError("Create a user first")
+
+        pack = synthetic_pack(options["questions"], options["per_quiz"], options["options"])
+        size_mb = len(pack.getvalue()) / 1e6
+
+        try:
+            with transaction.atomic():
+                started = time.perf_counter()
+                summary = import_pack(pack, creator)
+                imported = time.perf_counter() - started
+
+                started = time.perf_counter()
+                exported = sum(
+                    len(chunk)
+                    for chunk in render_pack(export_records(Quiz.objects.filter(category__slug__startswith="benchmark-")))
+                )
+                export_time = time.perf_counter() - started
+
+                if not options["keep"]:
+                    raise Rollback()
+        except Rollback:
+            pass
+
+        rate = summary["questions"] / imported if imported else 0
+        self.stdout.write(
+            f"import: {summary['quizzes']} quizzes / {summary['questions']} questions / "
+            f"{summary['options']} options from {size_mb:.1f} MB in {imported:.2f}s ({rate:,.0f} questions/s)"
+        )
+        self.stdout.write(f"export: {exported / 1e6:.1f} MB in {export_time:.2f}s")
+
+        if options["baseline"]:
+            baseline = self._row_by_row(creator, options["baseline"], options["per_quiz"], options["options"])
+            self.stdout.write(
+                f"row-by-row create: {options['baseline'] / baseline:,.0f} questions/s "
+                f"({rate * baseline / options['baseline']:.1f}x slower than import)"
+            )
+
+        self.stdout.write(self.style.SUCCESS("✔ Benchmark complete"))
+
+    def _row_by_row(self, creator, questions, per_quiz, options):
+        """The old seed_quizzes / builder path: one INSERT per row."""
+        try:
+            with transaction.atomic():
+                started = time.perf_counter()
+                quiz = None
+                for n in range(questions):
+                    if n % per_quiz == 0:
+                        quiz = Quiz.objects.create(title="Baseline quiz", created_by=creator, status="approved")
+                    question = Question.objects.create(quiz=quiz, text=f"Baseline question {n}?", order=n % per_quiz)
+                    for j in range(options):
+                        Option.objects.create(question=question, text=f"Answer {j}", is_correct=j == 0, order=j)
+                elapsed = time.perf_counter() - started
+                raise Rollback()
+        except Rollback:
+            return elapsed
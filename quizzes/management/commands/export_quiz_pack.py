@@ -0,0 +1,40 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from quizzes.categories import slug_for
+from quizzes.models import Quiz
+from quizzes.packs import FORMATS, export_records, render_pack
+
+
+class Command(BaseCommand):
+    help = "Export quizzes with their questions and options as a quiz pack. Use '-' for stdout."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=FORMATS, default="jsonl")
+        parser.add_argument("--status", choices=[key for key, _ in Quiz.STATUS_CHOICES])
+        parser.add_argument("--category")
+
+    def handle(self, *args, **options):
+        quizzes = Quiz.objects.all()
+        if options["status"]:
+            quizzes = quizzes.filter(status=options["status"])
+        if options["category"]:
+            quizzes = quizzes.filter(category__slug=slug_for(options["category"]))
+
+        count = 0
+
+        def counted(records):
+            nonlocal count
+            for record in records:
+                count += 1
+                yield record
+
+        chunks = render_pack(counted(export_records(quizzes)), options["format"])
+        if options["path"] == "-":
+            sys.stdout.writelines(chunks)
+        else:
+            with open(options["path"], "w", encoding="utf-8") as out:
+                out.writelines(chunks)
+            self.stdout.write(self.style.SUCCESS(f"✔ Exported {count} quizzes to {options['path']}"))
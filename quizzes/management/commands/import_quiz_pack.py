@@ -0,0 +1,55 @@
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from quizzes.models import Quiz
+from quizzes.packs import CHUNK_QUESTIONS, FORMATS, PackError, import_pack
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Import a quiz pack (JSON Lines or a JSON array of quizzes). Use '-' to read stdin."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=FORMATS, help="Detected from the content when omitted")
+        parser.add_argument("--status", choices=[key for key, _ in Quiz.STATUS_CHOICES], help="Override every quiz's status")
+        parser.add_argument("--creator", help="Email of the user the quizzes are attributed to (default: first superuser)")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_QUESTIONS, help="Questions per transaction")
+        parser.add_argument("--dry-run", action="store_true", help="Validate only")
+
+    def handle(self, *args, **options):
+        if options["creator"]:
+            creator = User.objects.filter(email=options["creator"]).first()
+        else:
+            creator = User.objects.filter(is_superuser=True).order_by("id").first()
+        if creator is None:
+            raise CommandError("No creator user found; pass --creator")
+
+        kwargs = {
+            "fmt": options["format"],
+            "status": options["status"],
+            "chunk_size": options["chunk_size"],
+            "dry_run": options["dry_run"],
+        }
+        try:
+            if options["path"] == "-":
+                summary = import_pack(sys.stdin, creator, **kwargs)
+            else:
+                with open(options["path"], encoding="utf-8") as stream:
+                    summary = import_pack(stream, creator, **kwargs)
+        except (OSError, PackError) as exc:
+            raise CommandError(str(exc))
+
+        for error in summary["errors"]:
+            self.stdout.write(self.style.WARNING(f"record {error['record']}: {error['error']}"))
+
+        verb = "Validated" if options["dry_run"] else "Imported"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✔ {verb} {summary['quizzes']} quizzes, {summary['questions']} questions, "
+                f"{summary['options']} options ({summary['duplicates']} duplicates, {summary['invalid']} invalid)"
+            )
+        )
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from quizzes.analytics import rebuild_quiz_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute quiz totals, daily attempts and score histograms from QuizAttempt"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--quiz", type=int, action="append", help="Only rebuild this quiz id (repeatable)")
+
+    def handle(self, *args, **options):
+        rebuild_quiz_stats(options["quiz"])
+        scope = f"{len(options['quiz'])} quiz(zes)" if options["quiz"] else "all quizzes"
+        self.stdout.write(self.style.SUCCESS(f"✔ Rebuilt stats for {scope}"))
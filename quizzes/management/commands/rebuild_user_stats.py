@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from quizzes.analytics import rebuild_user_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute players' results summaries (totals, best per quiz, per category) from QuizAttempt"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, action="append", help="Only rebuild this user id (repeatable)")
+
+    def handle(self, *args, **options):
+        rebuild_user_stats(options["user"])
+        scope = f"{len(options['user'])} user(s)" if options["user"] else "all users"
+        self.stdout.write(self.style.SUCCESS(f"✔ Rebuilt results summaries for {scope}"))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from quizzes.categories import refresh_counts
+from quizzes.counters import repair
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-quiz question/option counters (and the category counters) from the rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Quizzes recounted per UPDATE")
+
+    def handle(self, *args, **options):
+        done = 0
+        for last_id, done in repair(max(1, options["chunk_size"])):
+            self.stdout.write(f"  {done} quizzes recounted (up to id {last_id})")
+        changed = refresh_counts()
+        self.stdout.write(
+            self.style.SUCCESS(f"✔ Repaired counters for {done} quizzes; {changed} categories corrected")
+        )
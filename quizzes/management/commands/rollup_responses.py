@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from quizzes.responses import rollup_responses, rebuild_question_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Roll newly logged question responses up into per-question / per-option stats. "
+        "Run periodically (e.g. every minute from cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=5000)
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Drop the stats tables and replay the whole response log",
+        )
+
+    def handle(self, *args, **options):
+        if options["rebuild"]:
+            processed = rebuild_question_stats(options["chunk_size"])
+        else:
+            processed = rollup_responses(options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"✔ Rolled up {processed} responses"))
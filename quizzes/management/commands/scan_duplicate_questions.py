@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from quizzes.dedup import CHUNK_SIZE, scan
+from quizzes.models import QuestionFingerprint
+
+
+class Command(BaseCommand):
+    help = "Fingerprint every question in chunks and flag exact / near duplicates of older questions"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Questions indexed per chunk")
+        parser.add_argument("--show", action="store_true", help="List the flagged questions afterwards")
+
+    def handle(self, *args, **options):
+        scanned = flagged = 0
+        for scanned, flagged in scan(max(1, options["chunk_size"])):
+            self.stdout.write(f"  {scanned} questions scanned, {flagged} duplicates so far")
+
+        if options["show"]:
+            rows = (
+                QuestionFingerprint.objects.filter(duplicate_of__isnull=False)
+                .order_by("question_id")
+                .values_list("question_id", "question__text", "duplicate_of_id", "similarity")
+            )
+            for question_id, text, original_id, score in rows.iterator(chunk_size=1000):
+                self.stdout.write(f"  #{question_id} ~ #{original_id} ({score:.2f}): {text}")
+
+        self.stdout.write(self.style.SUCCESS(f"✔ Scanned {scanned} questions; {flagged} flagged as duplicates"))
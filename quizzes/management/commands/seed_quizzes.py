@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from quizzes.models import Quiz, Question, Option
+from quizzes.packs import import_records
 from django.contrib.auth import get_user_model
 import random
 
@@ -106,26 +107,26 @@ class Command(BaseCommand):
 
         user = User.objects.first()
 
-        for category in CATEGORIES:
-            qs = QUESTION_MAP[category]
-            for i in range(5):  # 5 quizzes per category
-                quiz = Quiz.objects.create(
-                    title=f"{category} Quiz {i+1}",
-                    description=f"A fun and educational {category.lower()} quiz.",
-                    category=category,
-                    difficulty=random.choice(DIFFICULTIES),
-                    created_by=user,
-                    status="approved",
-                )
-
-                # add questions
-                for (text, opts, correct) in qs:
-                    q = Question.objects.create(quiz=quiz, text=text)
-                    for o in opts:
-                        Option.objects.create(
-                            question=q,
-                            text=o,
-                            is_correct=(o == correct)
-                        )
+        records = [
+            {
+                "title": f"{category} Quiz {i+1}",
+                "description": f"A fun and educational {category.lower()} quiz.",
+                "category": category,
+                "difficulty": random.choice(DIFFICULTIES),
+                "status": "approved",
+                "questions": [
+                    {
+                        "text": text,
+                        "options": [{"text": o, "is_correct": o == correct} for o in opts],
+                    }
+                    for (text, opts, correct) in QUESTION_MAP[category]
+                ],
+            }
+            for category in CATEGORIES
+            for i in range(5)  # 5 quizzes per category
+        ]
+
+        # bulk inserts instead of one round trip per question / option
+        import_records(records, user)
 
         self.stdout.write(self.style.SUCCESS("✔ Successfully seeded 50 mixed quizzes (Option C)!"))
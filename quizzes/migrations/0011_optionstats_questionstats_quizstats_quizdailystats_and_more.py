@@ -0,0 +1,124 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_quiz_stats(apps, schema_editor):
+    """Quiz totals, attempts per day and score histograms of the attempts made so far."""
+    QuizAttempt = apps.get_model("quizzes", "QuizAttempt")
+    QuizStats = apps.get_model("quizzes", "QuizStats")
+    QuizDailyStats = apps.get_model("quizzes", "QuizDailyStats")
+    QuizScoreBucket = apps.get_model("quizzes", "QuizScoreBucket")
+
+    totals = QuizAttempt.objects.values("quiz_id").annotate(
+        n=Count("id"),
+        users=Count("user", distinct=True),
+        score=Sum("score"),
+        correct=Sum("correct"),
+        answered=Sum("total"),
+    ).order_by()
+    QuizStats.objects.bulk_create(
+        (
+            QuizStats(
+                quiz_id=row["quiz_id"],
+                attempts=row["n"],
+                unique_users=row["users"],
+                score_sum=row["score"] or 0,
+                correct_sum=row["correct"] or 0,
+                answered_sum=row["answered"] or 0,
+            )
+            for row in totals
+        ),
+        batch_size=1000,
+    )
+
+    daily = (
+        QuizAttempt.objects.annotate(day=TruncDate("created_at"))
+        .values("quiz_id", "day")
+        .annotate(n=Count("id"), score=Sum("score"))
+        .order_by()
+    )
+    QuizDailyStats.objects.bulk_create(
+        (QuizDailyStats(quiz_id=row["quiz_id"], date=row["day"], attempts=row["n"], score_sum=row["score"] or 0) for row in daily),
+        batch_size=1000,
+    )
+
+    buckets = {}
+    for quiz_id, score in QuizAttempt.objects.values_list("quiz_id", "score").iterator(chunk_size=2000):
+        key = (quiz_id, min(int(score) // 10, 9))  # analytics.score_bucket
+        buckets[key] = buckets.get(key, 0) + 1
+    QuizScoreBucket.objects.bulk_create(
+        (QuizScoreBucket(quiz_id=quiz_id, bucket=bucket, count=count) for (quiz_id, bucket), count in buckets.items()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0010_question_difficulty'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OptionStats',
+            fields=[
+                ('option', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='quizzes.option')),
+                ('picks', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='QuestionStats',
+            fields=[
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='quizzes.question')),
+                ('answered', models.IntegerField(default=0)),
+                ('correct', models.IntegerField(default=0)),
+                ('score_sum', models.FloatField(default=0)),
+                ('score_sq_sum', models.FloatField(default=0)),
+                ('correct_score_sum', models.FloatField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='QuizStats',
+            fields=[
+                ('quiz', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='quizzes.quiz')),
+                ('attempts', models.IntegerField(default=0)),
+                ('unique_users', models.IntegerField(default=0)),
+                ('score_sum', models.FloatField(default=0)),
+                ('correct_sum', models.IntegerField(default=0)),
+                ('answered_sum', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='QuizDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('attempts', models.IntegerField(default=0)),
+                ('score_sum', models.FloatField(default=0)),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='quizzes.quiz')),
+            ],
+            options={
+                'ordering': ['date'],
+                'unique_together': {('quiz', 'date')},
+            },
+        ),
+        migrations.CreateModel(
+            name='QuizScoreBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.PositiveSmallIntegerField()),
+                ('count', models.IntegerField(default=0)),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='score_buckets', to='quizzes.quiz')),
+            ],
+            options={
+                'ordering': ['bucket'],
+                'unique_together': {('quiz', 'bucket')},
+            },
+        ),
+        migrations.RunPython(backfill_quiz_stats, migrations.RunPython.noop),
+    ]
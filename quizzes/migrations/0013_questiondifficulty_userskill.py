@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0012_rollupcursor_questionresponse'),
+        ('users', '0009_user_date_joined'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionDifficulty',
+            fields=[
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='calibration', serialize=False, to='quizzes.question')),
+                ('rating', models.FloatField(default=1000.0)),
+                ('answered', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UserSkill',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='skill', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('rating', models.FloatField(default=1000.0)),
+                ('answered', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0014_quiz_content_hash'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='option',
+            name='order',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='question',
+            name='order',
+            field=models.FloatField(default=0),
+        ),
+    ]
@@ -0,0 +1,128 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Sum
+
+
+def backfill_user_stats(apps, schema_editor):
+    """Players' totals, best score per quiz and per-category rows of the attempts made so far."""
+    QuizAttempt = apps.get_model("quizzes", "QuizAttempt")
+    UserQuizStats = apps.get_model("quizzes", "UserQuizStats")
+    UserQuizBest = apps.get_model("quizzes", "UserQuizBest")
+    UserCategoryStats = apps.get_model("quizzes", "UserCategoryStats")
+
+    totals = QuizAttempt.objects.values("user_id").annotate(
+        n=Count("id"),
+        quizzes=Count("quiz", distinct=True),
+        best=Max("score"),
+        scores=Sum("score"),
+        correct=Sum("correct"),
+        answered=Sum("total"),
+        xp=Sum("xp_earned"),
+        thalers=Sum("thalers_earned"),
+        last=Max("created_at"),
+    ).order_by()
+    UserQuizStats.objects.bulk_create(
+        (
+            UserQuizStats(
+                user_id=row["user_id"],
+                attempts=row["n"],
+                quizzes_played=row["quizzes"],
+                score_sum=row["scores"] or 0,
+                best_score=row["best"] or 0,
+                correct_sum=row["correct"] or 0,
+                answered_sum=row["answered"] or 0,
+                xp_sum=row["xp"] or 0,
+                thalers_sum=row["thalers"] or 0,
+                last_attempt_at=row["last"],
+            )
+            for row in totals
+        ),
+        batch_size=1000,
+    )
+
+    bests = QuizAttempt.objects.values("user_id", "quiz_id").annotate(n=Count("id"), best=Max("score")).order_by()
+    UserQuizBest.objects.bulk_create(
+        (
+            UserQuizBest(user_id=row["user_id"], quiz_id=row["quiz_id"], attempts=row["n"], best_score=row["best"] or 0)
+            for row in bests
+        ),
+        batch_size=1000,
+    )
+
+    categories = QuizAttempt.objects.values("user_id", "quiz__category").annotate(
+        n=Count("id"), score=Sum("score"), correct=Sum("correct"), answered=Sum("total")
+    ).order_by()
+    UserCategoryStats.objects.bulk_create(
+        (
+            UserCategoryStats(
+                user_id=row["user_id"],
+                category=row["quiz__category"],
+                attempts=row["n"],
+                score_sum=row["score"] or 0,
+                correct_sum=row["correct"] or 0,
+                answered_sum=row["answered"] or 0,
+            )
+            for row in categories
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0015_fractional_order'),
+        ('users', '0010_thaler_ledger'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserQuizStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='quiz_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('attempts', models.IntegerField(default=0)),
+                ('quizzes_played', models.IntegerField(default=0)),
+                ('score_sum', models.FloatField(default=0)),
+                ('best_score', models.FloatField(default=0)),
+                ('correct_sum', models.IntegerField(default=0)),
+                ('answered_sum', models.IntegerField(default=0)),
+                ('xp_sum', models.IntegerField(default=0)),
+                ('thalers_sum', models.IntegerField(default=0)),
+                ('last_attempt_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UserCategoryStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(max_length=100)),
+                ('attempts', models.IntegerField(default=0)),
+                ('score_sum', models.FloatField(default=0)),
+                ('correct_sum', models.IntegerField(default=0)),
+                ('answered_sum', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='category_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['category'],
+                'unique_together': {('user', 'category')},
+            },
+        ),
+        migrations.CreateModel(
+            name='UserQuizBest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempts', models.IntegerField(default=0)),
+                ('best_score', models.FloatField(default=0)),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_bests', to='quizzes.quiz')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_bests', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'quiz')},
+            },
+        ),
+        migrations.RunPython(backfill_user_stats, migrations.RunPython.noop),
+    ]
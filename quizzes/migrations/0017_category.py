@@ -0,0 +1,128 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+from django.utils.text import slugify
+
+
+def _slug(name):
+    return slugify(name.strip())[:100] or "uncategorised"
+
+
+def map_categories(apps, schema_editor):
+    """
+    One Category per distinct slug of the old free-text values (the first
+    spelling seen becomes its name), point quizzes and per-user category
+    stats at them, and fill in the approved quiz/question counts.
+    """
+    Category = apps.get_model("quizzes", "Category")
+    Quiz = apps.get_model("quizzes", "Quiz")
+    Question = apps.get_model("quizzes", "Question")
+    UserCategoryStats = apps.get_model("quizzes", "UserCategoryStats")
+
+    names = set(Quiz.objects.exclude(category_name="").values_list("category_name", flat=True))
+    names |= set(UserCategoryStats.objects.exclude(category_name="").values_list("category_name", flat=True))
+    by_slug = {}
+    for name in sorted(names):
+        if name.strip():
+            by_slug.setdefault(_slug(name), name.strip())
+    Category.objects.bulk_create([Category(name=name, slug=slug) for slug, name in by_slug.items()])
+    ids = dict(Category.objects.values_list("slug", "id"))
+
+    for name in names:
+        if name.strip():
+            Quiz.objects.filter(category_name=name).update(category_id=ids[_slug(name)])
+
+    # the per-user rows were keyed by spelling: merge spellings of one category
+    merged = {}
+    for row in UserCategoryStats.objects.exclude(category_name="").order_by("id"):
+        if not row.category_name.strip():
+            continue
+        key = (row.user_id, ids[_slug(row.category_name)])
+        if key in merged:
+            kept = merged[key]
+            kept.attempts += row.attempts
+            kept.score_sum += row.score_sum
+            kept.correct_sum += row.correct_sum
+            kept.answered_sum += row.answered_sum
+        else:
+            row.category_id = key[1]
+            merged[key] = row
+    UserCategoryStats.objects.exclude(id__in=[row.id for row in merged.values()]).delete()
+    UserCategoryStats.objects.bulk_update(
+        merged.values(), ["category", "attempts", "score_sum", "correct_sum", "answered_sum"], batch_size=1000
+    )
+
+    quizzes = dict(
+        Quiz.objects.filter(status="approved", category__isnull=False)
+        .values("category_id").annotate(n=Count("id")).values_list("category_id", "n")
+    )
+    questions = dict(
+        Question.objects.filter(quiz__status="approved", quiz__category__isnull=False)
+        .values("quiz__category_id").annotate(n=Count("id")).values_list("quiz__category_id", "n")
+    )
+    for category_id in ids.values():
+        Category.objects.filter(pk=category_id).update(
+            approved_quizzes=quizzes.get(category_id, 0), approved_questions=questions.get(category_id, 0)
+        )
+
+
+def unmap_categories(apps, schema_editor):
+    Category = apps.get_model("quizzes", "Category")
+    Quiz = apps.get_model("quizzes", "Quiz")
+    UserCategoryStats = apps.get_model("quizzes", "UserCategoryStats")
+    for category_id, name in Category.objects.values_list("id", "name"):
+        Quiz.objects.filter(category_id=category_id).update(category_name=name)
+        UserCategoryStats.objects.filter(category_id=category_id).update(category_name=name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0016_user_results_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Category',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('slug', models.SlugField(max_length=100, unique=True)),
+                ('approved_quizzes', models.IntegerField(default=0)),
+                ('approved_questions', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'categories',
+                'ordering': ['name'],
+                'indexes': [models.Index(fields=['approved_quizzes', 'name'], name='quizzes_category_listed')],
+            },
+        ),
+        migrations.RenameField(model_name='quiz', old_name='category', new_name='category_name'),
+        migrations.AlterUniqueTogether(name='usercategorystats', unique_together=set()),
+        migrations.AlterModelOptions(name='usercategorystats', options={}),
+        migrations.RenameField(model_name='usercategorystats', old_name='category', new_name='category_name'),
+        migrations.AddField(
+            model_name='quiz',
+            name='category',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='quizzes', to='quizzes.category'),
+        ),
+        migrations.AddField(
+            model_name='usercategorystats',
+            name='category',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='user_stats', to='quizzes.category'),
+        ),
+        migrations.RunPython(map_categories, unmap_categories),
+        # defaults only so that unapplying can re-add the columns to existing rows
+        migrations.AlterField(model_name='quiz', name='category_name', field=models.CharField(blank=True, default='', max_length=100)),
+        migrations.AlterField(model_name='usercategorystats', name='category_name', field=models.CharField(default='', max_length=100)),
+        migrations.RemoveField(model_name='quiz', name='category_name'),
+        migrations.RemoveField(model_name='usercategorystats', name='category_name'),
+        migrations.AlterField(
+            model_name='usercategorystats',
+            name='category',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='user_stats', to='quizzes.category'),
+        ),
+        migrations.AlterUniqueTogether(name='usercategorystats', unique_together={('user', 'category')}),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:21
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_counters(apps, schema_editor):
+    Quiz = apps.get_model("quizzes", "Quiz")
+    Question = apps.get_model("quizzes", "Question")
+    Option = apps.get_model("quizzes", "Option")
+
+    def count(queryset):
+        return Coalesce(Subquery(queryset.order_by().values("n")[:1], output_field=IntegerField()), Value(0))
+
+    questions = Question.objects.filter(quiz=OuterRef("pk")).values("quiz")
+    Quiz.objects.update(
+        easy_questions=count(questions.filter(difficulty="easy").annotate(n=Count("id"))),
+        medium_questions=count(questions.filter(difficulty="medium").annotate(n=Count("id"))),
+        hard_questions=count(questions.filter(difficulty="hard").annotate(n=Count("id"))),
+        option_count=count(
+            Option.objects.filter(question__quiz=OuterRef("pk")).values("question__quiz").annotate(n=Count("id"))
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0017_category'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='easy_questions',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='quiz',
+            name='hard_questions',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='quiz',
+            name='medium_questions',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='quiz',
+            name='option_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
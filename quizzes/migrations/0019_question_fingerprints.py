@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0018_quiz_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.BigIntegerField(db_index=True)),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='buckets', to='quizzes.question')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='QuestionFingerprint',
+            fields=[
+                ('question', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='fingerprint', serialize=False, to='quizzes.question')),
+                ('content_hash', models.CharField(db_index=True, max_length=64)),
+                ('signature', models.BinaryField()),
+                ('similarity', models.FloatField(blank=True, null=True)),
+                ('duplicate_of', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='quizzes.question')),
+            ],
+        ),
+    ]
@@ -1,10 +1,51 @@
 from django.db import models, transaction
 from django.conf import settings
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
 
+def _save_without(instance, counters, kwargs):
+    # Counters are written with F() deltas by quizzes.signals. A plain save()
+    # of an instance loaded earlier must not write back stale counts, so full
+    # saves of existing rows leave them alone (as User.save does for thalers).
+    if not instance._state.adding and kwargs.get("update_fields") is None:
+        deferred = instance.get_deferred_fields()
+        kwargs["update_fields"] = [
+            f.name
+            for f in instance._meta.concrete_fields
+            if not f.primary_key and f.name not in counters and f.attname not in deferred
+        ]
+
+
+class Category(models.Model):
+    """
+    Quiz taxonomy. approved_quizzes / approved_questions are kept up to date
+    by quizzes.signals (see quizzes/categories.py), so listings never count rows.
+    """
+    name = models.CharField(max_length=100)
+    slug = models.SlugField(max_length=100, unique=True)
+    approved_quizzes = models.IntegerField(default=0)
+    approved_questions = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ["name"]
+        verbose_name_plural = "categories"
+        indexes = [
+            models.Index(fields=["approved_quizzes", "name"], name="quizzes_category_listed"),
+        ]
+
+    COUNTERS = ("approved_quizzes", "approved_questions")
+
+    def __str__(self):
+        return self.name
+
+    def save(self, *args, **kwargs):
+        _save_without(self, self.COUNTERS, kwargs)
+        super().save(*args, **kwargs)
+
+
 class Quiz(models.Model):
     STATUS_CHOICES = [
         ("pending", "Pending"),
@@ -19,7 +60,9 @@ class Quiz(models.Model):
 
     title = models.CharField(max_length=200)
     description = models.TextField(blank=True)
-    category = models.CharField(max_length=100, blank=True)
+    category = models.ForeignKey(
+        Category, on_delete=models.SET_NULL, null=True, blank=True, related_name="quizzes"
+    )
     difficulty = models.CharField(max_length=10, choices=DIFFICULTY_CHOICES, default="easy")
     created_by = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="quizzes"
@@ -27,10 +70,34 @@ class Quiz(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
     is_premium = models.BooleanField(default=False)
+    # sha256 of the normalised content, set by quiz-pack imports (quizzes.packs)
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True)
+
+    # maintained by quizzes.signals / quizzes.counters
+    easy_questions = models.IntegerField(default=0)
+    medium_questions = models.IntegerField(default=0)
+    hard_questions = models.IntegerField(default=0)
+    option_count = models.IntegerField(default=0)
+
+    COUNTERS = ("easy_questions", "medium_questions", "hard_questions", "option_count")
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        _save_without(self, self.COUNTERS, kwargs)
+        super().save(*args, **kwargs)
+
+    @property
+    def question_count(self):
+        return self.easy_questions + self.medium_questions + self.hard_questions
+
+    def questions_available(self, difficulty=None):
+        """How many questions of `difficulty` (any when None) the quiz has, from the counters."""
+        if difficulty is None:
+            return self.question_count
+        return getattr(self, f"{difficulty}_questions")
+
 
 class QuizReport(models.Model):
     quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name="reports")
@@ -42,7 +109,7 @@ class QuizReport(models.Model):
 class Question(models.Model):
     quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name="questions")
     text = models.CharField(max_length=255)
-    order = models.IntegerField(default=0)
+    order = models.FloatField(default=0)  # fractional sort key, see quizzes.ordering
 
     # NEW: per-question difficulty (defaults to quiz difficulty)
     difficulty = models.CharField(
@@ -64,7 +131,7 @@ class Option(models.Model):
     )
     text = models.CharField(max_length=255)
     is_correct = models.BooleanField(default=False)
-    order = models.IntegerField(default=0)
+    order = models.FloatField(default=0)  # fractional sort key, see quizzes.ordering
 
     class Meta:
         ordering = ["order", "id"]
@@ -88,3 +155,209 @@ class QuizAttempt(models.Model):
 
     def __str__(self):
         return f"Attempt {self.pk} by {self.user} on {self.quiz}"
+
+
+class QuestionResponse(models.Model):
+    """
+    Append-only log of individual answers (see quizzes/responses.py).
+
+    Kept deliberately narrow and written with one bulk INSERT per attempt /
+    multiplayer game, so no per-row signals fire. Aggregates are rolled up
+    periodically by `python manage.py rollup_responses`.
+    `attempt` is null for multiplayer answers.
+    """
+    attempt = models.ForeignKey(QuizAttempt, on_delete=models.CASCADE, null=True, blank=True, related_name="responses")
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+", db_index=False)
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name="responses")
+    option = models.ForeignKey(Option, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    is_correct = models.BooleanField(default=False)
+    response_ms = models.PositiveIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [models.Index(fields=["user", "created_at"], name="quizzes_response_user_time")]
+
+
+class RollupCursor(models.Model):
+    """High-water mark (last processed id) for a periodic rollup job."""
+    name = models.CharField(max_length=50, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_id}"
+
+
+# ---------- ANALYTICS (maintained incrementally, see quizzes/analytics.py) ----------
+
+
+class QuizStats(models.Model):
+    quiz = models.OneToOneField(Quiz, on_delete=models.CASCADE, primary_key=True, related_name="stats")
+    attempts = models.IntegerField(default=0)
+    unique_users = models.IntegerField(default=0)
+    score_sum = models.FloatField(default=0)
+    correct_sum = models.IntegerField(default=0)
+    answered_sum = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def average_score(self):
+        return self.score_sum / self.attempts if self.attempts else 0
+
+    def __str__(self):
+        return f"Stats for {self.quiz_id}"
+
+
+class QuizDailyStats(models.Model):
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name="daily_stats")
+    date = models.DateField()
+    attempts = models.IntegerField(default=0)
+    score_sum = models.FloatField(default=0)
+
+    class Meta:
+        ordering = ["date"]
+        unique_together = ("quiz", "date")
+
+
+class QuizScoreBucket(models.Model):
+    """Score histogram: bucket N counts attempts scoring [N*10, N*10+10), bucket 9 includes 100."""
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name="score_buckets")
+    bucket = models.PositiveSmallIntegerField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ["bucket"]
+        unique_together = ("quiz", "bucket")
+
+
+class QuestionStats(models.Model):
+    """
+    Running sums per question. Besides the correct rate they are enough to derive
+    the point-biserial discrimination index without rereading attempts.
+    """
+    question = models.OneToOneField(Question, on_delete=models.CASCADE, primary_key=True, related_name="stats")
+    answered = models.IntegerField(default=0)
+    correct = models.IntegerField(default=0)
+    score_sum = models.FloatField(default=0)
+    score_sq_sum = models.FloatField(default=0)
+    correct_score_sum = models.FloatField(default=0)
+
+    @property
+    def correct_rate(self):
+        return self.correct / self.answered if self.answered else None
+
+    @property
+    def discrimination(self):
+        n, c = self.answered, self.correct
+        if n < 2 or c == 0 or c == n:
+            return None
+        mean = self.score_sum / n
+        variance = self.score_sq_sum / n - mean * mean
+        if variance <= 0:
+            return None
+        mean_correct = self.correct_score_sum / c
+        mean_wrong = (self.score_sum - self.correct_score_sum) / (n - c)
+        p = c / n
+        return (mean_correct - mean_wrong) / variance ** 0.5 * (p * (1 - p)) ** 0.5
+
+
+class OptionStats(models.Model):
+    option = models.OneToOneField(Option, on_delete=models.CASCADE, primary_key=True, related_name="stats")
+    picks = models.IntegerField(default=0)
+
+
+class UserQuizStats(models.Model):
+    """A player's totals over all their attempts (see analytics.user_summary)."""
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name="quiz_stats")
+    attempts = models.IntegerField(default=0)
+    quizzes_played = models.IntegerField(default=0)
+    score_sum = models.FloatField(default=0)
+    best_score = models.FloatField(default=0)
+    correct_sum = models.IntegerField(default=0)
+    answered_sum = models.IntegerField(default=0)
+    xp_sum = models.IntegerField(default=0)
+    thalers_sum = models.IntegerField(default=0)
+    last_attempt_at = models.DateTimeField(null=True, blank=True)
+
+    @property
+    def average_score(self):
+        return self.score_sum / self.attempts if self.attempts else 0
+
+    def __str__(self):
+        return f"Quiz stats for {self.user_id}"
+
+
+class UserQuizBest(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="quiz_bests")
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name="user_bests")
+    attempts = models.IntegerField(default=0)
+    best_score = models.FloatField(default=0)
+
+    class Meta:
+        unique_together = ("user", "quiz")
+
+
+class UserCategoryStats(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="category_stats")
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name="user_stats")
+    attempts = models.IntegerField(default=0)
+    score_sum = models.FloatField(default=0)
+    correct_sum = models.IntegerField(default=0)
+    answered_sum = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("user", "category")
+
+
+# ---------- ADAPTIVE SELECTION (see quizzes/adaptive.py) ----------
+
+
+class UserSkill(models.Model):
+    """Elo-style skill estimate per user, updated after every graded attempt."""
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name="skill")
+    rating = models.FloatField(default=1000.0)
+    answered = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.rating:.0f}"
+
+
+class QuestionDifficulty(models.Model):
+    """
+    Calibrated difficulty on the same scale as UserSkill. Missing rows fall back
+    to the question's static difficulty label.
+    """
+    question = models.OneToOneField(Question, on_delete=models.CASCADE, primary_key=True, related_name="calibration")
+    rating = models.FloatField(default=1000.0)
+    answered = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.question_id}: {self.rating:.0f}"
+
+
+# ---------- DUPLICATE DETECTION (see quizzes/dedup.py) ----------
+
+
+class QuestionFingerprint(models.Model):
+    """
+    Content fingerprint of a question and its options: an exact hash of the
+    normalised content and a MinHash signature. duplicate_of points at the
+    most similar older question, when there is one above the threshold.
+    """
+    question = models.OneToOneField(Question, on_delete=models.CASCADE, primary_key=True, related_name="fingerprint")
+    content_hash = models.CharField(max_length=64, db_index=True)
+    signature = models.BinaryField()
+    duplicate_of = models.ForeignKey(
+        Question, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    similarity = models.FloatField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.question_id}: {self.content_hash[:12]}"
+
+
+class QuestionBucket(models.Model):
+    """One LSH band of a question's signature; questions sharing a key are near-duplicate candidates."""
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name="buckets")
+    key = models.BigIntegerField(db_index=True)
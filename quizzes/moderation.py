@@ -0,0 +1,80 @@
+# quizzes/moderation.py
+"""
+Moderation queue and batch status changes.
+
+The queue holds every pending quiz and every quiz with open reports,
+most-reported first, then oldest first, with the report aggregates
+computed by the database (one grouped query per page).
+
+set_status() approves or rejects any number of quizzes with a single
+UPDATE. A queryset update sends no post_save, so it announces the change
+with quiz_content_changed like the other bulk writers; that refreshes
+everything keyed on approved status (rendered quiz bodies, the cached
+public responses, the question selection index, category counters).
+"""
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, Q
+
+from . import categories
+from .models import Quiz
+from .signals import quiz_content_changed
+
+STATUSES = ("approved", "rejected")
+MAX_BATCH = 500
+
+
+def queue(status=None, reported_only=False):
+    """
+    Quizzes awaiting moderation, ranked by report count and then age.
+    `status` narrows to one status; by default pending quizzes plus any
+    reported quiz (an approved quiz can be reported after publishing).
+    """
+    quizzes = Quiz.objects.annotate(
+        report_count=Count("reports"),
+        first_reported_at=Min("reports__created_at"),
+        last_reported_at=Max("reports__created_at"),
+    )
+    if status:
+        quizzes = quizzes.filter(status=status)
+    else:
+        quizzes = quizzes.filter(Q(status="pending") | Q(report_count__gt=0))
+    if reported_only:
+        quizzes = quizzes.filter(report_count__gt=0)
+    return quizzes.order_by("-report_count", "created_at", "id").values(
+        "id",
+        "title",
+        "status",
+        "created_at",
+        "report_count",
+        "first_reported_at",
+        "last_reported_at",
+        "option_count",
+        category_name=F("category__name"),
+        creator=F("created_by__username"),
+        question_count=F("easy_questions") + F("medium_questions") + F("hard_questions"),
+    )
+
+
+def set_status(quiz_ids, status):
+    """Move these quizzes to `status` with one UPDATE. Returns the ids that actually changed."""
+    if status not in STATUSES:
+        raise ValueError(f"unknown moderation status {status!r}")
+
+    with transaction.atomic():
+        changed = list(
+            Quiz.objects.select_for_update()
+            .filter(pk__in=quiz_ids)
+            .exclude(status=status)
+            .values_list("id", "status", "category_id")
+        )
+        if not changed:
+            return []
+        ids = [quiz_id for quiz_id, _, _ in changed]
+        Quiz.objects.filter(pk__in=ids).update(status=status)
+
+        quiz_content_changed.send(sender=Quiz, quiz_ids=ids)
+        # the signal recounts the categories of approved quizzes; these just left them
+        categories.refresh_counts(
+            [category_id for _, old, category_id in changed if old == "approved" and category_id]
+        )
+    return ids
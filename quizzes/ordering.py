@@ -0,0 +1,103 @@
+# quizzes/ordering.py
+"""
+Sibling ordering for questions (within a quiz) and options (within a question).
+
+`order` is a fractional sort key. Moving one item writes only that item:
+its new key is the midpoint of its new neighbours. Applying a whole
+permutation (or renumbering once midpoints run out of float precision)
+is a single CASE UPDATE over the siblings, checked and applied in one
+transaction.
+"""
+from django.db import transaction
+from django.db.models import Case, FloatField, Max, Value, When
+
+STEP = 1.0
+
+
+class InvalidOrder(Exception):
+    pass
+
+
+def next_order(last_order):
+    """Key for an item appended after `last_order` (None when there are no siblings)."""
+    return 0.0 if last_order is None else float(last_order) + STEP
+
+
+def with_last_order(queryset, relation):
+    """Annotate `last_order` (the highest child key) so appends need no extra query."""
+    return queryset.annotate(last_order=Max(f"{relation}__order"))
+
+
+def _renumber(siblings, ids):
+    return siblings.filter(pk__in=ids).update(
+        order=Case(
+            *[When(pk=pk, then=Value(i * STEP)) for i, pk in enumerate(ids)],
+            output_field=FloatField(),
+        )
+    )
+
+
+def apply_permutation(siblings, ids):
+    """
+    Reorder `siblings` (a queryset of every item in the group) to match `ids`.
+    `ids` must list each sibling exactly once; otherwise InvalidOrder is
+    raised and nothing changes. One UPDATE plus one existence check.
+    """
+    if len(set(ids)) != len(ids):
+        raise InvalidOrder("duplicate ids")
+    if not ids:
+        if siblings.exists():
+            raise InvalidOrder("missing ids")
+        return
+
+    with transaction.atomic():
+        updated = _renumber(siblings, ids)
+        if updated != len(ids):
+            raise InvalidOrder("unknown ids")
+        if siblings.exclude(pk__in=ids).exists():
+            raise InvalidOrder("missing ids")
+
+
+def move(siblings, item_id, after_id=None):
+    """
+    Move one item directly after `after_id` (to the front when None),
+    updating only that item. Returns its new key; raises InvalidOrder if
+    either id is not among the siblings.
+    """
+    if after_id == item_id:
+        raise InvalidOrder("an item cannot move after itself")
+
+    with transaction.atomic():
+        others = siblings.exclude(pk=item_id).order_by("order", "id")
+        if not siblings.filter(pk=item_id).exists():
+            raise InvalidOrder("unknown item")
+
+        if after_id is None:
+            lower = None
+            upper = others.values_list("order", flat=True).first()
+        else:
+            anchor = others.filter(pk=after_id).values_list("order", "id").first()
+            if anchor is None:
+                raise InvalidOrder("unknown anchor")
+            lower = anchor[0]
+            # the next sibling in (order, id) sequence after the anchor
+            following = others.filter(order__gte=lower).exclude(order=lower, id__lte=anchor[1])
+            upper = following.values_list("order", flat=True).first()
+
+        if lower is None:
+            key = 0.0 if upper is None else upper - STEP
+        elif upper is None:
+            key = lower + STEP
+        else:
+            key = (lower + upper) / 2
+
+        if (lower is not None and key <= lower) or (upper is not None and key >= upper):
+            # out of precision (or tied keys): renumber once, then place exactly
+            sequence = list(others.values_list("id", flat=True))
+            position = 0 if after_id is None else sequence.index(after_id) + 1
+            sequence.insert(position, item_id)
+            _renumber(siblings, sequence)
+            return position * STEP
+
+        siblings.filter(pk=item_id).update(order=key)
+        return key
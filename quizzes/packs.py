@@ -0,0 +1,387 @@
+# quizzes/packs.py
+"""
+Quiz packs: bulk import / export of quizzes with their questions and options.
+
+One record per quiz:
+
+    {"title": ..., "description": ..., "category": ..., "difficulty": "easy",
+     "status": "approved", "is_premium": false,
+     "questions": [{"text": ..., "difficulty": ...,
+                    "options": [{"text": ..., "is_correct": true}, ...]}]}
+
+stored either as JSON Lines (one record per line) or as a JSON array of
+records. Both are read incrementally, so a pack never has to fit in memory.
+
+Imports validate every record, skip quizzes whose content hash is already
+in the database (or earlier in the same pack), and write in chunks: each
+chunk is three bulk INSERTs (quizzes, questions, options) in one
+transaction, so a failure loses at most the chunk in flight.
+"""
+import hashlib
+import json
+import unicodedata
+
+from django.db import transaction
+
+from .categories import resolve as resolve_categories
+from .models import Quiz, Question, Option
+from .signals import quiz_content_changed
+
+FORMATS = ("jsonl", "json")
+DIFFICULTIES = {key for key, _ in Quiz.DIFFICULTY_CHOICES}
+STATUSES = {key for key, _ in Quiz.STATUS_CHOICES}
+
+CHUNK_QUESTIONS = 5000  # questions per import transaction
+BATCH_SIZE = 1000  # rows per INSERT statement
+READ_SIZE = 64 * 1024
+MAX_ERRORS = 100  # errors reported back; the rest are only counted
+
+
+class PackError(ValueError):
+    pass
+
+
+# ---------- READING ----------
+
+
+def read_pack(stream, fmt=None):
+    """
+    Yield records from a text stream. A record that cannot be parsed is
+    yielded as a PackError so the caller can report it and carry on (JSON
+    Lines only: a broken JSON array cannot be resynchronised and raises).
+    `fmt` is detected from the first character when not given.
+    """
+    head = stream.read(READ_SIZE)
+    if head.startswith("\ufeff"):
+        head = head[1:]
+
+    if fmt is None:
+        fmt = "json" if head.lstrip().startswith("[") else "jsonl"
+    if fmt not in FORMATS:
+        raise PackError(f"unknown pack format {fmt!r}")
+
+    if fmt == "json":
+        yield from _read_json_array(stream, head)
+    else:
+        yield from _read_json_lines(stream, head)
+
+
+def _read_json_lines(stream, head):
+    buffer = head
+    while True:
+        lines = buffer.split("\n")
+        chunk = stream.read(READ_SIZE) if buffer else ""
+        if chunk:
+            buffer = lines.pop() + chunk
+        else:
+            buffer = ""
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as exc:
+                yield PackError(f"invalid JSON: {exc}")
+        if not buffer:
+            return
+
+
+def _read_json_array(stream, buffer):
+    decoder = json.JSONDecoder()
+    stripped = buffer.lstrip()
+    if not stripped.startswith("["):
+        raise PackError("a JSON pack must be an array of records")
+    pos = len(buffer) - len(stripped) + 1
+    eof = False
+
+    def more():
+        nonlocal buffer, pos, eof
+        chunk = stream.read(READ_SIZE)
+        if not chunk:
+            eof = True
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(buffer):
+            if eof:
+                raise PackError("unexpected end of JSON array")
+            more()
+            continue
+        if buffer[pos] == "]":
+            return
+
+        try:
+            record, end = decoder.raw_decode(buffer, pos)
+        except ValueError as exc:
+            if eof:
+                raise PackError(f"invalid JSON: {exc}") from exc
+            more()  # the record may just be cut off at the buffer edge
+            continue
+        pos = end
+        yield record
+
+
+# ---------- VALIDATION ----------
+
+
+def _normalise(text):
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+def content_hash(quiz):
+    """sha256 over the normalised title, category and question/option content."""
+    canonical = [
+        _normalise(quiz["title"]),
+        _normalise(quiz["category"]),
+        [
+            [_normalise(q["text"]), [[_normalise(o["text"]), o["is_correct"]] for o in q["options"]]]
+            for q in quiz["questions"]
+        ],
+    ]
+    return hashlib.sha256(json.dumps(canonical, ensure_ascii=False).encode()).hexdigest()
+
+
+def _text(data, key, max_length, required=True):
+    value = data.get(key)
+    if value is None:
+        value = ""
+    if not isinstance(value, str):
+        raise PackError(f"{key} must be a string")
+    value = value.strip()
+    if required and not value:
+        raise PackError(f"{key} is required")
+    if max_length and len(value) > max_length:
+        raise PackError(f"{key} is longer than {max_length} characters")
+    return value
+
+
+def _choice(data, key, choices, default):
+    value = data.get(key) or default
+    if not isinstance(value, str) or value not in choices:
+        raise PackError(f"{key} must be one of {', '.join(sorted(choices))}")
+    return value
+
+
+def clean_record(record, status=None):
+    """Validate one record; returns a normalised dict (with its "hash") or raises PackError."""
+    if not isinstance(record, dict):
+        raise PackError("record must be an object")
+
+    quiz = {
+        "title": _text(record, "title", 200),
+        "description": _text(record, "description", None, required=False),
+        "category": _text(record, "category", 100, required=False),
+        "difficulty": _choice(record, "difficulty", DIFFICULTIES, "easy"),
+        "status": status or _choice(record, "status", STATUSES, "pending"),
+        "is_premium": bool(record.get("is_premium", False)),
+        "questions": [],
+    }
+
+    questions = record.get("questions")
+    if not isinstance(questions, list) or not questions:
+        raise PackError("questions must be a non-empty list")
+
+    for i, question in enumerate(questions, 1):
+        if not isinstance(question, dict):
+            raise PackError(f"question {i} must be an object")
+        try:
+            text = _text(question, "text", 255)
+            difficulty = _choice(question, "difficulty", DIFFICULTIES, quiz["difficulty"])
+            options = question.get("options")
+            if not isinstance(options, list) or len(options) < 2:
+                raise PackError("needs at least two options")
+            cleaned = []
+            for option in options:
+                if not isinstance(option, dict):
+                    raise PackError("options must be objects")
+                cleaned.append({"text": _text(option, "text", 255), "is_correct": bool(option.get("is_correct"))})
+            if not any(o["is_correct"] for o in cleaned):
+                raise PackError("needs a correct option")
+        except PackError as exc:
+            raise PackError(f"question {i}: {exc}") from None
+        quiz["questions"].append({"text": text, "difficulty": difficulty, "options": cleaned})
+
+    quiz["hash"] = content_hash(quiz)
+    return quiz
+
+
+# ---------- IMPORT ----------
+
+
+def _write_chunk(chunk, created_by):
+    """Insert one chunk of cleaned quizzes; returns (quizzes, questions, options, duplicates)."""
+    with transaction.atomic():
+        existing = set(
+            Quiz.objects.filter(content_hash__in=[q["hash"] for q in chunk]).values_list("content_hash", flat=True)
+        )
+        fresh = [q for q in chunk if q["hash"] not in existing]
+        if not fresh:
+            return [], 0, 0, len(chunk)
+
+        category_ids = {name: category.id for name, category in resolve_categories([q["category"] for q in fresh]).items()}
+        quizzes = Quiz.objects.bulk_create(
+            [
+                Quiz(
+                    title=q["title"],
+                    description=q["description"],
+                    category_id=category_ids.get(q["category"]),
+                    difficulty=q["difficulty"],
+                    status=q["status"],
+                    is_premium=q["is_premium"],
+                    created_by=created_by,
+                    content_hash=q["hash"],
+                )
+                for q in fresh
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+        question_rows, option_specs = [], []
+        for quiz, data in zip(quizzes, fresh):
+            for order, q in enumerate(data["questions"]):
+                question_rows.append(Question(quiz_id=quiz.pk, text=q["text"], difficulty=q["difficulty"], order=order))
+                option_specs.append(q["options"])
+        questions = Question.objects.bulk_create(question_rows, batch_size=BATCH_SIZE)
+
+        option_rows = [
+            Option(question_id=question.pk, text=o["text"], is_correct=o["is_correct"], order=order)
+            for question, options in zip(questions, option_specs)
+            for order, o in enumerate(options)
+        ]
+        Option.objects.bulk_create(option_rows, batch_size=BATCH_SIZE)
+
+    return quizzes, len(question_rows), len(option_rows), len(chunk) - len(fresh)
+
+
+def import_records(records, created_by, status=None, chunk_size=CHUNK_QUESTIONS, dry_run=False):
+    """
+    Validate and insert an iterable of records (dicts, or PackErrors from
+    read_pack). `status` overrides every record's status. With `dry_run`
+    everything is validated and deduplicated but nothing is written.
+
+    Returns {"quizzes", "questions", "options", "duplicates", "invalid", "errors"}.
+    """
+    summary = {"quizzes": 0, "questions": 0, "options": 0, "duplicates": 0, "invalid": 0, "errors": []}
+    seen = set()
+    chunk, chunk_questions = [], 0
+    touched = []
+
+    def flush():
+        nonlocal chunk, chunk_questions
+        if chunk:
+            if dry_run:
+                existing = set(
+                    Quiz.objects.filter(content_hash__in=[q["hash"] for q in chunk]).values_list("content_hash", flat=True)
+                )
+                summary["duplicates"] += sum(1 for q in chunk if q["hash"] in existing)
+                chunk = [q for q in chunk if q["hash"] not in existing]
+                summary["quizzes"] += len(chunk)
+                summary["questions"] += sum(len(q["questions"]) for q in chunk)
+                summary["options"] += sum(len(o["options"]) for q in chunk for o in q["questions"])
+            else:
+                quizzes, questions, options, duplicates = _write_chunk(chunk, created_by)
+                summary["quizzes"] += len(quizzes)
+                summary["questions"] += questions
+                summary["options"] += options
+                summary["duplicates"] += duplicates
+                touched.extend(q.id for q in quizzes)
+        chunk, chunk_questions = [], 0
+
+    for position, record in enumerate(records, 1):
+        try:
+            if isinstance(record, PackError):
+                raise record
+            quiz = clean_record(record, status)
+        except PackError as exc:
+            summary["invalid"] += 1
+            if len(summary["errors"]) < MAX_ERRORS:
+                summary["errors"].append({"record": position, "error": str(exc)})
+            continue
+
+        if quiz["hash"] in seen:
+            summary["duplicates"] += 1
+            continue
+        seen.add(quiz["hash"])
+
+        chunk.append(quiz)
+        chunk_questions += len(quiz["questions"])
+        if chunk_questions >= chunk_size:
+            flush()
+    flush()
+
+    if touched:
+        # bulk_create sends no post_save
+        quiz_content_changed.send(sender=Quiz, quiz_ids=touched)
+    return summary
+
+
+def import_pack(stream, created_by, fmt=None, **kwargs):
+    """import_records() over a JSON / JSON Lines text stream."""
+    return import_records(read_pack(stream, fmt), created_by, **kwargs)
+
+
+# ---------- EXPORT ----------
+
+
+def export_records(queryset, chunk_size=500):
+    """
+    Yield pack records for `queryset`. Quizzes are read in id-ordered chunks,
+    each followed by one query for its questions and one for their options,
+    as plain tuples (no model instances).
+    """
+    quizzes = queryset.order_by("id").values_list(
+        "id", "title", "description", "category__name", "difficulty", "status", "is_premium"
+    )
+    last_id = 0
+
+    while True:
+        chunk = list(quizzes.filter(id__gt=last_id)[:chunk_size])
+        if not chunk:
+            return
+        last_id = chunk[-1][0]
+
+        questions = {}
+        for quiz_id, qid, text, difficulty in Question.objects.filter(
+            quiz_id__in=[row[0] for row in chunk]
+        ).order_by("quiz_id", "order", "id").values_list("quiz_id", "id", "text", "difficulty"):
+            questions.setdefault(quiz_id, []).append((qid, {"text": text, "difficulty": difficulty, "options": []}))
+
+        by_question = {qid: q for rows in questions.values() for qid, q in rows}
+        for question_id, text, is_correct in Option.objects.filter(
+            question_id__in=by_question.keys()
+        ).order_by("question_id", "order", "id").values_list("question_id", "text", "is_correct"):
+            by_question[question_id]["options"].append({"text": text, "is_correct": is_correct})
+
+        for quiz_id, title, description, category, difficulty, status, is_premium in chunk:
+            yield {
+                "title": title,
+                "description": description,
+                "category": category or "",
+                "difficulty": difficulty,
+                "status": status,
+                "is_premium": is_premium,
+                "questions": [q for _, q in questions.get(quiz_id, [])],
+            }
+
+        if len(chunk) < chunk_size:
+            return
+
+
+def render_pack(records, fmt="jsonl"):
+    """Serialise records as text fragments, for writing to a file or streaming a response."""
+    if fmt not in FORMATS:
+        raise PackError(f"unknown pack format {fmt!r}")
+
+    if fmt == "jsonl":
+        for record in records:
+            yield json.dumps(record, ensure_ascii=False) + "\n"
+        return
+
+    yield "["
+    for i, record in enumerate(records):
+        yield ("," if i else "") + "\n" + json.dumps(record, ensure_ascii=False)
+    yield "\n]\n"
@@ -0,0 +1,121 @@
+# quizzes/render_cache.py
+"""
+Render cache for approved quizzes.
+
+The serialized QuizSerializer JSON of each approved quiz is cached as bytes
+under its current version. Any write to the quiz, its questions or options
+bumps the version (see quizzes.signals), so stale bodies are simply never
+looked up again and expire on their own. The version doubles as the ETag.
+
+A hit costs two cache reads and no ORM or DRF serialization at all.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+
+from brainfuel import fastjson
+from .models import Quiz
+
+VERSION_KEY = "quiz:render:version:{}"
+BODY_KEY = "quiz:render:{}:{}"
+TTL = getattr(settings, "QUIZ_RENDER_CACHE_TTL", 60 * 60 * 24)
+
+
+def get_version(quiz_id):
+    version = cache.get(VERSION_KEY.format(quiz_id))
+    if version is None:
+        # start from the clock, not 1: after an eviction a restarted counter
+        # could otherwise land on a version whose old body is still cached
+        version = int(time.time() * 1000)
+        if not cache.add(VERSION_KEY.format(quiz_id), version, None):
+            version = cache.get(VERSION_KEY.format(quiz_id), version)
+    return version
+
+
+def _bump(quiz_ids):
+    for quiz_id in set(quiz_ids):
+        try:
+            cache.incr(VERSION_KEY.format(quiz_id))
+        except ValueError:
+            pass  # never rendered (or evicted): the next read starts a fresh version
+
+
+def bump(quiz_ids):
+    """
+    Invalidate cached bodies. Bumped again once the surrounding transaction
+    commits, so a render that raced the write cannot be cached under the
+    version readers will see from then on.
+    """
+    quiz_ids = [quiz_id for quiz_id in quiz_ids if quiz_id is not None]
+    if quiz_ids:
+        _bump(quiz_ids)
+        transaction.on_commit(lambda: _bump(quiz_ids))
+
+
+def etag_for(quiz_id, version):
+    return f'"quiz-{quiz_id}-{version}"'
+
+
+def quiz_json(quiz_id):
+    """(bytes, etag) for an approved quiz, rendering and caching on a miss; (None, None) otherwise."""
+    version = get_version(quiz_id)
+    body = cache.get(BODY_KEY.format(quiz_id, version))
+    if body is None:
+        from .serializers import QuizSerializer  # serializers -> authoring -> signals -> here
+
+        quiz = (
+            Quiz.objects.filter(pk=quiz_id, status="approved")
+            .select_related("category")
+            .prefetch_related("questions__options")
+            .first()
+        )
+        if quiz is None:
+            return None, None
+        body = fastjson.dumps(QuizSerializer(quiz).data)
+        cache.set(BODY_KEY.format(quiz_id, version), body, TTL)
+    return body, etag_for(quiz_id, version)
+
+
+def quiz_json_many(quiz_ids):
+    """
+    Bodies of the approved quizzes among `quiz_ids`, in that order. Two
+    get_many() round trips for the lot; all misses are rendered from one
+    prefetched query and stored with one set_many().
+    """
+    from .serializers import QuizSerializer
+
+    versions = cache.get_many([VERSION_KEY.format(quiz_id) for quiz_id in quiz_ids])
+    body_keys = {}
+    for quiz_id in quiz_ids:
+        version = versions.get(VERSION_KEY.format(quiz_id))
+        body_keys[quiz_id] = BODY_KEY.format(quiz_id, version if version is not None else get_version(quiz_id))
+
+    bodies = cache.get_many(body_keys.values())
+    missing = [quiz_id for quiz_id, key in body_keys.items() if key not in bodies]
+    if missing:
+        rendered = {
+            body_keys[quiz.id]: fastjson.dumps(QuizSerializer(quiz).data)
+            for quiz in Quiz.objects.filter(pk__in=missing, status="approved")
+            .select_related("category")
+            .prefetch_related("questions__options")
+        }
+        cache.set_many(rendered, TTL)
+        bodies.update(rendered)
+    return [bodies[body_keys[quiz_id]] for quiz_id in quiz_ids if body_keys[quiz_id] in bodies]
+
+
+def quiz_response(request, quiz_id):
+    """Serve the cached body, or 304 when the client's If-None-Match is current."""
+    body, etag = quiz_json(quiz_id)
+    if body is None:
+        raise Http404("No Quiz matches the given query.")
+
+    if etag in [tag.strip() for tag in request.headers.get("If-None-Match", "").split(",")]:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(body, content_type="application/json")
+    response["ETag"] = etag
+    return response
@@ -0,0 +1,132 @@
+# quizzes/responses.py
+"""
+Per-question response log.
+
+Writers append with a single bulk INSERT (no signals). Readers that need
+aggregates (QuestionStats / OptionStats) are fed by rollup_responses(),
+which walks the log past a stored high-water mark in fixed-size chunks.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import QuestionResponse, QuestionStats, OptionStats, RollupCursor
+
+ROLLUP_NAME = "question_stats"
+
+# Rows newer than this are left for the next run so that transactions which
+# were still open when the rollup started are not skipped past.
+ROLLUP_LAG = timedelta(seconds=30)
+
+QUESTION_SUM_FIELDS = ["answered", "correct", "score_sum", "score_sq_sum", "correct_score_sum"]
+
+
+def log_responses(user_id, graded, attempt=None, response_times=None):
+    """
+    Append one row per graded answer. `response_times` maps question_id -> ms.
+    """
+    if not graded:
+        return []
+
+    response_times = response_times or {}
+    now = timezone.now()
+    return QuestionResponse.objects.bulk_create(
+        [
+            QuestionResponse(
+                attempt=attempt,
+                user_id=user_id,
+                question_id=g.question_id,
+                option_id=g.option_id,
+                is_correct=g.is_correct,
+                response_ms=response_times.get(g.question_id),
+                created_at=now,
+            )
+            for g in graded
+        ]
+    )
+
+
+def _apply_chunk(rows):
+    """
+    Fold (question_id, option_id, is_correct, attempt_score) rows into the stats
+    tables. Only answers given as part of a QuizAttempt count towards them:
+    the discrimination index needs the attempt's total score.
+    """
+    questions = defaultdict(lambda: dict.fromkeys(QUESTION_SUM_FIELDS, 0))
+    picks = defaultdict(int)
+
+    for question_id, option_id, is_correct, score in rows:
+        if score is None:
+            continue
+        sums = questions[question_id]
+        sums["answered"] += 1
+        sums["score_sum"] += score
+        sums["score_sq_sum"] += score * score
+        if is_correct:
+            sums["correct"] += 1
+            sums["correct_score_sum"] += score
+        if option_id:
+            picks[option_id] += 1
+
+    if questions:
+        QuestionStats.objects.bulk_create(
+            [QuestionStats(question_id=qid) for qid in questions], ignore_conflicts=True
+        )
+        stats = list(QuestionStats.objects.filter(pk__in=questions.keys()))
+        for row in stats:
+            for field, value in questions[row.pk].items():
+                setattr(row, field, getattr(row, field) + value)
+        QuestionStats.objects.bulk_update(stats, QUESTION_SUM_FIELDS)
+
+    if picks:
+        OptionStats.objects.bulk_create(
+            [OptionStats(option_id=oid) for oid in picks], ignore_conflicts=True
+        )
+        option_stats = list(OptionStats.objects.filter(pk__in=picks.keys()))
+        for row in option_stats:
+            row.picks += picks[row.pk]
+        OptionStats.objects.bulk_update(option_stats, ["picks"])
+
+
+def rollup_responses(chunk_size=5000, lag=ROLLUP_LAG):
+    """
+    Process every response logged since the last run. Each chunk commits
+    together with the advanced cursor, so an interrupted run resumes cleanly.
+    Returns the number of responses processed.
+    """
+    RollupCursor.objects.get_or_create(name=ROLLUP_NAME)
+    cutoff = timezone.now() - lag
+    processed = 0
+
+    while True:
+        with transaction.atomic():
+            # the row lock keeps two concurrent runs from double counting
+            cursor = RollupCursor.objects.select_for_update().get(name=ROLLUP_NAME)
+            rows = list(
+                QuestionResponse.objects.filter(id__gt=cursor.last_id, created_at__lt=cutoff)
+                .order_by("id")
+                .values_list("id", "question_id", "option_id", "is_correct", "attempt__score")[:chunk_size]
+            )
+            if not rows:
+                break
+
+            _apply_chunk([row[1:] for row in rows])
+            cursor.last_id = rows[-1][0]
+            cursor.save(update_fields=["last_id", "updated_at"])
+
+        processed += len(rows)
+        if len(rows) < chunk_size:
+            break
+
+    return processed
+
+
+def rebuild_question_stats(chunk_size=5000):
+    """Drop QuestionStats / OptionStats and replay the whole response log."""
+    with transaction.atomic():
+        QuestionStats.objects.all().delete()
+        OptionStats.objects.all().delete()
+        RollupCursor.objects.update_or_create(name=ROLLUP_NAME, defaults={"last_id": 0})
+    return rollup_responses(chunk_size)
@@ -1,10 +1,39 @@
 from rest_framework import serializers
+from django.db import transaction
 from .models import Quiz, Question, Option, QuizAttempt, QuizReport
+from .authoring import sync_questions
+from . import categories, dedup
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
 
 
+class CategoryField(serializers.Field):
+    """
+    A quiz's category as its name ("" when uncategorised). Writes accept any
+    name; names that do not match an existing category's slug create one.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("required", False)
+        kwargs.setdefault("allow_null", True)
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        return instance.category.name if instance.category_id else ""
+
+    def to_representation(self, value):
+        return value
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            raise serializers.ValidationError("Category must be a name.")
+        name = data.strip()
+        if len(name) > 100:
+            raise serializers.ValidationError("Ensure this field has no more than 100 characters.")
+        return categories.resolve([name])[name] if name else None
+
+
 class OptionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Option
@@ -18,17 +47,94 @@ class QuestionSerializer(serializers.ModelSerializer):
         fields = ["id", "text", "order", "options"]
 
 class QuizSerializer(serializers.ModelSerializer):
+    category = CategoryField(read_only=True)
     questions = QuestionSerializer(many=True, read_only=True)
+    question_count = serializers.IntegerField(read_only=True)
+    questions_by_difficulty = serializers.SerializerMethodField()
 
     class Meta:
         model = Quiz
-        fields = ["id", "title", "description", "category", "difficulty", "status", "is_premium", "questions", "created_by", "created_at"]
+        fields = [
+            "id", "title", "description", "category", "difficulty", "status", "is_premium",
+            "question_count", "questions_by_difficulty", "option_count", "questions", "created_by", "created_at",
+        ]
+        read_only_fields = ["option_count"]
+
+    def get_questions_by_difficulty(self, quiz):
+        return {"easy": quiz.easy_questions, "medium": quiz.medium_questions, "hard": quiz.hard_questions}
+
+class OptionTreeSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(required=False)
+
+    class Meta:
+        model = Option
+        fields = ["id", "text", "is_correct", "order"]
+        read_only_fields = ["order"]
+
+
+class QuestionTreeSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(required=False)
+    difficulty = serializers.ChoiceField(choices=Quiz.DIFFICULTY_CHOICES, required=False)
+    options = OptionTreeSerializer(many=True, required=False)
+
+    class Meta:
+        model = Question
+        fields = ["id", "text", "difficulty", "order", "options"]
+        read_only_fields = ["order"]
+
 
 class QuizCreateSerializer(serializers.ModelSerializer):
-    # For creators who include nested payloads (optional extension)
+    """
+    Quiz fields plus, optionally, the whole question/option tree. When
+    `questions` is sent, the stored tree is made to match it in one
+    transaction (see quizzes.authoring); list position is the order and
+    items without an id are created. Omit it to leave questions untouched.
+
+    The response lists questions that duplicate ones in other quizzes
+    (see quizzes.dedup) under `duplicates`.
+    """
+    category = CategoryField()
+    questions = QuestionTreeSerializer(many=True, required=False)
+    duplicates = serializers.SerializerMethodField()
+
     class Meta:
         model = Quiz
-        fields = ["title", "description", "category", "difficulty", "is_premium"]
+        fields = ["id", "title", "description", "category", "difficulty", "is_premium", "questions", "duplicates"]
+        read_only_fields = ["id"]
+
+    def get_duplicates(self, quiz):
+        questions = list(quiz.questions.all())
+        found = dedup.find_duplicates_many(
+            [(q.text, [o.text for o in q.options.all()]) for q in questions], exclude=[q.id for q in questions]
+        )
+        return [{"question": q.id, "matches": matches} for q, matches in zip(questions, found) if matches]
+
+    def validate_questions(self, questions):
+        # PATCH makes nested fields optional; the tree itself must stay complete
+        for question in questions:
+            if not question.get("text"):
+                raise serializers.ValidationError("Every question needs text.")
+            if any(not option.get("text") for option in question.get("options", [])):
+                raise serializers.ValidationError("Every option needs text.")
+        return questions
+
+    def _save_tree(self, quiz, questions):
+        if questions is not None:
+            sync_questions(quiz, questions)
+        # re-read so the response shows the stored tree without N+1 queries
+        return Quiz.objects.select_related("category").prefetch_related("questions__options").get(pk=quiz.pk)
+
+    def create(self, validated_data):
+        questions = validated_data.pop("questions", None)
+        with transaction.atomic():
+            quiz = super().create(validated_data)
+            return self._save_tree(quiz, questions)
+
+    def update(self, instance, validated_data):
+        questions = validated_data.pop("questions", None)
+        with transaction.atomic():
+            quiz = super().update(instance, validated_data)
+            return self._save_tree(quiz, questions)
 
 
 class QuizAttemptSerializer(serializers.ModelSerializer):
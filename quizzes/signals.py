@@ -0,0 +1,225 @@
+# quizzes/signals.py
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_init, post_save, pre_delete
+from django.dispatch import Signal, receiver
+
+from brainfuel import response_cache
+from .adaptive import invalidate_index
+from .models import Category, Quiz, Question, Option
+from . import categories, counters, dedup, render_cache
+
+# Sent by bulk writers (bulk_create / queryset.update bypass the model
+# signals). Sender is Quiz, kwargs: quiz_ids, and reordered=True when only
+# the order of questions/options changed.
+quiz_content_changed = Signal()
+
+
+@receiver(post_save, sender=Quiz)
+@receiver(post_delete, sender=Quiz)
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+@receiver(quiz_content_changed)
+def refresh_selection_index(sender, **kwargs):
+    invalidate_index()
+
+
+@receiver(post_save, sender=Quiz)
+@receiver(post_delete, sender=Quiz)
+def quiz_changed(sender, instance, **kwargs):
+    render_cache.bump([instance.pk])
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def question_changed(sender, instance, **kwargs):
+    render_cache.bump([instance.quiz_id])
+
+
+@receiver(post_save, sender=Option)
+@receiver(post_delete, sender=Option)
+def option_changed(sender, instance, origin=None, **kwargs):
+    # cascades from a quiz / question delete are covered by that row's own signal
+    if _cascade_from(origin, Quiz, Question):
+        return
+
+    render_cache.bump([_quiz_id_of(instance)])
+
+
+def _quiz_id_of(option):
+    question = option._state.fields_cache.get("question")
+    if question is not None:
+        return question.quiz_id
+    return Question.objects.filter(pk=option.question_id).values_list("quiz_id", flat=True).first()
+
+
+def _cascade_from(origin, *models):
+    return origin is not None and getattr(origin, "model", type(origin)) in models
+
+
+@receiver(post_save, sender=Quiz)
+@receiver(post_delete, sender=Quiz)
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+@receiver(post_save, sender=Option)
+@receiver(post_delete, sender=Option)
+@receiver(quiz_content_changed)
+def invalidate_public_responses(sender, origin=None, **kwargs):
+    # categories, quiz list and quiz detail (see brainfuel.response_cache)
+    if origin is not None and sender is not getattr(origin, "model", type(origin)):
+        return  # part of a cascade: the deleted parent already invalidated
+    response_cache.invalidate("quizzes")
+
+
+@receiver(quiz_content_changed)
+def quiz_content_bulk_changed(sender, quiz_ids, **kwargs):
+    render_cache.bump(quiz_ids)
+
+
+# ---------- CATEGORY COUNTERS (see quizzes/categories.py) ----------
+
+
+@receiver(post_init, sender=Quiz)
+def remember_listing(sender, instance, **kwargs):
+    # read through __dict__ so deferred fields are never fetched just for this
+    instance._listing = (instance.__dict__.get("status"), instance.__dict__.get("category_id"))
+
+
+@receiver(post_save, sender=Quiz)
+def count_quiz_listing(sender, instance, created, **kwargs):
+    status, category_id = (None, None) if created else instance._listing
+    instance._listing = (instance.status, instance.category_id)
+    was_listed = status == "approved" and category_id is not None
+    is_listed = instance.status == "approved" and instance.category_id is not None
+    if (was_listed, category_id) == (is_listed, instance.category_id) or not (was_listed or is_listed):
+        return
+    if status is None and not created:
+        categories.refresh_counts([instance.category_id])  # loaded with status deferred
+        return
+
+    questions = 0 if created else Question.objects.filter(quiz=instance).count()
+    if was_listed:
+        categories.adjust(category_id, quizzes=-1, questions=-questions)
+    if is_listed:
+        categories.adjust(instance.category_id, quizzes=1, questions=questions)
+
+
+@receiver(pre_delete, sender=Quiz)
+def count_deleted_questions(sender, instance, **kwargs):
+    if instance.status == "approved" and instance.category_id is not None:
+        instance._listed_questions = Question.objects.filter(quiz=instance).count()
+
+
+@receiver(post_delete, sender=Quiz)
+def uncount_quiz(sender, instance, **kwargs):
+    if hasattr(instance, "_listed_questions"):
+        categories.adjust(instance.category_id, quizzes=-1, questions=-instance._listed_questions)
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def count_question(sender, instance, origin=None, created=None, **kwargs):
+    if created is False:
+        return  # edits do not change the counts
+    if _cascade_from(origin, Quiz):
+        return  # the quiz's own delete accounts for its questions
+    Category.objects.filter(quizzes__id=instance.quiz_id, quizzes__status="approved").update(
+        approved_questions=F("approved_questions") + (1 if created else -1)
+    )
+
+
+@receiver(quiz_content_changed)
+def recount_categories(sender, quiz_ids, reordered=False, **kwargs):
+    if not reordered:
+        listed = Quiz.objects.filter(pk__in=quiz_ids, status="approved").values_list("category_id", flat=True)
+        categories.refresh_counts(list(listed))
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def category_changed(sender, instance, created=False, **kwargs):
+    # quiz bodies embed the category name; a delete nulls it with a plain UPDATE
+    if not created:
+        render_cache.bump(list(Quiz.objects.filter(category=instance).values_list("id", flat=True)))
+    response_cache.invalidate("quizzes")
+
+
+# ---------- QUIZ COUNTERS (see quizzes/counters.py) ----------
+
+
+@receiver(post_init, sender=Question)
+def remember_counted(sender, instance, **kwargs):
+    instance._counted = (instance.__dict__.get("quiz_id"), instance.__dict__.get("difficulty"))
+
+
+@receiver(post_save, sender=Question)
+def count_saved_question(sender, instance, created, **kwargs):
+    quiz_id, difficulty = (None, None) if created else instance._counted
+    instance._counted = (instance.quiz_id, instance.difficulty)
+    if created:
+        counters.adjust(instance.quiz_id, {instance.difficulty: 1})
+    elif quiz_id is None or difficulty is None:
+        counters.recount([instance.quiz_id])  # loaded with quiz/difficulty deferred
+    elif quiz_id != instance.quiz_id:
+        counters.recount([quiz_id, instance.quiz_id])  # moved, options and all
+    elif difficulty != instance.difficulty:
+        counters.adjust(quiz_id, {difficulty: -1, instance.difficulty: 1})
+
+
+@receiver(pre_delete, sender=Question)
+def count_deleted_options(sender, instance, origin=None, **kwargs):
+    if not _cascade_from(origin, Quiz):
+        instance._counted_options = Option.objects.filter(question=instance).count()
+
+
+@receiver(post_delete, sender=Question)
+def uncount_question(sender, instance, origin=None, **kwargs):
+    if not _cascade_from(origin, Quiz):
+        counters.adjust(
+            instance.quiz_id, {instance.difficulty: -1}, options=-getattr(instance, "_counted_options", 0)
+        )
+
+
+@receiver(post_save, sender=Option)
+@receiver(post_delete, sender=Option)
+def count_option(sender, instance, origin=None, created=None, **kwargs):
+    if created is False or _cascade_from(origin, Quiz, Question):
+        return  # edits change nothing; a deleted parent accounts for its options
+    counters.adjust(_quiz_id_of(instance), options=1 if created else -1)
+
+
+@receiver(quiz_content_changed)
+def recount_quiz_counters(sender, quiz_ids, reordered=False, **kwargs):
+    if not reordered:
+        counters.recount(quiz_ids)
+
+
+# ---------- DUPLICATE INDEX (see quizzes/dedup.py) ----------
+
+
+@receiver(post_init, sender=Question)
+def remember_fingerprinted(sender, instance, **kwargs):
+    instance._fingerprinted = instance.__dict__.get("text")
+
+
+@receiver(post_save, sender=Question)
+def fingerprint_question(sender, instance, created, **kwargs):
+    if created or instance.text != instance._fingerprinted:
+        instance._fingerprinted = instance.text
+        question_ids = [instance.pk]
+        transaction.on_commit(lambda: dedup.index_questions(question_ids))
+
+
+@receiver(post_save, sender=Option)
+@receiver(post_delete, sender=Option)
+def fingerprint_options(sender, instance, origin=None, **kwargs):
+    if not _cascade_from(origin, Quiz, Question):
+        question_ids = [instance.question_id]
+        transaction.on_commit(lambda: dedup.index_questions(question_ids))
+
+
+@receiver(quiz_content_changed)
+def fingerprint_quizzes(sender, quiz_ids, reordered=False, **kwargs):
+    if not reordered:
+        quiz_ids = list(quiz_ids)
+        transaction.on_commit(lambda: dedup.index_quizzes(quiz_ids))
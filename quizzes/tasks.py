@@ -0,0 +1,30 @@
+# quizzes/tasks.py
+from brainfuel import response_cache
+from leaderboard import scoped, windows
+from taskqueue.queue import task
+
+from . import adaptive, analytics
+from .grading import GradedAnswer
+from .models import QuizAttempt
+from .responses import log_responses
+
+
+@task("quizzes.record_attempt")
+def record_attempt(attempt_id, graded, response_times):
+    """The submit side effects that do not change the response: answer log, ratings, stats, window XP."""
+    attempt = QuizAttempt.objects.select_related("quiz").filter(pk=attempt_id).first()
+    if attempt is None:
+        return  # deleted since
+    graded = [GradedAnswer(*answer) for answer in graded]
+    log_responses(
+        attempt.user_id,
+        graded,
+        attempt=attempt,
+        response_times={int(question_id): ms for question_id, ms in response_times.items()},
+    )
+    adaptive.update_ratings(attempt.user_id, graded)
+    analytics.record_attempt(attempt)
+    windows.record_xp(attempt.user_id, attempt.xp_earned, attempt.created_at)
+    # the submit's user.save invalidated these before the window rows changed
+    scoped.member_changed([attempt.user_id])
+    response_cache.invalidate("leaderboards")
@@ -10,11 +10,16 @@ from .views import (
     QuizSubmitView,
     LeaderboardView,
     UserResultsView,
+    UserResultsSummaryView,
     QuizStatsView,
+    QuizStatsHistoryView,
+    QuizQuestionStatsView,
     CategoryListView,
     PendingQuizzesView,
     ApproveQuizView,
     RejectQuizView,
+    ModerationQueueView,
+    moderate_quizzes,
     ReportedQuizzesView,
     list_quiz_reports,
     add_question,
@@ -27,6 +32,7 @@ from .views import (
     quiz_questions_limited,
 )
 from . import views
+from . import views_packs
 
 urlpatterns = [
     # list / create
@@ -80,6 +86,20 @@ urlpatterns = [
         update_option_order,
         name="option-order",
     ),
+    path(
+        "quizzes/<int:quiz_id>/questions/<int:question_id>/move/",
+        views.move_question,
+        name="question-move",
+    ),
+    path(
+        "quizzes/<int:quiz_id>/questions/<int:question_id>/options/<int:option_id>/move/",
+        views.move_option,
+        name="option-move",
+    ),
+
+    # bulk content packs (admin)
+    path("quizzes/packs/import/", views_packs.import_quiz_pack, name="quiz-pack-import"),
+    path("quizzes/packs/export/", views_packs.export_quiz_pack, name="quiz-pack-export"),
 
     # categories
     path("quizzes/categories/", CategoryListView.as_view(), name="quiz-categories"),
@@ -88,6 +108,8 @@ urlpatterns = [
     path("quizzes/pending/", PendingQuizzesView.as_view(), name="quiz-pending"),
     path("quizzes/<int:pk>/approve/", ApproveQuizView.as_view(), name="quiz-approve"),
     path("quizzes/<int:pk>/reject/", RejectQuizView.as_view(), name="quiz-reject"),
+    path("quizzes/moderation/queue/", ModerationQueueView.as_view(), name="quiz-moderation-queue"),
+    path("quizzes/moderation/bulk/", moderate_quizzes, name="quiz-moderation-bulk"),
 
     # reports
     path("quizzes/reports/", views.list_quiz_reports, name="quiz-reports"),
@@ -96,5 +118,8 @@ urlpatterns = [
     # stats / results / leaderboard
     path("leaderboard/", LeaderboardView.as_view(), name="leaderboard"),
     path("results/", UserResultsView.as_view(), name="user-results"),
+    path("results/summary/", UserResultsSummaryView.as_view(), name="user-results-summary"),
     path("quizzes/<int:pk>/stats/", QuizStatsView.as_view(), name="quiz-stats"),
+    path("quizzes/<int:pk>/stats/history/", QuizStatsHistoryView.as_view(), name="quiz-stats-history"),
+    path("quizzes/<int:pk>/stats/questions/", QuizQuestionStatsView.as_view(), name="quiz-stats-questions"),
 ]
@@ -1,18 +1,28 @@
 # quizzes/views.py
 from django.contrib.auth import get_user_model
 from django.db import transaction
-from django.db.models import Avg
+from django.db.models import F
+from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.decorators import method_decorator
 
 from rest_framework import generics, permissions, status, filters
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from users.models import ThalerTransaction  # if unused you can remove later
-from .models import Quiz, Question, Option, QuizAttempt, QuizReport
-from notifications.utils import create_notification
+from brainfuel import fastjson
+from brainfuel.ratelimit import throttle
+from brainfuel.replicas import ReplicaReadsMixin
+from brainfuel.response_cache import cache_response
+from taskqueue.queue import enqueue
+from users import ledger
+from .models import Category, Quiz, Question, Option, QuizAttempt, QuizReport
+from . import adaptive, analytics, categories, counters, dedup, moderation, ordering, render_cache
+from .grading import normalise_answers, normalise_response_times, grade_answers
+from .signals import quiz_content_changed
 from .serializers import (
     QuizSerializer,
     QuizCreateSerializer,
@@ -24,19 +34,19 @@ from .serializers import (
     OrderUpdateSerializer,
 )
 
-import random
 import traceback
 
 User = get_user_model()
 
 
+@method_decorator(cache_response("quizzes"), name="dispatch")
 class QuizListCreateView(generics.ListCreateAPIView):
     """
-    GET /api/quizzes/ -> list (filterable)
+    GET /api/quizzes/ -> list (filterable: category, difficulty, premium, search, min_questions)
     POST /api/quizzes/ -> create (auth required, status pending)
     """
     filter_backends = [filters.SearchFilter]
-    search_fields = ["title", "description", "category"]
+    search_fields = ["title", "description", "category__name"]
 
     def get_queryset(self):
         queryset = Quiz.objects.filter(status="approved")
@@ -44,9 +54,12 @@ class QuizListCreateView(generics.ListCreateAPIView):
         difficulty = self.request.query_params.get("difficulty")
         premium = self.request.query_params.get("premium")
         search = self.request.query_params.get("search")
+        min_questions = self.request.query_params.get("min_questions")
 
         if category:
-            queryset = queryset.filter(category__icontains=category)
+            # slug or name; an unknown category matches nothing
+            match = categories.lookup(category)
+            queryset = queryset.filter(category=match) if match else queryset.none()
         if difficulty:
             queryset = queryset.filter(difficulty__iexact=difficulty)
         if premium is not None:
@@ -56,6 +69,11 @@ class QuizListCreateView(generics.ListCreateAPIView):
                 queryset = queryset.filter(is_premium=False)
         if search:
             queryset = queryset.filter(title__icontains=search)
+        if min_questions and min_questions.isdigit():
+            # playable quizzes only, straight from the counters
+            queryset = queryset.alias(
+                question_total=F("easy_questions") + F("medium_questions") + F("hard_questions")
+            ).filter(question_total__gte=int(min_questions))
 
         return queryset.order_by("-created_at")
 
@@ -70,6 +88,12 @@ class QuizListCreateView(generics.ListCreateAPIView):
             return QuizCreateSerializer
         return QuizSerializer
 
+    def list(self, request, *args, **kwargs):
+        # the filtered ids, then each quiz's cached body spliced into one array (see render_cache)
+        quiz_ids = list(self.filter_queryset(self.get_queryset()).values_list("id", flat=True))
+        bodies = render_cache.quiz_json_many(quiz_ids)
+        return Response(fastjson.RawJSON(b"[" + b",".join(bodies) + b"]"))
+
     def create(self, request, *args, **kwargs):
         """
         Override to attach created_by and status, and return clear errors on 400.
@@ -82,6 +106,7 @@ class QuizListCreateView(generics.ListCreateAPIView):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
+@method_decorator(cache_response("quizzes"), name="dispatch")
 class QuizDetailView(generics.RetrieveAPIView):
     """
     GET /api/quizzes/<pk>/ : single quiz detail (approved only)
@@ -90,12 +115,17 @@ class QuizDetailView(generics.RetrieveAPIView):
     serializer_class = QuizSerializer
     permission_classes = [permissions.AllowAny]
 
+    def retrieve(self, request, *args, **kwargs):
+        # cached, pre-rendered JSON with ETag / If-None-Match (see render_cache)
+        return render_cache.quiz_response(request, kwargs["pk"])
+
 # ---------- QUESTION & OPTION CRUD / ORDERING ----------
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def add_question(request, quiz_id):
-    quiz = get_object_or_404(Quiz, pk=quiz_id)
+    # the quiz row and its highest question key in one query
+    quiz = get_object_or_404(ordering.with_last_order(Quiz.objects, "questions"), pk=quiz_id)
     if quiz.created_by != request.user and not request.user.is_staff:
         return Response({"detail": "Not allowed"}, status=status.HTTP_403_FORBIDDEN)
 
@@ -103,20 +133,18 @@ def add_question(request, quiz_id):
     if not text:
         return Response({"detail": "Text required"}, status=status.HTTP_400_BAD_REQUEST)
 
-    # determine next order
-    last = quiz.questions.order_by("-order").first()
-    next_order = (last.order + 1) if last else 0
-
-    q = Question.objects.create(quiz=quiz, text=text, order=next_order)
-    serializer = QuestionCreateSerializer(q)
-    return Response(serializer.data, status=status.HTTP_201_CREATED)
+    q = Question.objects.create(quiz=quiz, text=text, order=ordering.next_order(quiz.last_order))
+    payload = QuestionCreateSerializer(q).data
+    # exact / near copies already in the bank (see quizzes/dedup.py)
+    payload["duplicates"] = dedup.find_duplicates(text, exclude=[q.id])
+    return Response(payload, status=status.HTTP_201_CREATED)
 
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def add_option(request, quiz_id, question_id):
     quiz = get_object_or_404(Quiz, pk=quiz_id)
-    question = get_object_or_404(Question, pk=question_id, quiz=quiz)
+    question = get_object_or_404(ordering.with_last_order(Question.objects, "options"), pk=question_id, quiz=quiz)
     if quiz.created_by != request.user and not request.user.is_staff:
         return Response({"detail": "Not allowed"}, status=status.HTTP_403_FORBIDDEN)
 
@@ -125,14 +153,11 @@ def add_option(request, quiz_id, question_id):
     if not text:
         return Response({"detail": "Text required"}, status=status.HTTP_400_BAD_REQUEST)
 
-    last = question.options.order_by("-order").first()
-    next_order = (last.order + 1) if last else 0
-
     opt = Option.objects.create(
         question=question,
         text=text,
         is_correct=is_correct,
-        order=next_order,
+        order=ordering.next_order(question.last_order),
     )
     serializer = OptionCreateSerializer(opt)
     return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -178,15 +203,15 @@ def update_question_order(request, quiz_id):
     serializer.is_valid(raise_exception=True)
     order_list = serializer.validated_data["order"]
 
-    questions = {q.id for q in quiz.questions.all()}
-    if set(order_list) != set(questions):
+    try:
+        ordering.apply_permutation(quiz.questions.all(), order_list)
+    except ordering.InvalidOrder:
         return Response(
             {"detail": "Order must include all question IDs for this quiz"},
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    for idx, qid in enumerate(order_list):
-        Question.objects.filter(pk=qid, quiz=quiz).update(order=idx)
+    quiz_content_changed.send(sender=Quiz, quiz_ids=[quiz.id], reordered=True)
     return Response({"detail": "Order updated"})
 
 
@@ -202,18 +227,61 @@ def update_option_order(request, quiz_id, question_id):
     serializer.is_valid(raise_exception=True)
     order_list = serializer.validated_data["order"]
 
-    options = {o.id for o in question.options.all()}
-    if set(order_list) != set(options):
+    try:
+        ordering.apply_permutation(question.options.all(), order_list)
+    except ordering.InvalidOrder:
         return Response(
             {"detail": "Order must include all option IDs for this question"},
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    for idx, oid in enumerate(order_list):
-        Option.objects.filter(pk=oid, question=question).update(order=idx)
+    quiz_content_changed.send(sender=Quiz, quiz_ids=[quiz.id], reordered=True)
     return Response({"detail": "Option order updated"})
 
 
+def _move_response(siblings, item_id, after_id):
+    try:
+        after_id = None if after_id in (None, "") else int(after_id)
+        new_order = ordering.move(siblings, item_id, after_id)
+    except (TypeError, ValueError):
+        return Response({"detail": "after must be an id or null"}, status=status.HTTP_400_BAD_REQUEST)
+    except ordering.InvalidOrder as exc:
+        return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({"id": item_id, "order": new_order})
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def move_question(request, quiz_id, question_id):
+    """
+    Move one question directly after another: {"after": <question_id>}
+    ({"after": null} moves it to the front). Only the moved row is written.
+    """
+    quiz = get_object_or_404(Quiz, pk=quiz_id)
+    if quiz.created_by != request.user and not request.user.is_staff:
+        return Response({"detail": "Not allowed"}, status=status.HTTP_403_FORBIDDEN)
+
+    response = _move_response(quiz.questions.all(), question_id, request.data.get("after"))
+    if response.status_code == status.HTTP_200_OK:
+        quiz_content_changed.send(sender=Quiz, quiz_ids=[quiz.id], reordered=True)
+    return response
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def move_option(request, quiz_id, question_id, option_id):
+    """Move one option directly after another, as move_question."""
+    quiz = get_object_or_404(Quiz, pk=quiz_id)
+    question = get_object_or_404(Question, pk=question_id, quiz=quiz)
+    if quiz.created_by != request.user and not request.user.is_staff:
+        return Response({"detail": "Not allowed"}, status=status.HTTP_403_FORBIDDEN)
+
+    response = _move_response(question.options.all(), option_id, request.data.get("after"))
+    if response.status_code == status.HTTP_200_OK:
+        quiz_content_changed.send(sender=Quiz, quiz_ids=[quiz.id], reordered=True)
+    return response
+
+
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def publish_quiz(request, quiz_id):
@@ -272,22 +340,25 @@ class StartQuizView(APIView):
         # clamp 1–10
         count = max(1, min(10, count))
 
-        quizzes = Quiz.objects.filter(status="approved")
-        if category:
-            quizzes = quizzes.filter(category__icontains=category)
-        if difficulty:
-            quizzes = quizzes.filter(difficulty__iexact=difficulty)
+        match = categories.lookup(category) if category else None
+        if category and match is None:
+            return Response({"detail": "No questions found"}, status=status.HTTP_404_NOT_FOUND)
+        # only known difficulties reach the index, which memoises a pool per filter
+        if difficulty and difficulty.lower() not in dict(Quiz.DIFFICULTY_CHOICES):
+            return Response({"detail": "No questions found"}, status=status.HTTP_404_NOT_FOUND)
 
-        questions = Question.objects.filter(quiz__in=quizzes).prefetch_related("options")
-        total = questions.count()
-        if total == 0:
+        # pick near the user's skill from the in-memory index (no full scan)
+        selected = adaptive.select_questions(
+            [request.user.id], count, category_id=match and match.id, quiz_difficulty=difficulty
+        )
+        if not selected:
             return Response({"detail": "No questions found"}, status=status.HTTP_404_NOT_FOUND)
 
-        sample_count = min(count, total)
-        sampled = random.sample(list(questions), sample_count)
+        sampled = adaptive.fetch_selected(selected)
+        sample_count = len(sampled)
 
         payload = {
-            "title": f"Generated - {category or 'Mixed'}",
+            "title": f"Generated - {match.name if match else 'Mixed'}",
             "description": f"{sample_count} questions",
             "questions": [
                 {
@@ -311,9 +382,12 @@ def quiz_questions_limited(request, pk):
     - num_questions: user-selected (1–10, clamped).
     - difficulty: "easy" | "medium" | "hard" | omitted -> any difficulty.
     - Only returns questions for an approved quiz.
-    - Random order.
+    - Signed-in users get questions matched to their skill (see quizzes/adaptive.py),
+      anonymous users a random sample.
     """
-    quiz = get_object_or_404(Quiz, pk=pk, status="approved")
+    quiz_body, _ = render_cache.quiz_json(pk)
+    if quiz_body is None:
+        raise Http404("No Quiz matches the given query.")
 
     # how many questions to serve
     try:
@@ -323,30 +397,34 @@ def quiz_questions_limited(request, pk):
     num = max(1, min(10, num))  # clamp 1–10
 
     difficulty = request.query_params.get("difficulty")
-    qs = quiz.questions.all().prefetch_related("options")
+    difficulty_filter = difficulty if difficulty in ["easy", "medium", "hard"] else None
 
-    if difficulty in ["easy", "medium", "hard"]:
-        qs = qs.filter(difficulty=difficulty)
+    if request.user.is_authenticated:
+        # adaptive: questions near the user's skill, skipping recently seen ones
+        selected = adaptive.select_questions(
+            [request.user.id], num, quiz_id=pk, question_difficulty=difficulty_filter
+        )
+        sampled = adaptive.fetch_selected(selected)
+    else:
+        # random positions drawn against the quiz's counters; only those rows are loaded
+        sampled = counters.sample(pk, num, difficulty_filter)
 
-    total = qs.count()
-    if total == 0:
+    if not sampled:
         return Response(
             {"detail": "No questions found for this quiz"},
             status=status.HTTP_404_NOT_FOUND,
         )
 
-    sample_count = min(num, total)
-    sampled = random.sample(list(qs), sample_count)
+    sample_count = len(sampled)
 
     payload = {
-        "quiz": QuizSerializer(quiz).data,
         "num_questions": sample_count,
         "difficulty": difficulty,
         "questions": [
             {
                 "id": q.id,
                 "text": q.text,
-                "difficulty": getattr(q, "difficulty", quiz.difficulty),
+                "difficulty": q.difficulty,
                 "options": [
                     {
                         "id": o.id,
@@ -359,7 +437,9 @@ def quiz_questions_limited(request, pk):
             for q in sampled
         ],
     }
-    return Response(payload, status=status.HTTP_200_OK)
+    # splice the cached quiz JSON in front instead of re-serializing it
+    rest = fastjson.dumps(payload)
+    return HttpResponse(b'{"quiz":' + quiz_body + b"," + rest[1:], content_type="application/json")
 
 
 # ---------- SUBMIT QUIZ / RESULTS / STATS ----------
@@ -367,53 +447,19 @@ def quiz_questions_limited(request, pk):
 
 class QuizSubmitView(APIView):
     permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = [throttle("quiz_submit", "quiz_submit_total")]
 
     def post(self, request, pk):
-        quiz = get_object_or_404(Quiz, pk=pk)
+        quiz = get_object_or_404(Quiz.objects.select_related("category"), pk=pk)
 
         raw_answers = request.data.get("answers", {})
+        answers = normalise_answers(raw_answers)
+        response_times = normalise_response_times(raw_answers, request.data.get("response_ms"))
 
-        # Normalise answers into {question_id_int: option_id_int}
-        answers = {}
-
-        if isinstance(raw_answers, dict):
-            for qid_str, oid in raw_answers.items():
-                try:
-                    qid = int(qid_str)
-                    oid_int = int(oid)
-                    answers[qid] = oid_int
-                except (TypeError, ValueError):
-                    continue
-
-        elif isinstance(raw_answers, list):
-            # Optional list format: [{ "question": qid, "option": oid }, ...]
-            for item in raw_answers:
-                try:
-                    qid = int(item.get("question"))
-                    oid_int = int(item.get("option"))
-                    answers[qid] = oid_int
-                except (TypeError, ValueError, AttributeError):
-                    continue
-
-        correct = 0
-        total = 0
-
-        # Grade: for each submitted answer, verify against DB
-        for qid, oid in answers.items():
-            try:
-                q = Question.objects.get(pk=qid, quiz=quiz)
-            except Question.DoesNotExist:
-                continue
-
-            total += 1
-
-            try:
-                opt = Option.objects.get(pk=oid, question=q)
-            except Option.DoesNotExist:
-                continue
-
-            if opt.is_correct:
-                correct += 1
+        # Grade all submitted answers against the DB in one pass
+        graded = grade_answers(quiz, answers)
+        total = len(graded)
+        correct = sum(1 for g in graded if g.is_correct)
 
         score = int((correct / total) * 100) if total else 0
 
@@ -425,11 +471,9 @@ class QuizSubmitView(APIView):
 
         # Defensive: ensure these fields exist and are not None
         current_xp = getattr(user, "xp", 0) or 0
-        current_thalers = getattr(user, "thalers", 0) or 0
         current_level = getattr(user, "level", 1) or 1
 
         user.xp = current_xp + xp_earned
-        user.thalers = current_thalers + thalers_earned
 
         leveled_up = False
         if user.xp >= current_level * 100:
@@ -438,39 +482,41 @@ class QuizSubmitView(APIView):
         else:
             user.level = current_level
 
-        user.save()
-
-        QuizAttempt.objects.create(
-            user=user,
-            quiz=quiz,
-            score=score,
-            correct=correct,
-            total=total,
-            xp_earned=xp_earned,
-            thalers_earned=thalers_earned,
-        )
-
-        # Notifications
+        messages = []
         if xp_earned > 0:
-            create_notification(
-                user,
-                "XP earned",
-                f"You earned {xp_earned} XP from '{quiz.title}'.",
-            )
-
+            messages.append(("XP earned", f"You earned {xp_earned} XP from '{quiz.title}'."))
         if thalers_earned > 0:
-            create_notification(
-                user,
-                "Thalers earned",
-                f"You gained {thalers_earned} Thalers from '{quiz.title}'.",
-            )
-
+            messages.append(("Thalers earned", f"You gained {thalers_earned} Thalers from '{quiz.title}'."))
         if leveled_up:
-            create_notification(
-                user,
-                "Level up!",
-                f"Congrats! You reached level {user.level}.",
+            messages.append(("Level up!", f"Congrats! You reached level {user.level}."))
+
+        with transaction.atomic():
+            user.save(update_fields=["xp", "level"])
+
+            attempt = QuizAttempt.objects.create(
+                user=user,
+                quiz=quiz,
+                score=score,
+                correct=correct,
+                total=total,
+                xp_earned=xp_earned,
+                thalers_earned=thalers_earned,
             )
+            ledger.credit(user.id, thalers_earned, reason=f"quiz_attempt:{attempt.id}")
+
+            # answer log, ratings, stats, leaderboards, notifications (and, from
+            # the QuizAttempt signal, achievements) run in the task worker
+            enqueue(
+                "quizzes.record_attempt",
+                {"attempt_id": attempt.id, "graded": graded, "response_times": response_times},
+                key=f"quizzes.record_attempt:{attempt.id}",
+            )
+            if messages:
+                enqueue(
+                    "notifications.send",
+                    {"user_id": user.id, "messages": messages},
+                    key=f"notifications:attempt:{attempt.id}",
+                )
 
         return Response(
             {
@@ -486,79 +532,193 @@ class QuizSubmitView(APIView):
         )
 
 
+@method_decorator(cache_response("leaderboards"), name="dispatch")
 class LeaderboardView(APIView):
     permission_classes = [permissions.AllowAny]
 
     def get(self, request):
-        users = User.objects.all().order_by("-xp", "-level")[:50]
-        leaderboard = [
-            {
-                "username": user.username,
-                "level": user.level,
-                "xp": user.xp,
-                "badges": user.badges,
-                "thalers": getattr(user, "thalers", 0),
-            }
-            for user in users
-        ]
-        return Response(leaderboard)
+        # plain rows straight from .values(): no model instances, no serializer
+        leaderboard = User.objects.order_by("-xp", "-level").values("username", "level", "xp", "badges", "thalers")[:50]
+        return Response(list(leaderboard))
+
+
+class ResultsPagination(CursorPagination):
+    ordering = ("-created_at", "-id")
+    page_size = 20
+    page_size_query_param = "limit"
+    max_page_size = 100
 
 
-class UserResultsView(generics.ListAPIView):
+class UserResultsView(ReplicaReadsMixin, generics.ListAPIView):
+    """
+    GET /api/results/?limit=20 : the user's attempts, newest first, one page at a
+    time ({"next", "previous", "results"}; follow `next` for older attempts).
+    """
     serializer_class = QuizAttemptSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = ResultsPagination
 
     def get_queryset(self):
-        return QuizAttempt.objects.filter(user=self.request.user).order_by("-created_at")
+        return QuizAttempt.objects.filter(user=self.request.user).select_related("quiz")
+
+
+class UserResultsSummaryView(ReplicaReadsMixin, APIView):
+    """
+    GET /api/results/summary/ : totals, best score per quiz and per-category
+    breakdown, served from the user's stats rows (see analytics.user_summary).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        return Response(analytics.user_summary(request.user))
 
 
-class QuizStatsView(APIView):
+class QuizStatsView(ReplicaReadsMixin, APIView):
+    """
+    GET /api/quizzes/<pk>/stats/ : totals, served from the QuizStats row.
+    """
     permission_classes = [permissions.AllowAny]
 
     def get(self, request, pk):
         quiz = get_object_or_404(Quiz, pk=pk)
-        attempts = QuizAttempt.objects.filter(quiz=quiz)
-        data = {
-            "quiz": quiz.title,
-            "total_attempts": attempts.count(),
-            "average_score": round(attempts.aggregate(Avg("score"))["score__avg"] or 0, 2),
-            "unique_users": attempts.values("user").distinct().count(),
-        }
-        return Response(data)
+        return Response(analytics.quiz_summary(quiz))
+
+
+class QuizStatsHistoryView(ReplicaReadsMixin, APIView):
+    """
+    GET /api/quizzes/<pk>/stats/history/?days=30 : attempts and average score per day.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, pk):
+        quiz = get_object_or_404(Quiz, pk=pk)
+        try:
+            days = int(request.query_params.get("days", 30))
+        except ValueError:
+            days = 30
+        days = max(1, min(365, days))  # clamp 1–365
+
+        return Response(
+            {
+                "quiz": quiz.title,
+                "days": days,
+                "history": analytics.quiz_history(quiz, days),
+                "histogram": analytics.score_histogram(quiz),
+            }
+        )
+
+
+class QuizQuestionStatsView(ReplicaReadsMixin, APIView):
+    """
+    GET /api/quizzes/<pk>/stats/questions/ : per-question correct rate,
+    discrimination index and option pick distribution (creator / staff only).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        quiz = get_object_or_404(Quiz, pk=pk)
+        if quiz.created_by != request.user and not request.user.is_staff:
+            return Response({"detail": "Not allowed"}, status=status.HTTP_403_FORBIDDEN)
+
+        return Response({"quiz": quiz.title, "questions": analytics.question_breakdown(quiz)})
 
 
 # ---------- CATEGORIES / MODERATION / REPORTS ----------
 
 
+@method_decorator(cache_response("quizzes"), name="dispatch")
 class CategoryListView(APIView):
     permission_classes = [permissions.AllowAny]
 
     def get(self, request):
-        # only approved quizzes, non-empty categories
-        categories = (
-            Quiz.objects.filter(status="approved")
-            .exclude(category__isnull=True)
-            .exclude(category__exact="")
-            .values_list("category", flat=True)
-            .distinct()
-            .order_by("category")
+        # categories with at least one approved quiz, from the maintained counters
+        rows = list(
+            Category.objects.filter(approved_quizzes__gt=0)
+            .order_by("name")
+            .values("name", "slug", "approved_quizzes", "approved_questions")
+        )
+        return Response(
+            {
+                "categories": [row["name"] for row in rows],
+                "details": [
+                    {
+                        "name": row["name"],
+                        "slug": row["slug"],
+                        "quizzes": row["approved_quizzes"],
+                        "questions": row["approved_questions"],
+                    }
+                    for row in rows
+                ],
+            }
         )
-        return Response({"categories": list(categories)})
 
 
 class PendingQuizzesView(generics.ListAPIView):
-    queryset = Quiz.objects.filter(status="pending").order_by("-created_at")
+    queryset = (
+        Quiz.objects.filter(status="pending")
+        .select_related("category")
+        .prefetch_related("questions__options")
+        .order_by("-created_at")
+    )
     serializer_class = QuizSerializer
     permission_classes = [permissions.IsAdminUser]
 
 
+class ModerationPagination(PageNumberPagination):
+    page_size = 25
+    page_size_query_param = "limit"
+    max_page_size = 100
+
+
+class ModerationQueueView(APIView):
+    """
+    GET /api/quizzes/moderation/queue/?status=pending&reported=1&page=2&limit=50
+
+    Pending and reported quizzes, most reported first, then oldest first,
+    with report_count / first_reported_at / last_reported_at per quiz
+    (see quizzes/moderation.py).
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        status_filter = request.query_params.get("status")
+        if status_filter not in (None, "", "pending", "approved", "rejected"):
+            return Response({"detail": "Unknown status"}, status=status.HTTP_400_BAD_REQUEST)
+        reported_only = request.query_params.get("reported", "").lower() in ["true", "1", "yes"]
+
+        paginator = ModerationPagination()
+        page = paginator.paginate_queryset(moderation.queue(status_filter, reported_only), request, view=self)
+        return paginator.get_paginated_response(page)
+
+
+@api_view(["POST"])
+@permission_classes([IsAdminUser])
+def moderate_quizzes(request):
+    """
+    POST /api/quizzes/moderation/bulk/ {"ids": [1, 2, 3], "action": "approve" | "reject"}
+    One UPDATE for the whole batch; quizzes already in that status are left alone.
+    """
+    action = request.data.get("action")
+    ids = request.data.get("ids")
+    if action not in ("approve", "reject"):
+        return Response({"detail": "action must be approve or reject"}, status=status.HTTP_400_BAD_REQUEST)
+    if not isinstance(ids, list) or not ids or not all(isinstance(i, int) for i in ids):
+        return Response({"detail": "ids must be a non-empty list of quiz ids"}, status=status.HTTP_400_BAD_REQUEST)
+    if len(ids) > moderation.MAX_BATCH:
+        return Response(
+            {"detail": f"At most {moderation.MAX_BATCH} quizzes per request"}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+    changed = moderation.set_status(ids, "approved" if action == "approve" else "rejected")
+    return Response({"action": action, "updated": len(changed), "ids": changed})
+
+
 class ApproveQuizView(APIView):
     permission_classes = [permissions.IsAdminUser]
 
     def post(self, request, pk):
-        quiz = get_object_or_404(Quiz, pk=pk)
-        quiz.status = "approved"
-        quiz.save()
+        get_object_or_404(Quiz.objects.only("id"), pk=pk)
+        moderation.set_status([pk], "approved")
         return Response({"message": "quiz approved"})
 
 
@@ -566,21 +726,20 @@ class RejectQuizView(APIView):
     permission_classes = [permissions.IsAdminUser]
 
     def post(self, request, pk):
-        quiz = get_object_or_404(Quiz, pk=pk)
-        quiz.status = "rejected"
-        quiz.save()
+        get_object_or_404(Quiz.objects.only("id"), pk=pk)
+        moderation.set_status([pk], "rejected")
         return Response({"message": "quiz rejected"})
 
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def list_quiz_reports(request):
-    reports = QuizReport.objects.all().order_by("-created_at")
+    reports = QuizReport.objects.select_related("user").order_by("-created_at")
     ser = QuizReportSerializer(reports, many=True)
     return Response(ser.data)
 
 
 class ReportedQuizzesView(generics.ListAPIView):
-    queryset = QuizReport.objects.all().order_by("-created_at")
+    queryset = QuizReport.objects.select_related("user").order_by("-created_at")
     serializer_class = QuizReportSerializer
     permission_classes = [permissions.IsAdminUser]
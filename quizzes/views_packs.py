@@ -0,0 +1,79 @@
+# quizzes/views_packs.py
+import codecs
+
+from django.http import StreamingHttpResponse
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework import status
+
+from .categories import slug_for
+from .models import Quiz
+from .packs import FORMATS, PackError, export_records, import_pack, render_pack
+
+CONTENT_TYPES = {"jsonl": "application/x-ndjson", "json": "application/json"}
+
+
+@api_view(["POST"])
+@permission_classes([IsAdminUser])
+def import_quiz_pack(request):
+    """
+    POST /quizzes/packs/import/
+    Either a multipart upload ("file") or the pack as the raw request body
+    (application/json or application/x-ndjson). Query params:
+      - fmt: jsonl | json (detected when omitted)
+      - status: pending | approved | rejected, overrides every record
+      - dry_run: 1 to validate without writing
+    """
+    fmt = request.query_params.get("fmt") or None
+    status_override = request.query_params.get("status") or None
+    dry_run = request.query_params.get("dry_run") in ("1", "true", "yes")
+
+    if fmt is not None and fmt not in FORMATS:
+        return Response({"detail": f"fmt must be one of {', '.join(FORMATS)}"}, status=status.HTTP_400_BAD_REQUEST)
+    if status_override is not None and status_override not in dict(Quiz.STATUS_CHOICES):
+        return Response({"detail": "invalid status"}, status=status.HTTP_400_BAD_REQUEST)
+
+    # read the upload / body as a stream rather than through request.data
+    if (request.content_type or "").startswith("multipart/form-data"):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"detail": "file required"}, status=status.HTTP_400_BAD_REQUEST)
+        source = upload
+    else:
+        source = request._request
+
+    stream = codecs.getreader("utf-8")(source, errors="replace")
+    try:
+        summary = import_pack(stream, request.user, fmt=fmt, status=status_override, dry_run=dry_run)
+    except PackError as exc:
+        return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    summary["dry_run"] = dry_run
+    code = status.HTTP_200_OK if dry_run or not summary["quizzes"] else status.HTTP_201_CREATED
+    return Response(summary, status=code)
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def export_quiz_pack(request):
+    """
+    GET /quizzes/packs/export/?fmt=jsonl&status=approved&category=Science
+    Streams the pack; quizzes are read from the database a chunk at a time.
+    """
+    fmt = request.query_params.get("fmt", "jsonl")
+    if fmt not in FORMATS:
+        return Response({"detail": f"fmt must be one of {', '.join(FORMATS)}"}, status=status.HTTP_400_BAD_REQUEST)
+
+    quizzes = Quiz.objects.all()
+    if request.query_params.get("status"):
+        quizzes = quizzes.filter(status=request.query_params["status"])
+    if request.query_params.get("category"):
+        quizzes = quizzes.filter(category__slug=slug_for(request.query_params["category"]))
+
+    response = StreamingHttpResponse(
+        (chunk.encode("utf-8") for chunk in render_pack(export_records(quizzes), fmt)),
+        content_type=CONTENT_TYPES[fmt],
+    )
+    response["Content-Disposition"] = f'attachment; filename="quiz-pack.{fmt}"'
+    return response
@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from .models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "status", "attempts", "run_after", "created_at", "finished_at")
+    list_filter = ("status", "name")
+    search_fields = ("name", "key")
+    readonly_fields = ("created_at", "claimed_by", "claimed_at", "finished_at", "last_error")
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from taskqueue import queue
+
+PRUNE_EVERY = 60 * 60  # seconds
+
+
+class Command(BaseCommand):
+    help = "Run queued background tasks (achievements, notifications, stats rollups) until stopped"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Exit once nothing is due")
+        parser.add_argument("--batch", type=int, default=queue.BATCH_SIZE, help="Tasks claimed at a time")
+        parser.add_argument("--sleep", type=float, default=1.0, help="Seconds to wait when the queue is empty")
+        parser.add_argument("--keep-days", type=int, default=7, help="Days finished tasks are kept")
+
+    def handle(self, *args, **options):
+        succeeded = failed = 0
+        pruned_at = 0.0
+        try:
+            while True:
+                close_old_connections()
+                if time.monotonic() - pruned_at > PRUNE_EVERY:
+                    queue.prune(options["keep_days"])
+                    pruned_at = time.monotonic()
+                queue.reclaim()
+
+                ok, bad = queue.run_pending(max(1, options["batch"]))
+                succeeded, failed = succeeded + ok, failed + bad
+                if ok or bad:
+                    self.stdout.write(f"  {ok} tasks done, {bad} failed")
+                elif options["once"]:
+                    break
+                else:
+                    time.sleep(options["sleep"])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f"✔ Ran {succeeded} tasks ({failed} failed or retrying)"))
@@ -0,0 +1,38 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    """
+    One queued call of a registered task function (see taskqueue.queue).
+    Rows are claimed by the run_tasks worker; an idempotency key makes
+    enqueueing the same work twice a no-op.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RUNNING = "running", "Running"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    key = models.CharField(max_length=200, unique=True, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    claimed_by = models.CharField(max_length=64, blank=True, default="")
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "run_after"], name="taskqueue_due"),
+            models.Index(fields=["status", "finished_at"], name="taskqueue_finished"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
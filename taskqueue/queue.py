@@ -0,0 +1,149 @@
+# taskqueue/queue.py
+"""
+Database-backed background tasks.
+
+    # notifications/tasks.py
+    @task("notifications.send")
+    def send(user_id, messages): ...
+
+    enqueue("notifications.send", {"user_id": 1, "messages": [...]}, key=f"notifications:attempt:{attempt.id}")
+
+enqueue() is one INSERT in the caller's transaction, so a task exists
+exactly when the write that caused it commits. With a key, enqueueing the
+same work again is ignored (the key is unique; conflicts are skipped).
+
+The run_tasks worker claims due tasks in batches: a conditional UPDATE
+moves them from pending to running under a token of its own, so two
+workers never get the same task. A task runs in one transaction with
+marking it done, so its writes and its completion commit together; if it
+raises, its writes roll back and it is retried after BACKOFF * 2**attempts
+seconds (at most MAX_BACKOFF) until max_attempts, then left failed with
+the traceback. Tasks of a worker that died stay running until their claim
+is LEASE old and are then handed out again; a task whose claim was taken
+over meanwhile rolls back instead of committing twice.
+
+TASKS_RUN_INLINE runs the queue in-process after each enqueuing
+transaction commits instead, for development without a worker.
+"""
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Task
+
+REGISTRY = {}  # name -> (function, max_attempts)
+BATCH_SIZE = 50
+BACKOFF = 2  # seconds before the first retry
+MAX_BACKOFF = 60 * 10
+LEASE = timedelta(seconds=getattr(settings, "TASKS_LEASE_SECONDS", 60 * 5))
+
+
+class ClaimLost(Exception):
+    pass
+
+
+def task(name, max_attempts=5):
+    """Register a function as task `name`; it is called with the payload as keyword arguments."""
+
+    def decorator(fn):
+        REGISTRY[name] = (fn, max_attempts)
+        return fn
+
+    return decorator
+
+
+def enqueue(name, payload=None, key=None, delay=0):
+    """Queue a call of task `name` (JSON-serializable payload), due in `delay` seconds."""
+    if name not in REGISTRY:
+        raise ValueError(f"unknown task {name!r}")
+    Task.objects.bulk_create(
+        [
+            Task(
+                name=name,
+                payload=payload or {},
+                key=key,
+                max_attempts=REGISTRY[name][1],
+                run_after=timezone.now() + timedelta(seconds=delay),
+            )
+        ],
+        ignore_conflicts=True,
+    )
+    if getattr(settings, "TASKS_RUN_INLINE", False):
+        transaction.on_commit(run_all)
+
+
+# ---------- WORKER ----------
+
+
+def claim(limit=BATCH_SIZE):
+    """Up to `limit` due tasks, oldest first, now running under a fresh claim token."""
+    token, now = uuid.uuid4().hex, timezone.now()
+    due = list(
+        Task.objects.filter(status=Task.Status.PENDING, run_after__lte=now)
+        .order_by("run_after", "id")
+        .values_list("id", flat=True)[:limit]
+    )
+    if not due:
+        return []
+    Task.objects.filter(id__in=due, status=Task.Status.PENDING).update(
+        status=Task.Status.RUNNING, claimed_by=token, claimed_at=now, attempts=F("attempts") + 1
+    )
+    return list(Task.objects.filter(claimed_by=token, status=Task.Status.RUNNING).order_by("run_after", "id"))
+
+
+def run(claimed):
+    """Run one claimed task. Returns True when it succeeded."""
+    fn, _ = REGISTRY.get(claimed.name, (None, 0))
+    mine = Task.objects.filter(pk=claimed.pk, claimed_by=claimed.claimed_by, status=Task.Status.RUNNING)
+    try:
+        if fn is None:
+            raise LookupError(f"no task registered as {claimed.name!r}")
+        with transaction.atomic():
+            fn(**claimed.payload)
+            if not mine.update(status=Task.Status.DONE, finished_at=timezone.now(), last_error=""):
+                raise ClaimLost(f"task {claimed.pk} was reclaimed while running")
+        return True
+    except Exception:
+        error, now = traceback.format_exc(), timezone.now()
+        if claimed.attempts >= claimed.max_attempts:
+            mine.update(status=Task.Status.FAILED, finished_at=now, last_error=error)
+        else:
+            backoff = min(MAX_BACKOFF, BACKOFF * 2 ** (claimed.attempts - 1))
+            mine.update(
+                status=Task.Status.PENDING, run_after=now + timedelta(seconds=backoff), claimed_by="", last_error=error
+            )
+        return False
+
+
+def run_pending(limit=BATCH_SIZE):
+    """Claim and run one batch. Returns (succeeded, failed)."""
+    results = [run(claimed) for claimed in claim(limit)]
+    return results.count(True), results.count(False)
+
+
+def run_all():
+    """Run batches until nothing is due (tests, TASKS_RUN_INLINE)."""
+    succeeded = failed = 0
+    while True:
+        ok, bad = run_pending()
+        if not ok and not bad:
+            return succeeded, failed
+        succeeded, failed = succeeded + ok, failed + bad
+
+
+def reclaim():
+    """Hand out again the tasks of workers whose claim is older than LEASE."""
+    return Task.objects.filter(status=Task.Status.RUNNING, claimed_at__lt=timezone.now() - LEASE).update(
+        status=Task.Status.PENDING, claimed_by=""
+    )
+
+
+def prune(days=7):
+    """Delete tasks that finished successfully more than `days` ago."""
+    cutoff = timezone.now() - timedelta(days=days)
+    return Task.objects.filter(status=Task.Status.DONE, finished_at__lt=cutoff).delete()[0]
@@ -0,0 +1,103 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from achievements.models import UserAchievement
+from leaderboard import scoped
+from notifications.models import Notification
+from quizzes.models import QuestionResponse, QuizStats
+from quizzes.tests import make_quiz
+from . import queue
+from .models import Task
+
+User = get_user_model()
+
+
+@queue.task("taskqueue.tests.notify_then_fail", max_attempts=2)
+def notify_then_fail(user_id):
+    Notification.objects.create(user_id=user_id, message="never committed")
+    raise RuntimeError("boom")
+
+
+@queue.task("taskqueue.tests.notify")
+def notify(user_id):
+    Notification.objects.create(user_id=user_id, message="hello")
+
+
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email="player@example.com", password="pass", username="player")
+
+    def test_submit_defers_side_effects_to_the_worker(self):
+        quiz = make_quiz(self.user, questions=2)
+        answers = {q.id: q.options.first().id for q in quiz.questions.all()}
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        response = client.post(f"/api/quizzes/{quiz.id}/submit/", {"answers": answers}, format="json")
+        self.assertEqual(response.json()["score"], 100)
+        self.assertEqual((Notification.objects.count(), QuizStats.objects.count(), QuestionResponse.objects.count()), (0, 0, 0))
+        self.assertEqual(Task.objects.filter(status=Task.Status.PENDING).count(), 3)
+
+        self.assertEqual(queue.run_all(), (3, 0))
+        self.assertEqual(QuizStats.objects.get().attempts, 1)
+        self.assertEqual(QuestionResponse.objects.count(), 2)
+        self.assertTrue(UserAchievement.objects.filter(user=self.user, achievement__title="Quiz Explorer").exists())
+        self.assertEqual(
+            sorted(Notification.objects.values_list("title", flat=True)),
+            ["Achievement unlocked", "Thalers earned", "XP earned"],
+        )
+
+    def test_window_xp_from_the_worker_invalidates_leaderboards(self):
+        quiz = make_quiz(self.user, questions=2)
+        answers = {q.id: q.options.first().id for q in quiz.questions.all()}
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        def weekly():
+            [entry] = scoped.scoped_leaderboard([self.user.id], window="weekly")
+            public = APIClient().get("/api/leaderboard/weekly/").json()["entries"]
+            return entry["xp"], [row["xp"] for row in public]
+
+        client.post(f"/api/quizzes/{quiz.id}/submit/", {"answers": answers}, format="json")
+        queue.run_all()
+        xp, public = weekly()
+        self.assertEqual(public, [xp])
+
+        client.post(f"/api/quizzes/{quiz.id}/submit/", {"answers": answers}, format="json")
+        self.assertEqual(weekly(), (xp, [xp]))  # read between the submit and the worker
+        queue.run_all()
+        self.assertEqual(weekly(), (2 * xp, [2 * xp]))
+
+    def test_idempotency_keys_and_retries(self):
+        queue.enqueue("taskqueue.tests.notify", {"user_id": self.user.id}, key="hello")
+        queue.enqueue("taskqueue.tests.notify", {"user_id": self.user.id}, key="hello")
+        queue.enqueue("taskqueue.tests.notify_then_fail", {"user_id": self.user.id})
+        self.assertEqual(queue.run_all(), (1, 1))
+        self.assertEqual(list(Notification.objects.values_list("message", flat=True)), ["hello"])
+
+        failing = Task.objects.get(name="taskqueue.tests.notify_then_fail")
+        self.assertEqual((failing.status, failing.attempts), (Task.Status.PENDING, 1))
+        self.assertGreater(failing.run_after, timezone.now())  # backing off
+        self.assertIn("RuntimeError: boom", failing.last_error)
+
+        Task.objects.filter(pk=failing.pk).update(run_after=timezone.now())
+        self.assertEqual(queue.run_all(), (0, 1))
+        failing.refresh_from_db()
+        self.assertEqual((failing.status, failing.attempts), (Task.Status.FAILED, 2))
+        self.assertEqual(Notification.objects.count(), 1)  # the failed runs' writes rolled back
+
+    def test_expired_claims_are_handed_out_again_once(self):
+        queue.enqueue("taskqueue.tests.notify", {"user_id": self.user.id})
+        [stale] = queue.claim()
+        Task.objects.update(claimed_at=timezone.now() - queue.LEASE - timedelta(seconds=1))
+        self.assertEqual(queue.reclaim(), 1)
+
+        self.assertEqual(queue.run_all(), (1, 0))
+        self.assertFalse(queue.run(stale))  # the first worker comes back: its claim is gone
+        self.assertEqual(Notification.objects.count(), 1)
@@ -0,0 +1,100 @@
+# users/authentication.py
+"""
+JWT authentication without a user query per request.
+
+simplejwt's JWTAuthentication loads the whole users.User row (JSON badges
+and achievements included) on every authenticated request. Most views
+only need the caller's id and a few flags, so CachedJWTAuthentication
+caches a slim principal instead:
+
+    auth:principal:<user id>:<token version>
+        -> (id, is_superuser, username, email, is_premium, is_active,
+            is_staff, subscription_plan, token_version)
+
+and turns it into a User instance with every other column deferred. The
+first access to a deferred column loads the rest of the row in one query
+(see User.refresh_from_db), so views that need the full user still get
+it; views that don't never touch the users table.
+
+Tokens carry the user's token_version ("ver"). A token whose version no
+longer matches is rejected, which is how a password change signs out
+every device. Saving or deleting a user drops their cached principals
+(users.signals), immediately and again on commit.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+User = get_user_model()
+
+PRINCIPAL_KEY = "auth:principal:{}:{}"
+VERSION_CLAIM = "ver"
+SLIM_COLUMNS = {
+    "id",
+    "username",
+    "email",
+    "is_active",
+    "is_staff",
+    "is_superuser",
+    "is_premium",
+    "subscription_plan",
+    "token_version",
+}
+# in model order, as Model.from_db() expects the values
+PRINCIPAL_FIELDS = tuple(f.attname for f in User._meta.concrete_fields if f.attname in SLIM_COLUMNS)
+TTL = getattr(settings, "AUTH_PRINCIPAL_CACHE_TTL", 60 * 10)
+
+
+def _drop(keys):
+    cache.delete_many(keys)
+
+
+def forget(user_id, versions):
+    """Drop the cached principals of these token versions of the user."""
+    keys = [PRINCIPAL_KEY.format(user_id, version) for version in set(versions) if version is not None]
+    if keys:
+        _drop(keys)
+        transaction.on_commit(lambda: _drop(keys))
+
+
+def principal(user_id, version):
+    """The cached slim User for this user id and token version, or None when there is no such user."""
+    key = PRINCIPAL_KEY.format(user_id, version)
+    values = cache.get(key)
+    if values is None:
+        values = User.objects.filter(pk=user_id).values_list(*PRINCIPAL_FIELDS).first()
+        if values is None:
+            return None
+        cache.set(key, values, TTL)
+
+    user = User.from_db(DEFAULT_DB_ALIAS, PRINCIPAL_FIELDS, values)
+    user._principal = True
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication serving request.user from the principal cache."""
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN or api_settings.USER_ID_FIELD != "id":
+            return super().get_user(validated_token)  # needs columns the principal does not carry
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+        version = validated_token.get(VERSION_CLAIM, 0)
+
+        user = principal(user_id, version)
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if user.token_version != version:
+            raise AuthenticationFailed(_("Token has been revoked"), code="token_revoked")
+        return user
@@ -0,0 +1,161 @@
+# users/ledger.py
+"""
+Thaler ledger.
+
+Every change to User.thalers goes through post() (or credit()/debit()),
+which updates the balance and appends a ThalerTransaction carrying the
+resulting balance in one transaction. The UPDATE takes the user's row lock
+before the balance is read back, so concurrent postings serialise and each
+ledger row's balance_after is exact. Reads (wallet) never touch the ledger
+beyond the page they show.
+
+reconcile() walks users in id-ordered chunks and reports (or repairs)
+balances that disagree with their ledger.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F, Max, Sum
+
+from .models import ThalerTransaction
+
+User = get_user_model()
+
+HISTORY_PAGE_SIZE = 50
+HISTORY_MAX_PAGE_SIZE = 200
+
+
+class InsufficientThalers(Exception):
+    pass
+
+
+def post(user_id, amount, reason=""):
+    """
+    Apply `amount` (negative to spend) to the user's balance and record it.
+    Raises InsufficientThalers rather than letting a spend go below zero.
+    Returns the ThalerTransaction (balance_after is the new balance).
+    """
+    with transaction.atomic():
+        users = User.objects.filter(pk=user_id)
+        if amount < 0:
+            users = users.filter(thalers__gte=-amount)
+        if not users.update(thalers=F("thalers") + amount):
+            if amount < 0 and User.objects.filter(pk=user_id).exists():
+                raise InsufficientThalers(f"user {user_id} cannot spend {-amount} thalers")
+            raise User.DoesNotExist(f"user {user_id} does not exist")
+
+        balance = User.objects.filter(pk=user_id).values_list("thalers", flat=True).get()
+        return ThalerTransaction.objects.create(
+            user_id=user_id, amount=amount, reason=reason[:255], balance_after=balance
+        )
+
+
+def credit(user_id, amount, reason="credit"):
+    if amount <= 0:
+        return None
+    return post(user_id, amount, reason)
+
+
+def debit(user_id, amount, reason="spend"):
+    if amount <= 0:
+        return None
+    return post(user_id, -amount, reason)
+
+
+# ---------- READS ----------
+
+
+def history(user_id, before=None, limit=HISTORY_PAGE_SIZE):
+    """
+    One page of ledger rows, newest first. Keyset pagination on id: pass the
+    returned `next` back as `before` for the following page.
+    """
+    limit = max(1, min(limit, HISTORY_MAX_PAGE_SIZE))
+    rows = ThalerTransaction.objects.filter(user_id=user_id)
+    if before is not None:
+        rows = rows.filter(id__lt=before)
+    page = list(
+        rows.order_by("-id").values("id", "amount", "reason", "balance_after", "created_at")[: limit + 1]
+    )
+    next_before = page[limit - 1]["id"] if len(page) > limit else None
+    return page[:limit], next_before
+
+
+# ---------- RECONCILIATION ----------
+
+
+def _ledger_state(user_ids):
+    """{user_id: (sum of amounts, balance_after of the newest row)}"""
+    totals = {
+        row["user_id"]: (row["total"], row["last_id"])
+        for row in ThalerTransaction.objects.filter(user_id__in=user_ids)
+        .values("user_id")
+        .annotate(total=Sum("amount"), last_id=Max("id"))
+    }
+    last_balances = dict(
+        ThalerTransaction.objects.filter(id__in=[last_id for _, last_id in totals.values()]).values_list(
+            "user_id", "balance_after"
+        )
+    )
+    return {uid: (total, last_balances.get(uid)) for uid, (total, _) in totals.items()}
+
+
+def _is_consistent(thalers, state):
+    total, last_balance = state if state else (0, 0)
+    return thalers == total == last_balance
+
+
+def _replay(user_id):
+    """Recompute running balances in id order and set the balance to the ledger total."""
+    rows = list(ThalerTransaction.objects.filter(user_id=user_id).order_by("id").only("id", "amount", "balance_after"))
+    balance = 0
+    changed = []
+    for row in rows:
+        balance += row.amount
+        if row.balance_after != balance:
+            row.balance_after = balance
+            changed.append(row)
+    ThalerTransaction.objects.bulk_update(changed, ["balance_after"], batch_size=1000)
+    User.objects.filter(pk=user_id).update(thalers=balance)
+    return balance
+
+
+def reconcile(chunk_size=1000, fix=False):
+    """
+    Compare every user's balance with their ledger, `chunk_size` users at a
+    time. Candidates are re-checked under the user's row lock so postings in
+    flight are not reported. With `fix`, the ledger wins: running balances are
+    replayed and the balance reset to the ledger total.
+
+    Returns a list of (user_id, thalers, ledger_total, last_balance_after).
+    """
+    mismatches = []
+    last_id = 0
+
+    while True:
+        users = list(
+            User.objects.filter(id__gt=last_id).order_by("id").values_list("id", "thalers")[:chunk_size]
+        )
+        if not users:
+            break
+        last_id = users[-1][0]
+
+        state = _ledger_state([uid for uid, _ in users])
+        suspects = [uid for uid, thalers in users if not _is_consistent(thalers, state.get(uid))]
+
+        for uid in suspects:
+            with transaction.atomic():
+                thalers = User.objects.select_for_update().filter(pk=uid).values_list("thalers", flat=True).first()
+                if thalers is None:
+                    continue
+                current = _ledger_state([uid]).get(uid)
+                if _is_consistent(thalers, current):
+                    continue
+                total, last_balance = current if current else (0, None)
+                mismatches.append((uid, thalers, total, last_balance))
+                if fix:
+                    _replay(uid)
+
+        if len(users) < chunk_size:
+            break
+
+    return mismatches
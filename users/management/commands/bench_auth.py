@@ -0,0 +1,85 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from quizzes.management.commands.bench_quiz_pack import Rollback
+from users import authentication
+from users.serializers import MyTokenObtainPairSerializer
+from users.views import UserDetailView
+
+User = get_user_model()
+
+
+class WhoAmI(APIView):
+    """What most authenticated views need from request.user: the id and a flag or two."""
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response({"id": request.user.id, "premium": request.user.is_premium})
+
+
+def timed(fn, repeat):
+    """Requests per second over `repeat` calls (after one warm-up call)."""
+    fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return repeat / (time.perf_counter() - started)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark authenticated requests/sec with simplejwt's JWTAuthentication vs "
+        "CachedJWTAuthentication, on a view that only reads the caller's id and on /api/users/me/. "
+        "The synthetic user is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=2000)
+        parser.add_argument("--badges", type=int, default=200, help="Badges/achievements stored on the user row")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                user = User.objects.create_user(
+                    username="bench-auth",
+                    email="bench-auth@example.com",
+                    password="bench-auth",
+                    badges=[f"badge-{n}" for n in range(options["badges"])],
+                    achievements=[{"code": f"achievement-{n}", "level": n % 5} for n in range(options["badges"])],
+                )
+                self._run(user, options["repeat"])
+                raise Rollback()
+        except Rollback:
+            pass
+        # the rolled-back user never commits, so drop its principal by hand
+        cache.delete(authentication.PRINCIPAL_KEY.format(user.id, user.token_version))
+
+        self.stdout.write(self.style.SUCCESS("✔ Benchmark complete"))
+
+    def _run(self, user, repeat):
+        token = MyTokenObtainPairSerializer.get_token(user).access_token
+        factory = APIRequestFactory()
+
+        self.stdout.write(f"{'':28} {'JWTAuth req/s':>14} {'cached req/s':>14} {'speedup':>8}")
+        for label, view in (("id-only view", WhoAmI), ("GET /api/users/me/", UserDetailView)):
+            rates = []
+            for backend in (JWTAuthentication, authentication.CachedJWTAuthentication):
+                handler = view.as_view(authentication_classes=[backend])
+
+                def call():
+                    response = handler(factory.get("/", HTTP_AUTHORIZATION=f"Bearer {token}"))
+                    assert response.status_code == 200, response.status_code
+
+                rates.append(timed(call, repeat))
+            before, after = rates
+            self.stdout.write(f"{label:28} {before:14.0f} {after:14.0f} {after / before:7.1f}x")
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from users.ledger import reconcile
+
+
+class Command(BaseCommand):
+    help = (
+        "Check every user's thaler balance against the ledger, in chunks of users. "
+        "Run periodically (e.g. nightly from cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Replay the ledger for mismatched users and reset their balance to it",
+        )
+
+    def handle(self, *args, **options):
+        mismatches = reconcile(chunk_size=options["chunk_size"], fix=options["fix"])
+
+        for user_id, thalers, total, last_balance in mismatches:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"user {user_id}: balance {thalers}, ledger total {total}, last running balance {last_balance}"
+                )
+            )
+
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS("✔ All balances match the ledger"))
+        elif options["fix"]:
+            self.stdout.write(self.style.SUCCESS(f"✔ Repaired {len(mismatches)} balances from the ledger"))
+        else:
+            self.stdout.write(self.style.ERROR(f"✖ {len(mismatches)} balances disagree with the ledger"))
@@ -0,0 +1,71 @@
+# users/middleware.py
+"""
+JWT authentication for WebSocket connections.
+
+JWTAuthMiddleware reads an access token from the `token` query parameter
+or an `Authorization: Bearer <token>` header (browsers cannot set headers
+on a WebSocket, so clients normally use the query string) and validates
+it once, at the handshake, with CachedJWTAuthentication: scope["user"] is
+the cached principal, so a reconnect storm after a deploy costs cache
+reads rather than a users query per socket.
+
+A bad token (malformed, expired, revoked, unknown or inactive user) is
+rejected before the consumer sees the connection: the handshake is closed
+without accept(), which clients see as HTTP 403. Connections without a
+token fall through to the session stack (AuthMiddlewareStack).
+"""
+from urllib.parse import parse_qs
+
+from channels.auth import AuthMiddlewareStack
+from channels.db import database_sync_to_async
+from channels.security.websocket import WebsocketDenier
+from rest_framework.exceptions import AuthenticationFailed
+
+from .authentication import CachedJWTAuthentication
+
+QUERY_PARAM = "token"
+
+
+def token_from_scope(scope):
+    """The raw access token of the connection, or None."""
+    params = parse_qs(scope.get("query_string", b"").decode("latin1"))
+    if params.get(QUERY_PARAM):
+        return params[QUERY_PARAM][0]
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            parts = value.decode("latin1").split()
+            if len(parts) == 2 and parts[0] in ("Bearer", "JWT"):
+                return parts[1]
+    return None
+
+
+@database_sync_to_async
+def authenticate(raw_token):
+    """The principal for this token; raises AuthenticationFailed (InvalidToken included) otherwise."""
+    backend = CachedJWTAuthentication()
+    return backend.get_user(backend.get_validated_token(raw_token.encode()))
+
+
+class JWTAuthMiddleware:
+    """Puts the token's principal in scope["user"]; tokenless connections go to `fallback`."""
+
+    def __init__(self, inner, fallback=None):
+        self.inner = inner
+        self.fallback = fallback or inner
+
+    async def __call__(self, scope, receive, send):
+        raw_token = token_from_scope(scope)
+        if raw_token is None:
+            return await self.fallback(scope, receive, send)
+
+        try:
+            user = await authenticate(raw_token)
+        except AuthenticationFailed:
+            if scope["type"] == "websocket":
+                return await WebsocketDenier()(scope, receive, send)
+            raise
+        return await self.inner(dict(scope, user=user), receive, send)
+
+
+def JWTAuthMiddlewareStack(inner):
+    return JWTAuthMiddleware(inner, fallback=AuthMiddlewareStack(inner))
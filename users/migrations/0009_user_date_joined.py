@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:33
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_user_subscription_plan'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='date_joined',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
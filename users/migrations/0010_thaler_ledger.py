@@ -0,0 +1,54 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:42
+
+from django.db import migrations, models
+
+
+def open_ledger(apps, schema_editor):
+    """
+    Backfill running balances for existing rows and, where balances were
+    changed without a ledger row, append an opening adjustment so that every
+    user's ledger ends at their current balance.
+    """
+    User = apps.get_model("users", "User")
+    ThalerTransaction = apps.get_model("users", "ThalerTransaction")
+
+    for user_id, thalers in User.objects.values_list("id", "thalers").iterator(chunk_size=1000):
+        rows = list(ThalerTransaction.objects.filter(user_id=user_id).order_by("id"))
+        balance = 0
+        for row in rows:
+            balance += row.amount
+            row.balance_after = balance
+        ThalerTransaction.objects.bulk_update(rows, ["balance_after"], batch_size=1000)
+
+        if balance != thalers:
+            ThalerTransaction.objects.create(
+                user_id=user_id,
+                amount=thalers - balance,
+                reason="opening_balance",
+                balance_after=thalers,
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0009_user_date_joined'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='thalertransaction',
+            name='balance_after',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='thalers',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='thalertransaction',
+            index=models.Index(fields=['user', '-id'], name='users_ledger_user_id'),
+        ),
+        migrations.RunPython(open_ledger, migrations.RunPython.noop),
+    ]
@@ -2,6 +2,7 @@ from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
 from django.contrib.auth import get_user_model
 from django.conf import settings
+from django.utils import timezone
 # Create your models here.
 
 
@@ -51,11 +52,15 @@ class User(AbstractBaseUser, PermissionsMixin):
     achievements = models.JSONField(default=list, blank=True)
     bio = models.TextField(blank=True, null=True)
     is_premium = models.BooleanField(default=False)
-    thalers = models.IntegerField(default=0)
+    # Maintained by users.ledger only; see User.save()
+    thalers = models.IntegerField(default=0, editable=False)
     profile_picture = models.ImageField(upload_to='profile_pics/', blank=True, null=True)
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
     subscription_plan = models.CharField(max_length=32, default="basic") 
+    date_joined = models.DateTimeField(default=timezone.now)
+    # embedded in issued JWTs ("ver"); bumping it revokes every token issued before
+    token_version = models.PositiveIntegerField(default=0)
 
     objects = UserManager()
 
@@ -65,6 +70,33 @@ class User(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return self.email
 
+    def save(self, *args, **kwargs):
+        # The balance is written by users.ledger together with its ledger row.
+        # A plain save() of an instance loaded earlier must not write back a
+        # stale balance, so full saves of existing rows leave thalers alone.
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                f.name
+                for f in self._meta.concrete_fields
+                if not f.primary_key and f.name != "thalers" and f.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+    def set_password(self, raw_password):
+        super().set_password(raw_password)
+        if self.pk is not None:
+            self.token_version += 1  # a new password signs every device out
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        # An auth principal (users.authentication) holds only a few columns.
+        # The first access to any other loads the rest of the row at once.
+        if fields is not None and self.__dict__.pop("_principal", False):
+            deferred = self.get_deferred_fields()
+            if set(fields) <= deferred:
+                fields = deferred
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+
 User = get_user_model()
     
 class TermsAndConditions(models.Model):
@@ -88,7 +120,11 @@ class ThalerTransaction(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="thalers_transactions")
     amount = models.IntegerField()  # positive for credit, negative for spend
     reason = models.CharField(max_length=255, blank=True)
+    balance_after = models.IntegerField(default=0)  # user's balance once this row applied
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [models.Index(fields=["user", "-id"], name="users_ledger_user_id")]
+
     def __str__(self):
         return f"{self.user.email} {self.amount} ({self.reason})"
@@ -3,6 +3,7 @@ from django.contrib.auth import get_user_model,authenticate
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework_simplejwt.views import TokenObtainPairView
+from .authentication import VERSION_CLAIM
 from .models import TermsAndConditions, UserTermsAcceptance
 
 User = get_user_model()
@@ -28,6 +29,7 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
         token = super().get_token(user)
         
         token['Welcome back!'] = user.username
+        token[VERSION_CLAIM] = user.token_version  # checked by users.authentication
         
         return token
     
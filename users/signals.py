@@ -0,0 +1,22 @@
+# users/signals.py
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from . import authentication
+
+User = get_user_model()
+
+
+@receiver(post_init, sender=User)
+def remember_token_version(sender, instance, **kwargs):
+    # read through __dict__ so deferred fields are never fetched just for this
+    instance._cached_token_version = instance.__dict__.get("token_version")
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_principal(sender, instance, **kwargs):
+    # flags or plan may have changed: drop the principal of the old and the new token version
+    authentication.forget(instance.pk, [instance._cached_token_version, instance.__dict__.get("token_version")])
+    instance._cached_token_version = instance.__dict__.get("token_version")
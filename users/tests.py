@@ -1,6 +1,19 @@
+import json
+
 from django.test import TestCase
 from django.urls import reverse
 from django.contrib.auth.models import User
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from rest_framework.test import APIClient, APIRequestFactory
+
+from . import ledger
+from .authentication import CachedJWTAuthentication
+from .middleware import JWTAuthMiddlewareStack
+from .models import ThalerTransaction
 
 class UserTests(TestCase):
 	def test_register_view_creates_user(self):
@@ -36,3 +49,139 @@ class UserTests(TestCase):
 		self.assertEqual(response.status_code, 302) # Redirect to login
 
 # replace 'register' and 'user-detail' with your actual URL names if different.
+
+
+class ThalerLedgerTests(TestCase):
+	def setUp(self):
+		self.user = get_user_model().objects.create_user(email="wallet@example.com", password="pass", username="wallet")
+		self.client = APIClient()
+		self.client.force_authenticate(self.user)
+
+	def test_postings_carry_running_balance(self):
+		ledger.credit(self.user.id, 100, "quiz")
+		ledger.debit(self.user.id, 30, "shop")
+		with self.assertRaises(ledger.InsufficientThalers):
+			ledger.debit(self.user.id, 500, "shop")
+
+		self.assertEqual(list(ThalerTransaction.objects.order_by("id").values_list("amount", "balance_after")), [(100, 100), (-30, 70)])
+		self.user.refresh_from_db()
+		self.assertEqual(self.user.thalers, 70)
+
+		# a full save of a stale instance leaves the balance alone
+		stale = get_user_model().objects.get(pk=self.user.pk)
+		ledger.credit(self.user.id, 5, "quiz")
+		stale.bio = "hello"
+		stale.save()
+		stale.refresh_from_db()
+		self.assertEqual(stale.thalers, 75)
+
+	def test_history_pages_by_keyset(self):
+		for i in range(5):
+			ledger.credit(self.user.id, i + 1, "quiz")
+
+		first = self.client.get("/api/users/thalers/history/", {"limit": 2}).json()
+		self.assertEqual([t["amount"] for t in first["transactions"]], [5, 4])
+		second = self.client.get("/api/users/thalers/history/", {"limit": 2, "before": first["next"]}).json()
+		self.assertEqual([t["amount"] for t in second["transactions"]], [3, 2])
+		last = self.client.get("/api/users/thalers/history/", {"limit": 2, "before": second["next"]}).json()
+		self.assertEqual(([t["amount"] for t in last["transactions"]], last["next"]), ([1], None))
+
+		self.assertEqual(self.client.post("/api/users/thalers/spend/", {"amount": 100}).status_code, 400)
+
+	def test_non_string_reason_is_rejected(self):
+		for url in ("/api/users/thalers/add/", "/api/users/thalers/spend/"):
+			for reason in (5, {"why": "x"}, ["x"]):
+				response = self.client.post(url, {"amount": 1, "reason": reason}, format="json")
+				self.assertEqual(response.status_code, 400)
+		self.assertFalse(ThalerTransaction.objects.exists())
+
+	def test_reconcile_reports_and_repairs_drift(self):
+		ledger.credit(self.user.id, 40, "quiz")
+		get_user_model().objects.filter(pk=self.user.pk).update(thalers=999)
+
+		self.assertEqual(ledger.reconcile(chunk_size=1), [(self.user.id, 999, 40, 40)])
+		ledger.reconcile(fix=True)
+		self.assertEqual(ledger.reconcile(), [])
+		self.user.refresh_from_db()
+		self.assertEqual(self.user.thalers, 40)
+
+
+
+class CachedJWTAuthenticationTests(TestCase):
+	def setUp(self):
+		cache.clear()
+		self.user = get_user_model().objects.create_user(email="jwt@example.com", password="pass1234", username="jwt")
+		self.token = self.login("pass1234")
+
+	def login(self, password):
+		response = APIClient().post("/api/auth/login/", {"email": "jwt@example.com", "password": password}, format="json")
+		return response.json().get("access")
+
+	def authenticate(self, token):
+		request = APIRequestFactory().get("/", HTTP_AUTHORIZATION=f"Bearer {token}")
+		return CachedJWTAuthentication().authenticate(request)[0]
+
+	def test_principal_is_cached_and_loads_the_row_lazily(self):
+		with self.assertNumQueries(1):
+			self.authenticate(self.token)
+		with self.assertNumQueries(0):
+			user = self.authenticate(self.token)
+		self.assertEqual((user, user.username, user.is_premium), (self.user, "jwt", False))
+
+		with self.assertNumQueries(1):  # the first deferred column loads the whole row
+			self.assertEqual((user.xp, user.badges, user.thalers), (0, [], 0))
+
+	def test_saves_invalidate_and_password_change_revokes(self):
+		self.authenticate(self.token)
+		self.user.is_staff = True
+		self.user.save()
+		self.assertTrue(self.authenticate(self.token).is_staff)
+
+		self.user.set_password("new-pass")
+		self.user.save()
+		response = APIClient().get("/api/users/me/", HTTP_AUTHORIZATION=f"Bearer {self.token}")
+		self.assertEqual(response.status_code, 401)
+		self.assertEqual(self.authenticate(self.login("new-pass")).pk, self.user.pk)
+
+
+class WhoAmIConsumer(AsyncJsonWebsocketConsumer):
+	async def connect(self):
+		await self.accept()
+		user = self.scope["user"]
+		await self.send_json({"id": user.id if user.is_authenticated else None})
+
+
+class JWTAuthMiddlewareTests(TestCase):
+	setUp = CachedJWTAuthenticationTests.setUp
+	login = CachedJWTAuthenticationTests.login
+
+	def connect(self, path, headers=()):
+		path, _, query = path.partition("?")
+		scope = {"type": "websocket", "path": path, "query_string": query.encode(), "headers": list(headers), "subprotocols": []}
+
+		async def handshake():
+			communicator = ApplicationCommunicator(JWTAuthMiddlewareStack(WhoAmIConsumer.as_asgi()), scope)
+			await communicator.send_input({"type": "websocket.connect"})
+			reply = await communicator.receive_output()
+			if reply["type"] != "websocket.accept":
+				return False, None
+			message = await communicator.receive_output()
+			await communicator.send_input({"type": "websocket.disconnect", "code": 1000})
+			await communicator.wait()
+			return True, json.loads(message["text"])
+
+		return async_to_sync(handshake)()
+
+	def test_token_from_query_or_header_hits_the_database_once(self):
+		with self.assertNumQueries(1):
+			self.assertEqual(self.connect(f"/ws/?token={self.token}"), (True, {"id": self.user.pk}))
+		with self.assertNumQueries(0):
+			header = (b"authorization", f"Bearer {self.token}".encode())
+			self.assertEqual(self.connect("/ws/", headers=[header]), (True, {"id": self.user.pk}))
+
+	def test_bad_tokens_are_rejected_before_accept(self):
+		self.assertEqual(self.connect("/ws/?token=not-a-jwt"), (False, None))
+		self.user.set_password("new-pass")
+		self.user.save()
+		self.assertEqual(self.connect(f"/ws/?token={self.token}"), (False, None))
+		self.assertEqual(self.connect("/ws/"), (True, {"id": None}))  # no token: the session stack
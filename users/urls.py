@@ -6,7 +6,7 @@ from .views import UserUpdateView
 from .views import RegisterView, UserDetailView, MyTokenObtainPairView, AdminUserListView, AdminUserDetailView, AdminUserUpdateView, AdminUserDeleteView
 from .views import TermsView, AcceptTermsView, UpgradeToPremiumView
 from .views import RequestPasswordResetView, PasswordResetConfirmView
-from .views_thalers import add_thalers, wallet, spend_thalers
+from .views_thalers import add_thalers, wallet, wallet_history, spend_thalers
 
 urlpatterns = [
     path('register/', RegisterView.as_view(), name='register'),
@@ -26,6 +26,7 @@ urlpatterns = [
 
     path('thalers/add/', add_thalers, name='add_thalers'),
     path('thalers/wallet/', wallet, name='wallet'),
+    path('thalers/history/', wallet_history, name='wallet_history'),
     path('thalers/spend/', spend_thalers, name='spend_thalers'),
 
     path('upgrade/', UpgradeToPremiumView.as_view(), name='upgrade_premium'),
@@ -1,53 +1,79 @@
 # users/views_thalers.py
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 from rest_framework import status
-from django.shortcuts import get_object_or_404
-from .models import ThalerTransaction
 from django.contrib.auth import get_user_model
+from brainfuel.ratelimit import throttle
+from . import ledger
 
 User = get_user_model()
 
+
+def _int_param(value, default=None):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _reason(data, default):
+    """The posting's `reason` if it is a string (None otherwise)."""
+    reason = data.get("reason", default)
+    return reason if isinstance(reason, str) else None
+
+
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
+@throttle_classes([throttle("thalers")])
 def add_thalers(request):
     # Admin or internal endpoint to credit thalers (or purchases)
-    amount = int(request.data.get("amount", 0))
-    reason = request.data.get("reason", "credit")
+    amount = _int_param(request.data.get("amount", 0), 0)
+    reason = _reason(request.data, "credit")
     if amount <= 0:
         return Response({"detail": "Amount must be positive"}, status=status.HTTP_400_BAD_REQUEST)
+    if reason is None:
+        return Response({"detail": "Reason must be a string"}, status=status.HTTP_400_BAD_REQUEST)
 
-    user = request.user
-    user.thalers = (user.thalers or 0) + amount
-    user.save()
-    tx = ThalerTransaction.objects.create(user=user, amount=amount, reason=reason)
-    return Response({"thalers": user.thalers, "transaction_id": tx.id}, status=status.HTTP_200_OK)
+    tx = ledger.credit(request.user.id, amount, reason)
+    return Response({"thalers": tx.balance_after, "transaction_id": tx.id}, status=status.HTTP_200_OK)
 
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def wallet(request):
-    user = request.user
-    transactions = [
-        {"id": t.id, "amount": t.amount, "reason": t.reason, "created_at": t.created_at}
-        for t in ThalerTransaction.objects.filter(user=user).order_by("-created_at")[:50]
-    ]
-    return Response({"thalers": user.thalers or 0, "transactions": transactions})
+    """Balance plus the first page of history (see wallet_history for the rest)."""
+    transactions, next_before = ledger.history(request.user.id)
+    balance = User.objects.filter(pk=request.user.id).values_list("thalers", flat=True).first()
+    return Response({"thalers": balance or 0, "transactions": transactions, "next": next_before})
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def wallet_history(request):
+    """
+    GET /thalers/history/?before=<id>&limit=<n>
+    Ledger rows newest first; pass `next` back as `before` for the next page.
+    """
+    before = _int_param(request.query_params.get("before"))
+    limit = _int_param(request.query_params.get("limit"), ledger.HISTORY_PAGE_SIZE)
+    transactions, next_before = ledger.history(request.user.id, before=before, limit=limit)
+    return Response({"transactions": transactions, "next": next_before})
 
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
+@throttle_classes([throttle("thalers")])
 def spend_thalers(request):
-    user = request.user
-    amount = int(request.data.get("amount", 0))
-    reason = request.data.get("reason", "spend")
+    amount = _int_param(request.data.get("amount", 0), 0)
+    reason = _reason(request.data, "spend")
     if amount <= 0:
         return Response({"detail": "Amount must be positive"}, status=status.HTTP_400_BAD_REQUEST)
-    if (user.thalers or 0) < amount:
-        return Response({"detail": "Insufficient thalers"}, status=status.HTTP_400_BAD_REQUEST)
+    if reason is None:
+        return Response({"detail": "Reason must be a string"}, status=status.HTTP_400_BAD_REQUEST)
 
-    user.thalers = user.thalers - amount
-    user.save()
-    tx = ThalerTransaction.objects.create(user=user, amount=-amount, reason=reason)
-    return Response({"thalers": user.thalers, "transaction_id": tx.id})
+    try:
+        tx = ledger.debit(request.user.id, amount, reason)
+    except ledger.InsufficientThalers:
+        return Response({"detail": "Insufficient thalers"}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({"thalers": tx.balance_after, "transaction_id": tx.id})